@@ -0,0 +1,239 @@
+"""
+Consistency checks between the pipeline's in-memory and streaming paths
+
+Each check writes a small raw file to a temporary directory, runs it through
+two paths that must agree and returns a line for every disagreement. The
+benchmark runner runs them before timing anything and fails the run on any,
+so a speed-up that changes results cannot slip through as a faster baseline.
+
+Usage:
+    python src/benchmarks/consistency.py
+"""
+
+import io
+import logging
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+# Make the repository root importable when run as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.benchmarks.synthetic import generate_aqi, generate_idsp
+from src.data import enhanced_data_cleaning_pipeline as engine
+from src.utils.storage import load_cleaned_dataset
+
+IDSP_COLUMNS = ["year", "week", "outbreak_starting_date", "reporting_date", "state", "district",
+                "disease_illness_name", "status", "cases", "deaths"]
+
+Check = Callable[[str], List[str]]
+
+
+@contextmanager
+def engine_config(**settings):
+    """Temporarily override engine CONFIG entries"""
+    saved = {key: engine.CONFIG[key] for key in settings}
+    engine.CONFIG.update(settings)
+    try:
+        yield
+    finally:
+        engine.CONFIG.update(saved)
+
+
+# 🧪 Raw inputs
+def idsp_nan_case() -> Tuple[pd.DataFrame, int]:
+    """Six IDSP rows read in chunks of three: chunk 1 has a missing death, chunk 2 repeats one of its rows"""
+    rows = [
+        [2024, 1, "01-01-2024", "02-01-2024", "Kerala", "Kollam", "Dengue", "Under Control", 10, 2],
+        [2024, 1, "01-01-2024", "03-01-2024", "Kerala", "Kollam", "Malaria", "Under Control", 5, None],
+        [2024, 1, "02-01-2024", "04-01-2024", "Bihar", "Patna", "Cholera", "Under Control", 7, 0],
+        [2024, 1, "01-01-2024", "02-01-2024", "Kerala", "Kollam", "Dengue", "Under Control", 10, 2],
+        [2024, 2, "08-01-2024", "09-01-2024", "Assam", "Cachar", "Measles", "Under Control", 3, 0],
+        [2024, 2, "08-01-2024", "10-01-2024", "Delhi", "New Delhi", "Typhoid", "Under Control", 4, 1],
+    ]
+    return pd.DataFrame(rows, columns=IDSP_COLUMNS), 3
+
+
+def idsp_synthetic_case(rows: int = 3000, seed: int = 0) -> Tuple[pd.DataFrame, int]:
+    """Synthetic IDSP with missing deaths in the first chunks only, so later chunks read deaths as integers"""
+    df = generate_idsp(rows, seed)
+    rng = np.random.default_rng(seed)
+    df["deaths"] = df["deaths"].astype("float64")
+    df.loc[rng.choice(rows // 3, rows // 100, replace=False), "deaths"] = np.nan
+    return df, rows // 6
+
+
+def as_raw(df: pd.DataFrame) -> pd.DataFrame:
+    """Whole-number float columns as nullable integers, so they are written without a trailing .0 like the raw files"""
+    return df.astype({col: "Int64" for col in df.columns if df[col].dtype == "float64"
+                      and (df[col].dropna() % 1 == 0).all()})
+
+
+def write_raw(df: pd.DataFrame, work_dir: str, name: str) -> str:
+    path = os.path.join(work_dir, f"{name}.csv")
+    as_raw(df).to_csv(path, index=False)
+    return path
+
+
+# 🔁 Paths under comparison
+def clean_in_memory(path: str) -> pd.DataFrame:
+    return engine.clean_idsp_dataset(engine.safe_read_csv(path, schema="idsp"))
+
+
+def clean_streaming(path: str, output_dir: str, chunk_size: int) -> pd.DataFrame:
+    writer = engine.DatasetWriter("idsp", output_dir)
+    engine.clean_idsp_dataset_streaming(path, writer, chunk_size=chunk_size)
+    writer.close()
+    engine.flush_exports()
+    return pd.read_csv(writer.csv_path)
+
+
+def reread(df: pd.DataFrame) -> pd.DataFrame:
+    """df after a CSV round trip, so both sides are compared under the same inferred dtypes"""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+
+def frame_differences(label: str, expected: pd.DataFrame, actual: pd.DataFrame) -> List[str]:
+    if len(expected) != len(actual):
+        return [f"{label}: {len(actual)} rows, expected {len(expected)}"]
+    if sorted(expected.columns) != sorted(actual.columns):
+        return [f"{label}: columns {sorted(actual.columns)}, expected {sorted(expected.columns)}"]
+    try:
+        pd.testing.assert_frame_equal(actual[expected.columns].reset_index(drop=True),
+                                      expected.reset_index(drop=True), check_dtype=False)
+    except AssertionError as e:
+        return [f"{label}: {str(e).splitlines()[0]}"]
+    return []
+
+
+# ✅ Checks
+def check_streaming_duplicates(work_dir: str) -> List[str]:
+    """Streamed IDSP cleaning keeps the same rows as in-memory cleaning when chunk dtypes differ"""
+    problems = []
+    for label, (df, chunk_size) in [("idsp_nan_case", idsp_nan_case()), ("idsp_synthetic", idsp_synthetic_case())]:
+        path = write_raw(df, work_dir, label)
+        output_dir = os.path.join(work_dir, f"{label}_streamed")
+        os.makedirs(output_dir, exist_ok=True)
+        expected = reread(clean_in_memory(path))
+        actual = clean_streaming(path, output_dir, chunk_size)
+        problems += frame_differences(f"streaming vs in-memory ({label})", expected, actual)
+    return problems
+
+
+def check_streaming_profile(work_dir: str) -> List[str]:
+    """StreamingProfile counts the same duplicate rows as profile_dataframe"""
+    problems = []
+    for label, (df, chunk_size) in [("idsp_nan_case", idsp_nan_case()), ("idsp_synthetic", idsp_synthetic_case())]:
+        path = write_raw(df, work_dir, label)
+        expected = engine.profile_dataframe(engine.safe_read_csv(path, schema="idsp"), "idsp")["duplicate_rows"]
+        actual = engine.profile_csv_streaming(path, "idsp", chunk_size)["duplicate_rows"]
+        if actual != expected:
+            problems.append(f"streaming profile ({label}): {actual} duplicate rows, expected {expected}")
+    return problems
+
+
+def check_chunked_duplicates(work_dir: str) -> List[str]:
+    """handle_duplicates with a ChunkState drops the same rows chunk by chunk as over the whole frame"""
+    problems = []
+    for label, (df, chunk_size) in [("idsp_nan_case", idsp_nan_case()), ("idsp_synthetic", idsp_synthetic_case())]:
+        path = write_raw(df, work_dir, label)
+        subset = engine.IDSP_DUPLICATE_SUBSET
+        expected = engine.handle_duplicates(engine.safe_read_csv(path, schema="idsp"), subset, "IDSP")
+        state = engine.ChunkState()
+        kept = sum(len(engine.handle_duplicates(chunk, subset, "IDSP", state=state))
+                   for chunk in engine.iter_csv_chunks(path, chunk_size, schema="idsp"))
+        if kept != len(expected):
+            problems.append(f"chunked handle_duplicates ({label}): kept {kept} rows, expected {len(expected)}")
+    return problems
+
+
+def check_incremental_resend(work_dir: str) -> List[str]:
+    """A row re-sent in an appended tail without NaNs is not appended again"""
+    df, _ = idsp_nan_case()
+    path = write_raw(df.drop_duplicates(), work_dir, "idsp_incremental")
+    base_dir = os.path.join(work_dir, "incremental")
+    os.makedirs(os.path.join(base_dir, "cleaned"))
+    with engine_config(output_dir=os.path.join(base_dir, "cleaned")):
+        problems = engine.process_dataset_incremental("idsp", path, base_dir)["errors"]
+        csv_path = os.path.join(base_dir, "cleaned", "cleaned_idsp.csv")
+        stored = len(pd.read_csv(csv_path))
+        with open(path, "a") as f:
+            as_raw(df.iloc[[0]]).to_csv(f, header=False, index=False)
+        problems += engine.process_dataset_incremental("idsp", path, base_dir)["errors"]
+        engine.flush_exports()
+        appended = len(pd.read_csv(csv_path)) - stored
+    if appended:
+        problems.append(f"incremental resend: appended {appended} rows already ingested")
+    return problems
+
+
+def check_incremental_aqi(work_dir: str) -> List[str]:
+    """AQI bootstrapped and appended incrementally stores the same rows as a full rebuild"""
+    df = generate_aqi(1000)
+    head, tail = df.iloc[:700], pd.concat([df.iloc[700:], df.iloc[[0]]])  # the tail re-sends a stored row
+    path = write_raw(head, work_dir, "aqi")
+    stores = {}
+    for label in ("incremental", "full"):
+        stores[label] = os.path.join(work_dir, f"aqi_{label}")
+        os.makedirs(os.path.join(stores[label], "cleaned"))
+    problems = []
+    with engine_config(output_formats=["parquet"]):
+        with engine_config(output_dir=os.path.join(stores["incremental"], "cleaned")):
+            problems += engine.process_dataset_incremental("aqi", path, stores["incremental"])["errors"]
+            with open(path, "a") as f:
+                as_raw(tail).to_csv(f, header=False, index=False)
+            problems += engine.process_dataset_incremental("aqi", path, stores["incremental"])["errors"]
+        with engine_config(output_dir=os.path.join(stores["full"], "cleaned")):
+            problems += engine.process_dataset("aqi", path, stores["full"])["errors"]
+        engine.flush_exports()
+    if problems:
+        return problems
+
+    key = ["date", "state", "area", "aqi_value", "number_of_monitoring_stations"]
+    expected, actual = (reread(load_cleaned_dataset("aqi", os.path.join(stores[label], "cleaned")).sort_values(key))
+                        for label in ("full", "incremental"))
+    return frame_differences("incremental vs full AQI", expected, actual)
+
+
+CHECKS: Dict[str, Check] = {
+    "streaming_duplicates": check_streaming_duplicates,
+    "streaming_profile": check_streaming_profile,
+    "chunked_duplicates": check_chunked_duplicates,
+    "incremental_resend": check_incremental_resend,
+    "incremental_aqi": check_incremental_aqi,
+}
+
+
+def run_checks() -> List[str]:
+    """Run every check in a scratch directory; returns the disagreements found"""
+    problems = []
+    with tempfile.TemporaryDirectory() as work_dir, engine_config(
+        inconsistency_dir=work_dir, output_formats=["csv"], export_compression=None, aqi_cube=False
+    ):
+        for name, check in CHECKS.items():
+            found = check(work_dir)
+            print(f"{'❌' if found else '✅'} {name}")
+            problems += found
+    return problems
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+    problems = run_checks()
+    for line in problems:
+        print(f"  {line}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Benchmark suite for the cleaning pipeline stages
+
+Times and memory-profiles each stage (safe_read_csv, profile_dataframe, the
+batched consistency rules and, for IDSP, the single-rule checks they replace,
+add_week_validation_flag, the AQI cube build, handle_duplicates and the CSV
+write through export_rows) on seeded synthetic data, and compares the
+results with a stored JSON baseline. Exports run synchronously while timing,
+so a stage is charged for the writes it would otherwise queue. Any stage
+slower or hungrier than its baseline by more than the tolerance fails the
+run (exit status 1), as does any disagreement found by the consistency
+checks (consistency.py) that run first.
+
+Baselines for the default seed are committed under baselines/. With --check,
+a size that has no (readable) baseline fails the run before anything is
+timed; without it, such a size is only reported.
+
+Usage:
+    python src/benchmarks/run_benchmarks.py --sizes 10k 1m --save-baseline
+    python src/benchmarks/run_benchmarks.py --sizes 10k 1m --check --tolerance 0.25
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Make the repository root importable when run as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import pandas as pd
+
+from src.benchmarks.consistency import engine_config, run_checks
+from src.benchmarks.synthetic import GENERATORS, SIZES, ensure_synthetic_csv
+from src.data import enhanced_data_cleaning_pipeline as engine
+from src.data.aqi_cube import AQICube
+from src.data.pipeline import DUPLICATE_SUBSETS
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "airpure_benchmarks")
+DEFAULT_TOLERANCE = 0.25
+# Stages faster than this are too noisy to fail a run on timing alone
+MIN_SECONDS = 0.05
+MIN_PEAK_MB = 1.0
+
+Stage = Tuple[str, Callable[[pd.DataFrame], Any]]
+
+
+# 🧪 Stages under test
+def dataset_stages(name: str, work_dir: str) -> List[Stage]:
+    """(stage name, function of the loaded frame) pairs benchmarked for a dataset"""
+    stages: List[Stage] = [
+        ("profile_dataframe", lambda df: engine.profile_dataframe(df, name)),
+        ("apply_rules", lambda df: engine.apply_rules_for(df, name)),
+    ]
+
+    if name == "idsp":
+        stages += [
+            ("check_reporting_vs_outbreak", lambda df: engine.check_and_fix_logical_inconsistency(
+                df, "reporting_date", "outbreak_starting_date",
+                condition=lambda df: df["reporting_date"] < df["outbreak_starting_date"],
+                name="Reporting Date vs Outbreak Starting Date", swap=True)),
+            ("check_deaths_vs_cases", lambda df: engine.check_and_fix_logical_inconsistency(
+                df, "deaths", "cases",
+                condition=lambda df: df["deaths"] > df["cases"],
+                name="Deaths vs Cases")),
+            ("add_week_validation_flag", engine.add_week_validation_flag),
+        ]
+    if name == "aqi":
+        stages.append(("build_aqi_cube", AQICube.from_frame))
+
+    stages += [
+        ("handle_duplicates", lambda df: engine.handle_duplicates(df, DUPLICATE_SUBSETS[name], name.upper())),
+        ("csv_write", lambda df: engine.export_rows(df, os.path.join(work_dir, f"cleaned_{name}.csv"))),
+    ]
+    return stages
+
+
+# ⏱️ Measurement
+def measure(func: Callable[[Any], Any], setup: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Best-of-repeat wall time, plus traced peak memory from one extra run
+
+    setup() builds the stage input and is excluded from both measurements.
+    Timing runs are made without tracemalloc, which slows allocation-heavy code.
+    """
+    timings = []
+    for _ in range(repeat):
+        arg = setup()
+        gc.collect()
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+        del arg
+
+    arg = setup()
+    gc.collect()
+    tracemalloc.start()
+    baseline_bytes = tracemalloc.get_traced_memory()[0]
+    func(arg)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+        "peak_mb": max(peak_bytes - baseline_bytes, 0) / (1024**2),
+    }
+
+
+def benchmark_dataset(name: str, path: str, work_dir: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Measure every stage of one dataset on the CSV at path"""
+    def read(_):
+        engine._ENCODING_CACHE.clear()
+        return engine.safe_read_csv(path, schema=name)
+
+    results = {"safe_read_csv": measure(read, lambda: None, repeat)}
+    df = read(None)
+    for stage, func in dataset_stages(name, work_dir):
+        results[stage] = measure(func, df.copy, repeat)
+    return results
+
+
+# 📏 Baselines
+def baseline_path(baseline_dir: str, size: str) -> str:
+    return os.path.join(baseline_dir, f"baseline_{size}.json")
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def find_regressions(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    memory_tolerance: float,
+) -> List[str]:
+    """Stages whose time or peak memory exceeds the baseline by more than the tolerance"""
+    regressions = []
+    for dataset, stages in current["results"].items():
+        for stage, metrics in stages.items():
+            reference = baseline.get("results", {}).get(dataset, {}).get(stage)
+            if reference is None:
+                continue
+            checks = [
+                ("seconds", tolerance, MIN_SECONDS),
+                ("peak_mb", memory_tolerance, MIN_PEAK_MB),
+            ]
+            for metric, allowed, floor in checks:
+                limit = max(reference[metric], floor) * (1 + allowed)
+                if metrics[metric] > limit:
+                    regressions.append(
+                        f"{dataset}.{stage}: {metric} {metrics[metric]:.3f} > {limit:.3f} "
+                        f"(baseline {reference[metric]:.3f}, tolerance {allowed:.0%})"
+                    )
+    return regressions
+
+
+# 🚀 Runner
+def run_size(size: str, datasets: List[str], data_dir: str, seed: int, repeat: int) -> Dict[str, Any]:
+    rows = SIZES[size]
+    run = {
+        "size": size,
+        "rows": rows,
+        "seed": seed,
+        "repeat": repeat,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.platform(),
+        "results": {},
+    }
+
+    # Exports are written synchronously so each stage's time includes its disk writes
+    with tempfile.TemporaryDirectory() as work_dir, engine_config(inconsistency_dir=work_dir, async_exports=False):
+        for name in datasets:
+            path = ensure_synthetic_csv(data_dir, name, rows, seed)
+            print(f"⏱️ {size} {name}: {path}")
+            run["results"][name] = benchmark_dataset(name, path, work_dir, repeat)
+    return run
+
+
+def print_results(run: Dict[str, Any]):
+    print(f"\n📊 {run['size']} ({run['rows']:,} rows, best of {run['repeat']})")
+    print(f"{'dataset':<8} {'stage':<30} {'seconds':>10} {'peak MB':>10}")
+    for dataset, stages in run["results"].items():
+        for stage, metrics in stages.items():
+            print(f"{dataset:<8} {stage:<30} {metrics['seconds']:>10.3f} {metrics['peak_mb']:>10.1f}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the cleaning pipeline stages on synthetic data")
+    parser.add_argument("--sizes", nargs="+", default=["10k"], choices=list(SIZES))
+    parser.add_argument("--datasets", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where generated CSVs are cached")
+    parser.add_argument("--baseline-dir", default=BASELINE_DIR)
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="fail if a size has no stored baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+
+    if args.check and not args.save_baseline:
+        missing = [baseline_path(args.baseline_dir, size) for size in args.sizes
+                   if load_baseline(baseline_path(args.baseline_dir, size)) is None]
+        if missing:
+            print("❌ --check needs a stored baseline; run with --save-baseline to create:")
+            for path in missing:
+                print(f"  {path}")
+            return 1
+
+    # Timings only mean something if the paths being timed still agree
+    regressions = [f"[consistency] {line}" for line in run_checks()]
+    runs = []
+    for size in args.sizes:
+        run = run_size(size, args.datasets, args.data_dir, args.seed, args.repeat)
+        print_results(run)
+        runs.append(run)
+
+        path = baseline_path(args.baseline_dir, size)
+        if args.save_baseline:
+            os.makedirs(args.baseline_dir, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(run, f, indent=2)
+            print(f"💾 Saved baseline: {path}")
+            continue
+
+        baseline = load_baseline(path)
+        if baseline is None:
+            print(f"⚠️ No baseline at {path}; run with --save-baseline to create one")
+            continue
+        regressions += [f"[{size}] {line}" for line in
+                        find_regressions(run, baseline, args.tolerance, args.memory_tolerance)]
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(runs, f, indent=2)
+
+    if regressions:
+        print("\n❌ Performance regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+
+    print("\n✅ No stage regressed beyond tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Seeded synthetic generators matching the raw IDSP, AQI, population-projection and vahan schemas
+
+The raw files under data/raw are not shipped, so benchmarks (and anyone
+reproducing a performance claim) generate look-alike data instead. Output is
+deterministic for a given seed and row count, and large sizes are written in
+blocks so generating 10M rows never holds the whole file in memory.
+
+Generated files include the quirks the cleaners look for: a few percent of
+inverted outbreak/reporting dates, deaths above cases, stale week numbers,
+exact duplicate rows and partial duplicates on the duplicate key.
+"""
+
+import os
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+RAW_DATE_FORMAT = "%d-%m-%Y"
+BLOCK_ROWS = 1_000_000
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+START_DATE = pd.Timestamp("2022-01-01")
+DAYS = 1_400
+
+STATES = ["Assam", "Bihar", "Delhi", "Gujarat", "Karnataka", "Kerala", "Maharashtra",
+          "Punjab", "Rajasthan", "Tamil Nadu", "Uttar Pradesh", "West Bengal"]
+AREAS_PER_STATE = 12
+DISEASES = ["Acute Diarrhoeal Disease", "Chikungunya", "Cholera", "Dengue", "Food Poisoning",
+            "Hepatitis A", "Malaria", "Measles", "Mumps", "Typhoid"]
+STATUSES = ["Under Control", "Under Surveillance"]
+POLLUTANT_COMBOS = ["PM2.5", "PM10", "O3", "PM2.5,PM10", "PM10,O3", "PM2.5,NO2", "CO", "PM10,NO2,O3", "SO2"]
+AQI_BANDS = [(50, "Good"), (100, "Satisfactory"), (200, "Moderate"), (300, "Poor"), (400, "Very Poor"), (501, "Severe")]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+GENDERS = ["Male", "Female", "Total"]
+VEHICLE_CLASSES = ["Motor Car", "M-Cycle/Scooter", "Goods Carrier", "Bus", "E-Rickshaw(P)", "Three Wheeler (Passenger)"]
+FUELS = ["PETROL", "DIESEL", "CNG ONLY", "ELECTRIC(BOV)", "PETROL/CNG", "STRONG HYBRID EV"]
+
+# Share of rows carrying each data-quality quirk
+QUIRK_RATES = {"inverted_dates": 0.03, "deaths_above_cases": 0.01, "stale_week": 0.05,
+               "exact_duplicates": 0.01, "partial_duplicates": 0.005}
+
+
+def format_dates(dates: pd.DatetimeIndex) -> np.ndarray:
+    """dd-mm-yyyy strings, formatted once per distinct day"""
+    codes, uniques = pd.factorize(dates)
+    return np.asarray(uniques.strftime(RAW_DATE_FORMAT), dtype=object)[codes]
+
+
+def random_dates(rng: np.random.Generator, n: int) -> pd.DatetimeIndex:
+    return START_DATE + pd.to_timedelta(rng.integers(0, DAYS, n), unit="D")
+
+
+def add_duplicates(df: pd.DataFrame, rng: np.random.Generator, key: list, value_col: str) -> pd.DataFrame:
+    """Replace some rows with exact copies, and others with key-only copies, of other rows"""
+    n = len(df)
+    take = np.arange(n)
+    exact = rng.choice(n, int(n * QUIRK_RATES["exact_duplicates"]), replace=False)
+    take[exact] = rng.choice(n, len(exact))
+    df = df.iloc[take].reset_index(drop=True)
+
+    partial = rng.choice(n, int(n * QUIRK_RATES["partial_duplicates"]), replace=False)
+    sources = rng.choice(n, len(partial))
+    for col in key:
+        values = df[col].to_numpy().copy()
+        values[partial] = values[sources]
+        df[col] = values
+    values = df[value_col].to_numpy().copy()
+    values[partial] = values[sources] + 1
+    df[value_col] = values
+    return df
+
+
+# 🧪 Dataset generators
+def generate_idsp(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    outbreak = random_dates(rng, n)
+    reporting = outbreak + pd.to_timedelta(rng.integers(0, 14, n), unit="D")
+
+    inverted = rng.random(n) < QUIRK_RATES["inverted_dates"]
+    outbreak, reporting = outbreak.where(~inverted, reporting), reporting.where(~inverted, outbreak)
+
+    week = np.asarray(reporting.isocalendar().week, dtype=np.int64)
+    stale = rng.random(n) < QUIRK_RATES["stale_week"]
+    week[stale] = np.maximum(week[stale] - 1, 1)
+
+    cases = rng.poisson(12, n)
+    deaths = rng.binomial(cases, 0.02)
+    above = rng.random(n) < QUIRK_RATES["deaths_above_cases"]
+    deaths[above] = cases[above] + rng.integers(1, 5, above.sum())
+
+    states = rng.choice(STATES, n)
+    df = pd.DataFrame({
+        "year": reporting.year,
+        "week": week,
+        "outbreak_starting_date": format_dates(outbreak),
+        "reporting_date": format_dates(reporting),
+        "state": states,
+        "district": np.char.add(states.astype(str), np.char.add(" District ", rng.integers(1, 30, n).astype(str))),
+        "disease_illness_name": rng.choice(DISEASES, n),
+        "status": rng.choice(STATUSES, n),
+        "cases": cases,
+        "deaths": deaths,
+        "unit": "Absolute",
+        "note": np.nan,
+    })
+    return add_duplicates(df, rng, ["reporting_date", "outbreak_starting_date", "state", "district",
+                                    "disease_illness_name"], "cases")
+
+
+def generate_aqi(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    states = rng.choice(STATES, n)
+    aqi_value = np.clip(rng.gamma(3.0, 45.0, n).astype(np.int64), 5, 500)
+    bounds = np.array([upper for upper, _ in AQI_BANDS])
+    labels = np.array([label for _, label in AQI_BANDS], dtype=object)
+
+    df = pd.DataFrame({
+        "date": format_dates(random_dates(rng, n)),
+        "state": states,
+        "area": np.char.add(states.astype(str), np.char.add(" Area ", rng.integers(1, AREAS_PER_STATE + 1, n).astype(str))),
+        "number_of_monitoring_stations": rng.integers(1, 40, n),
+        "prominent_pollutants": rng.choice(POLLUTANT_COMBOS, n),
+        "aqi_value": aqi_value,
+        "air_quality_status": labels[np.searchsorted(bounds, aqi_value, side="right")],
+        "unit": "number_of_monitoring_stations in Absolute Number",
+        "note": np.nan,
+    })
+    return add_duplicates(df, rng, ["date", "state", "area"], "aqi_value")
+
+
+def generate_pp(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "year": rng.integers(2011, 2037, n),
+        "month": rng.choice(MONTHS, n),
+        "state": rng.choice(STATES, n),
+        "gender": rng.choice(GENDERS, n),
+        "value": rng.integers(1_000, 250_000, n),
+        "unit": "value in Thousands",
+        "note": np.nan,
+    })
+    return add_duplicates(df, rng, ["year", "month", "state", "gender"], "value")
+
+
+def generate_vahan(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    states = rng.choice(STATES, n)
+    df = pd.DataFrame({
+        "year": rng.integers(2019, 2026, n),
+        "month": rng.choice(MONTHS, n),
+        "state": states,
+        "rto": np.char.add(states.astype(str), np.char.add(" RTO ", rng.integers(1, 60, n).astype(str))),
+        "vehicle_class": rng.choice(VEHICLE_CLASSES, n),
+        "fuel": rng.choice(FUELS, n),
+        "value": rng.poisson(150, n),
+        "unit": "value in Absolute Number",
+        "note": np.nan,
+    })
+    return add_duplicates(df, rng, ["year", "month", "state", "rto", "vehicle_class", "fuel"], "value")
+
+
+GENERATORS: Dict[str, Callable[[int, int], pd.DataFrame]] = {
+    "idsp": generate_idsp,
+    "aqi": generate_aqi,
+    "pp": generate_pp,
+    "vahan": generate_vahan,
+}
+
+
+# 💾 Writing
+def write_synthetic_csv(name: str, rows: int, path: str, seed: int = 0, block_rows: int = BLOCK_ROWS) -> str:
+    """Write `rows` synthetic rows of dataset `name` to path, one block at a time
+
+    Block i is generated with seed + i, so the file is fully determined by
+    (rows, seed, block_rows).
+    """
+    generator = GENERATORS[name]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+
+    written = 0
+    block = 0
+    while written < rows:
+        size = min(block_rows, rows - written)
+        generator(size, seed + block).to_csv(tmp_path, mode="a" if block else "w", header=block == 0, index=False)
+        written += size
+        block += 1
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def synthetic_path(data_dir: str, name: str, rows: int, seed: int = 0) -> str:
+    return os.path.join(data_dir, f"{name}_{rows}_seed{seed}.csv")
+
+
+def ensure_synthetic_csv(data_dir: str, name: str, rows: int, seed: int = 0) -> str:
+    """Path to a generated file, writing it on first use"""
+    path = synthetic_path(data_dir, name, rows, seed)
+    if not os.path.exists(path):
+        write_synthetic_csv(name, rows, path, seed)
+    return path
@@ -8,40 +8,68 @@ Modules:
     - validators: Data validation utilities
     - transformers: Data transformation utilities
     - io_utils: Input/output utilities
+    - aqi_cube: Pre-aggregated AQI rollups and queries
+    - pollutants: Bitmask encoding and rankings of prominent pollutants
+    - geography: Integer state/place keys and canonical names through a name-alias index
+    - joins: AQI, IDSP, population and vahan fact table at week/month grain
+    - risk: City Risk Score under many weighting scenarios at once
+    - trends: Rolling, seasonal, trend and changepoint analytics per AQI area
+    - report_server: Local HTTP query service over the AQI cube for dashboards
+    - cli: Command-line entry point (python -m src.data clean|profile|validate-only|dry-run)
 
 Author: Sadiq (Solo Data Analyst)
 Date: July 13, 2025
 """
 
-from .pipeline import (
-    DataCleaningPipeline,
-    run_cleaning_pipeline,
-    clean_idsp_dataset,
-    clean_aqi_dataset,
-    clean_population_dataset,
-    clean_vahan_dataset
-)
+import importlib
+
+# Public names and the submodule defining each. Submodules (and pandas) are
+# imported on first attribute access (PEP 562), so `import src.data` is cheap.
+_LAZY_EXPORTS = {
+    "DataCleaningPipeline": "pipeline",
+    "run_cleaning_pipeline": "pipeline",
+    "clean_idsp_dataset": "pipeline",
+    "clean_aqi_dataset": "pipeline",
+    "clean_population_dataset": "pipeline",
+    "clean_vahan_dataset": "pipeline",
+    "validate_dataframe_structure": "validators",
+    "check_logical_consistency": "validators",
+    "validate_date_columns": "validators",
+    "detect_outliers": "validators",
+    "standardize_dates": "transformers",
+    "handle_missing_values": "transformers",
+    "normalize_text_columns": "transformers",
+    "derive_date_features": "transformers",
+    "safe_read_csv": "io_utils",
+    "detect_encoding": "io_utils",
+    "export_data_quality_report": "io_utils",
+    "save_cleaned_data": "io_utils",
+    "AQICube": "aqi_cube",
+    "encode_pollutant_column": "pollutants",
+    "pollutant_counts": "pollutants",
+    "top_bottom_pollutants": "pollutants",
+    "GeoIndex": "geography",
+    "canonicalize_geography": "geography",
+    "build_fact_table": "joins",
+    "load_fact_table": "joins",
+    "RiskModel": "risk",
+    "AQITrends": "trends",
+    "ReportService": "report_server",
+    "serve": "report_server",
+}
 
-from .validators import (
-    validate_dataframe_structure,
-    check_logical_consistency,
-    validate_date_columns,
-    detect_outliers
-)
 
-from .transformers import (
-    standardize_dates,
-    handle_missing_values,
-    normalize_text_columns,
-    derive_date_features
-)
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
 
-from .io_utils import (
-    safe_read_csv,
-    detect_encoding,
-    export_data_quality_report,
-    save_cleaned_data
-)
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
 __version__ = "1.0.0"
 __author__ = "Sadiq (Solo Data Analyst)"
@@ -84,6 +112,20 @@ __all__ = [
     "export_data_quality_report",
     "save_cleaned_data",
     
+    # Analysis
+    "AQICube",
+    "encode_pollutant_column",
+    "pollutant_counts",
+    "top_bottom_pollutants",
+    "GeoIndex",
+    "canonicalize_geography",
+    "build_fact_table",
+    "load_fact_table",
+    "RiskModel",
+    "AQITrends",
+    "ReportService",
+    "serve",
+    
     # Configuration
     "DEFAULT_CONFIG",
 ]
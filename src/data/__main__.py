@@ -0,0 +1,7 @@
+"""Run the cleaning pipeline CLI: python -m src.data --help"""
+
+import sys
+
+from src.data.cli import main
+
+sys.exit(main())
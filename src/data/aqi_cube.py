@@ -0,0 +1,344 @@
+"""
+Pre-aggregated AQI rollup cube
+
+Readings are rolled up once over state × area × prominent pollutant at day,
+ISO-week and month grain, keeping additive measures (reading count, AQI and
+monitoring-station sums, one count per air-quality status) plus AQI min/max.
+Queries group and filter those small tables instead of rescanning the cleaned
+file; means and shares are derived from the sums and counts. Calendar
+attributes (weekday, weekend, year, ...) come from the shared date dimension.
+
+New days are folded in with update(), which re-aggregates only the periods
+the new rows touch.
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.dates import DATE_DIMENSION_COLUMNS, lookup_date_features
+
+from .pollutants import POLLUTANT_COLUMN, pollutant_counts, rank_pollutants
+
+DIMENSIONS = ["state", "area", POLLUTANT_COLUMN]
+GRAINS = ["day", "week", "month"]
+PERIOD = "period"
+STATUS_PREFIX = "status_"
+
+# Date-dimension attributes that are constant within one period of each grain
+GRAIN_ATTRIBUTES = {
+    "day": DATE_DIMENSION_COLUMNS,
+    "week": ["iso_year", "iso_week"],
+    "month": ["year", "month", "month_name", "is_post_covid"],
+}
+
+SUM_MEASURES = ["count", "aqi_sum", "stations_sum"]
+MIN_MEASURES = ["aqi_min"]
+MAX_MEASURES = ["aqi_max"]
+
+
+def status_column(status: str) -> str:
+    """Measure name for an air-quality status ("Very Poor" -> "status_very_poor")"""
+    return STATUS_PREFIX + re.sub(r"\W+", "_", str(status).strip().lower()).strip("_")
+
+
+def period_start(periods: pd.Series, grain: str) -> pd.Series:
+    """Day, Monday of the ISO week or first of the month (computed on day numbers)"""
+    days = periods.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    if grain == "week":
+        # Day 0 (1970-01-01) was a Thursday, so Monday-based weekday = (day + 3) % 7
+        days = days - (days.view("int64") + 3) % 7
+    elif grain == "month":
+        days = days.astype("datetime64[M]").astype("datetime64[D]")
+    return pd.Series(days.astype("datetime64[ns]"), index=periods.index, name=periods.name)
+
+
+# 🧮 Aggregation
+def aggregate_readings(
+    df: pd.DataFrame,
+    date_column: str = "date",
+    value_column: str = "aqi_value",
+    stations_column: str = "number_of_monitoring_stations",
+    status_column_name: str = "air_quality_status",
+) -> pd.DataFrame:
+    """Day-grain cube rows for raw readings, in one groupby"""
+    keys = [col for col in DIMENSIONS if col in df.columns]
+    frame = pd.DataFrame({PERIOD: period_start(df[date_column], "day")}, index=df.index)
+    for col in keys:
+        frame[col] = df[col].astype("category")
+    frame["count"] = 1
+    frame["aqi_sum"] = df[value_column].astype("float64")
+    frame["aqi_min"] = frame["aqi_sum"]
+    frame["aqi_max"] = frame["aqi_sum"]
+    frame["stations_sum"] = df[stations_column].astype("float64") if stations_column in df.columns else np.nan
+
+    if status_column_name in df.columns:
+        codes, statuses = pd.factorize(df[status_column_name])
+        for code, status in enumerate(statuses):
+            frame[status_column(status)] = (codes == code).astype(np.int64)
+    return combine(frame, [PERIOD] + keys)
+
+
+def combine(table: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Roll cube rows up to keys (sums add, min/max of min/max)"""
+    measures = [col for col in table.columns if col not in keys and col not in DIMENSIONS and col != PERIOD]
+    how = {col: "min" if col in MIN_MEASURES else "max" if col in MAX_MEASURES else "sum" for col in measures}
+    if not keys:
+        return table[measures].agg(how).to_frame().T
+
+    # Group on one mixed-radix int64 key built from per-column codes (dimension
+    # columns are categorical, so their codes come for free)
+    codes, uniques = zip(*(pd.factorize(table[col], sort=True, use_na_sentinel=False) for col in keys))
+    key = np.zeros(len(table), dtype=np.int64)
+    for col_codes, col_uniques in zip(codes, uniques):
+        key = key * len(col_uniques) + col_codes
+    result = table[measures].groupby(key, sort=True).agg(how)
+
+    decoded = {}
+    remainder = result.index.to_numpy()
+    for col, col_uniques in reversed(list(zip(keys, uniques))):
+        remainder, col_codes = np.divmod(remainder, len(col_uniques))
+        decoded[col] = col_uniques.take(col_codes)
+    return pd.concat([pd.DataFrame({col: decoded[col] for col in keys}), result.reset_index(drop=True)], axis=1)
+
+
+def concat_cells(tables: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate cube rows, unifying the categories of dimension columns"""
+    for col in DIMENSIONS:
+        if all(col in table.columns for table in tables):
+            categories = pd.Index(pd.unique(np.concatenate(
+                [np.asarray(table[col].astype("category").cat.categories, dtype=object) for table in tables])))
+            tables = [table.assign(**{col: pd.Categorical(table[col], categories=categories)}) for table in tables]
+    return pd.concat(tables, ignore_index=True)
+
+
+def _status_columns(table: pd.DataFrame) -> List[str]:
+    return [col for col in table.columns if col.startswith(STATUS_PREFIX)]
+
+
+# 🧊 Cube
+class AQICube:
+    """Day/week/month rollups of AQI readings with a small query API"""
+
+    def __init__(self, tables: Optional[Dict[str, pd.DataFrame]] = None, meta: Optional[Dict[str, Any]] = None):
+        self.tables = tables or {}
+        self.meta = meta or {}
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "AQICube":
+        cube = cls()
+        cube.update(df)
+        return cube
+
+    @property
+    def empty(self) -> bool:
+        return not self.tables or self.tables["day"].empty
+
+    def update(self, df: pd.DataFrame) -> "AQICube":
+        """Fold new readings in, re-aggregating only the periods they touch"""
+        if df is None or len(df) == 0:
+            return self
+        return self.merge([aggregate_readings(df)])
+
+    def merge(self, parts: List[pd.DataFrame]) -> "AQICube":
+        """Fold day-grain rows from aggregate_readings (e.g. one part per streamed chunk) in"""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return self
+        self._indexes = {}
+        day = parts[0]
+        keys = [col for col in DIMENSIONS if col in day.columns]
+        if len(parts) > 1:
+            day = combine(concat_cells(parts), [PERIOD] + keys)
+        for grain in GRAINS:
+            delta = day if grain == "day" else combine(day.assign(**{PERIOD: period_start(day[PERIOD], grain)}),
+                                                       [PERIOD] + keys)
+            existing = self.tables.get(grain)
+            if existing is None or existing.empty:
+                self.tables[grain] = delta
+                continue
+            touched = existing[PERIOD].isin(delta[PERIOD]).to_numpy()
+            merged = combine(concat_cells([existing[touched], delta]), [PERIOD] + keys)
+            table = concat_cells([existing[~touched], merged])
+            self.tables[grain] = table.sort_values([PERIOD] + keys, kind="stable", ignore_index=True)
+
+        for grain, table in self.tables.items():
+            status = sorted(_status_columns(table))
+            table = table[[col for col in table.columns if col not in status] + status]
+            self.tables[grain] = table.assign(**{col: table[col].fillna(0).astype(np.int64) for col in status})
+
+        periods = self.tables["day"][PERIOD]
+        self.meta.update({
+            "rows": int(self.tables["day"]["count"].sum()),
+            "first_day": None if periods.isna().all() else periods.min().isoformat(),
+            "last_day": None if periods.isna().all() else periods.max().isoformat(),
+            "updated": datetime.now().isoformat(),
+        })
+        logging.info(f"🧊 AQI cube: +{int(day['count'].sum())} readings, "
+                     + ", ".join(f"{grain} {len(table)} cells" for grain, table in self.tables.items()))
+        return self
+
+    # Indexes
+    def index(self, grain: str) -> Dict[str, Any]:
+        """In-memory index of a grain's cells, built on first use
+
+        Each dimension maps its values to the sorted positions of their cells;
+        PERIOD holds the cells' days as int64 (cells are sorted by period, so
+        a date range is a searchsorted slice).
+        """
+        if grain not in self._indexes:
+            table = self.tables[grain]
+            index: Dict[str, Any] = {}
+            for col in DIMENSIONS:
+                if col not in table.columns:
+                    continue
+                codes, uniques = pd.factorize(table[col])
+                order = np.argsort(codes, kind="stable")
+                bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+                index[col] = {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)}
+            periods = table[PERIOD].to_numpy(dtype="datetime64[ns]").view("int64")
+            index[PERIOD] = periods if (np.diff(periods) >= 0).all() else None
+            self._indexes[grain] = index
+        return self._indexes[grain]
+
+    def select(self, grain: str, filters: Dict[str, Any], start=None, end=None) -> np.ndarray:
+        """Sorted positions of a grain's cells matching dimension filters and day bounds"""
+        index = self.index(grain)
+        table = self.tables[grain]
+        periods = index[PERIOD]
+        low, high = 0, len(table)
+        if periods is not None:
+            if start is not None:
+                low = np.searchsorted(periods, pd.Timestamp(start).value, side="left")
+            if end is not None:
+                high = np.searchsorted(periods, pd.Timestamp(end).value, side="right")
+
+        rows = None
+        for col, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            hits = [index[col].get(item) for item in values if item in index[col]]
+            matched = np.sort(np.concatenate(hits)) if hits else np.array([], dtype=np.intp)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        rows = np.arange(low, high) if rows is None else rows[(rows >= low) & (rows < high)]
+
+        if periods is None and (start is not None or end is not None):
+            days = table[PERIOD].iloc[rows]
+            keep = np.ones(len(rows), dtype=bool)
+            if start is not None:
+                keep &= (days >= pd.Timestamp(start)).to_numpy()
+            if end is not None:
+                keep &= (days <= pd.Timestamp(end)).to_numpy()
+            rows = rows[keep]
+        return rows
+
+    # Queries
+    def _grain_for(self, attributes: List[str], dated: bool) -> str:
+        """Coarsest grain that can answer the requested calendar attributes and date bounds"""
+        if dated:
+            return "day"
+        for grain in ["month", "week", "day"]:
+            if all(attr in GRAIN_ATTRIBUTES[grain] for attr in attributes):
+                return grain
+        return "day"
+
+    def query(
+        self,
+        by: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        grain: Optional[str] = None,
+        start=None,
+        end=None,
+    ) -> pd.DataFrame:
+        """Measures grouped by dimensions, "period" and/or date-dimension attributes
+
+        filters maps a dimension or attribute to a value or list of values;
+        start/end bound the day (inclusive) and force day grain. The grain is
+        the coarsest one that can answer the query unless given.
+        """
+        by = list(by or [])
+        filters = dict(filters or {})
+        attributes = [col for col in by + list(filters) if col in DATE_DIMENSION_COLUMNS]
+        unknown = [col for col in by + list(filters) if col not in DIMENSIONS + [PERIOD] + DATE_DIMENSION_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown cube columns: {unknown}")
+
+        dated = start is not None or end is not None
+        grain = grain or self._grain_for(attributes, dated)
+        if grain not in GRAINS:
+            raise ValueError(f"grain must be one of {GRAINS}, got {grain}")
+        unsupported = [attr for attr in attributes if attr not in GRAIN_ATTRIBUTES[grain]]
+        if unsupported or (dated and grain != "day"):
+            raise ValueError(f"{grain} grain cannot answer {unsupported or 'start/end bounds'}")
+        if self.empty:
+            return pd.DataFrame(columns=by + ["count"])
+
+        # Dimension filters and day bounds go through the index; calendar
+        # attributes are looked up for the selected cells only
+        dimension_filters = {col: value for col, value in filters.items() if col in DIMENSIONS}
+        table = self.tables[grain]
+        rows = self.select(grain, dimension_filters, start, end)
+        if len(rows) < len(table):
+            table = table.take(rows)
+        if attributes:
+            table = pd.concat([table, lookup_date_features(table[PERIOD], sorted(set(attributes)))], axis=1)
+
+        keep = np.ones(len(table), dtype=bool)
+        for col, value in filters.items():
+            if col in DIMENSIONS:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            keep &= table[col].isin(values).to_numpy()
+
+        result = combine(table[keep].drop(columns=[col for col in attributes if col not in by]), by)
+        result["aqi_mean"] = result["aqi_sum"] / result["count"].where(result["count"] > 0)
+        return result
+
+    def share(self, by: List[str], of: str, measure: str = "count", **query_kwargs) -> pd.DataFrame:
+        """Percentage of measure per `of` value within each group of `by` (wide, one column per value)"""
+        table = self.query(by=by + [of], **query_kwargs)
+        wide = table.pivot_table(index=by, columns=of, values=measure, aggfunc="sum", fill_value=0, observed=True)
+        return wide.div(wide.sum(axis=1), axis=0) * 100
+
+    def pollutants(self, by: Optional[List[str]] = None, top: Optional[int] = None, **query_kwargs) -> pd.DataFrame:
+        """Readings naming each individual pollutant per group (or its top/bottom-`top` ranking)
+
+        Cube cells are per pollutant combination; combinations are split via
+        the pollutant bitmask, weighted by each cell's reading count.
+        """
+        by = list(by or [])
+        cells = self.query(by=by + [POLLUTANT_COLUMN], **query_kwargs)
+        counts = pollutant_counts(cells, by, weights="count").astype(np.int64)
+        return counts if top is None else rank_pollutants(counts, top)
+
+    # Persistence
+    def save(self, directory: str) -> List[str]:
+        """Write each grain as Parquet plus a JSON metadata file; returns the paths"""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for grain, table in self.tables.items():
+            path = os.path.join(directory, f"aqi_{grain}.parquet")
+            table.to_parquet(path, index=False)
+            paths.append(path)
+        meta_path = os.path.join(directory, "aqi_cube.json")
+        with open(meta_path, "w") as f:
+            json.dump({**self.meta, "grains": {grain: len(table) for grain, table in self.tables.items()}}, f, indent=2)
+        return paths + [meta_path]
+
+    @classmethod
+    def load(cls, directory: str) -> "AQICube":
+        """A saved cube, or an empty one if none is stored in directory"""
+        meta_path = os.path.join(directory, "aqi_cube.json")
+        if not os.path.exists(meta_path):
+            return cls()
+        with open(meta_path) as f:
+            meta = json.load(f)
+        tables = {grain: pd.read_parquet(os.path.join(directory, f"aqi_{grain}.parquet"))
+                  for grain in GRAINS if grain in meta.get("grains", {})}
+        return cls(tables, meta)
@@ -0,0 +1,347 @@
+"""
+Command-line interface for the cleaning pipeline
+
+    python -m src.data clean [--datasets idsp aqi] [--incremental] [--workers 4] [--set chunk_size=50000]
+    python -m src.data profile --datasets aqi [--streaming] [--json]
+    python -m src.data validate-only [--strict]
+    python -m src.data dry-run [--path idsp=/tmp/idsp.csv]
+
+Every subcommand takes dataset selection (--datasets), raw file locations
+(--data-dir, --path name=PATH) and CONFIG overrides (--set key=value, the
+value parsed as JSON when it parses).
+
+Startup imports only the standard library. pandas and the engine are
+imported inside the subcommands that read data, so --help and argument
+errors return at interpreter speed. dry-run checks raw inputs against the
+manifest with src.utils.inputs and imports the engine only when it has to:
+to apply --set or --incremental, or to compare the cache settings of an
+input that is otherwise unchanged.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Make the repository root importable when run as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.utils.inputs import (
+    DEFAULT_CLEANED_DIR,
+    RAW_FILES,
+    input_unchanged,
+    load_manifest,
+    outputs_exist,
+    raw_file_paths,
+)
+
+DATASETS = list(RAW_FILES)
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
+
+# 🏷️ Argument types
+def parse_setting(text: str) -> Tuple[str, Any]:
+    """key=value for a CONFIG override (value parsed as JSON, else kept as a string)"""
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {text!r}")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def parse_path(text: str) -> Tuple[str, str]:
+    """name=PATH for a dataset's raw CSV"""
+    name, sep, path = text.partition("=")
+    if not sep or name not in RAW_FILES:
+        raise argparse.ArgumentTypeError(f"expected one of {DATASETS} as name=PATH, got {text!r}")
+    return name, path
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--datasets", nargs="+", choices=DATASETS, default=DATASETS, help="datasets to process (default: all)")
+    common.add_argument("--data-dir", default=None, help="directory of the raw CSVs (default: data/raw)")
+    common.add_argument("--path", action="append", type=parse_path, default=[], metavar="NAME=PATH",
+                        help="raw CSV for one dataset (repeatable)")
+    common.add_argument("--set", action="append", type=parse_setting, default=[], metavar="KEY=VALUE",
+                        dest="settings", help="override a CONFIG setting (repeatable)")
+    common.add_argument("--log-level", choices=LOG_LEVELS, default=None)
+
+    caching = argparse.ArgumentParser(add_help=False)
+    caching.add_argument("--incremental", action="store_true", default=None,
+                         help="append only new IDSP/AQI rows past the stored watermark")
+    caching.add_argument("--no-cache", action="store_true", help="reprocess datasets even if unchanged")
+
+    streaming = argparse.ArgumentParser(add_help=False)
+    streaming.add_argument("--streaming", action="store_true", default=None, help="read in CONFIG chunk_size chunks")
+
+    parser = argparse.ArgumentParser(prog="python -m src.data", description="AirPure data cleaning pipeline")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    clean = commands.add_parser("clean", parents=[common, caching, streaming],
+                                help="clean datasets and write the cleaned store")
+    clean.add_argument("--workers", type=int, default=None, help="process datasets in parallel when > 1")
+
+    profile = commands.add_parser("profile", parents=[common, streaming], help="profile raw datasets without cleaning")
+    profile.add_argument("--json", action="store_true", help="print the full profiles as JSON")
+
+    validate = commands.add_parser("validate-only", parents=[common],
+                                   help="check structure, rules and duplicates without writing anything")
+    validate.add_argument("--strict", action="store_true", help="also fail on rule violations and duplicates")
+    validate.add_argument("--json", action="store_true", help="print the findings as JSON")
+
+    dry_run = commands.add_parser("dry-run", parents=[common, caching],
+                                  help="show which datasets clean would process or reuse from the cache")
+    dry_run.add_argument("--json", action="store_true", help="print the plan as JSON")
+    return parser
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    return build_parser().parse_args(argv)
+
+
+# ⚙️ Setup
+def dataset_paths(args: argparse.Namespace) -> Dict[str, str]:
+    """Raw CSV of each selected dataset, in processing order"""
+    paths = {**raw_file_paths(args.data_dir), **dict(args.path)}
+    return {name: paths[name] for name in DATASETS if name in args.datasets}
+
+
+def settings(args: argparse.Namespace) -> Dict[str, Any]:
+    """CONFIG overrides from --set and the dedicated flags"""
+    overrides = dict(args.settings)
+    if args.log_level:
+        overrides["log_level"] = args.log_level
+    if getattr(args, "no_cache", False):
+        overrides["use_cache"] = False
+    return overrides
+
+
+def configured_engine(overrides: Dict[str, Any]):
+    """The cleaning engine (imports pandas) with CONFIG overrides applied"""
+    from src.data import enhanced_data_cleaning_pipeline as engine
+
+    unknown = sorted(set(overrides) - set(engine.CONFIG))
+    if unknown:
+        raise ValueError(f"Unknown settings {unknown}; expected some of {sorted(engine.CONFIG)}")
+    engine.CONFIG.update(overrides)
+    return engine
+
+
+def output_dir(overrides: Dict[str, Any]) -> str:
+    """Cleaned output directory the engine would use (CONFIG output_dir is relative to src/data)"""
+    if "output_dir" in overrides:
+        return os.path.join(os.path.dirname(DEFAULT_CLEANED_DIR), overrides["output_dir"])
+    return DEFAULT_CLEANED_DIR
+
+
+def console_logging(engine):
+    """Log to stderr only; profile and validate-only leave no log files behind"""
+    logging.basicConfig(level=getattr(logging, engine.CONFIG["log_level"]),
+                        format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stderr)
+
+
+def print_json(payload: Any):
+    print(json.dumps(payload, indent=2, default=str))
+
+
+# 🧹 clean
+def run_clean(args: argparse.Namespace) -> int:
+    engine = configured_engine(settings(args))
+    # setup_environment creates the inconsistency directory under src/data; export there from any working directory
+    engine.CONFIG["inconsistency_dir"] = os.path.join(os.path.dirname(DEFAULT_CLEANED_DIR), engine.CONFIG["inconsistency_dir"])
+    results = engine.run_enhanced_cleaning_pipeline(
+        streaming=args.streaming,
+        max_workers=args.workers,
+        incremental=args.incremental,
+        datasets=args.datasets,
+        paths=dataset_paths(args),
+    )
+
+    if results["success"]:
+        cached = f" ({', '.join(results['datasets_cached'])} from cache)" if results["datasets_cached"] else ""
+        print(f"✅ Data cleaning pipeline completed successfully!{cached}")
+        return 0
+    print("❌ Data cleaning pipeline completed with errors:")
+    for error in results["errors"]:
+        print(f"  - {error}")
+    return 1
+
+
+# 📊 profile
+def run_profile(args: argparse.Namespace) -> int:
+    overrides = settings(args)
+    engine = configured_engine(overrides)
+    console_logging(engine)
+    engine.load_encoding_cache(os.path.join(output_dir(overrides), "encoding_cache.json"))
+    streaming = engine.CONFIG["streaming"] if args.streaming is None else args.streaming
+
+    profiles, failed = {}, []
+    for name, path in dataset_paths(args).items():
+        try:
+            if streaming:
+                profiles[name] = engine.profile_csv_streaming(path, name)
+            else:
+                profiles[name] = engine.profile_dataframe(engine.safe_read_csv(path, schema=name), name)
+        except Exception as e:
+            logging.error(f"Failed to profile {name}: {str(e)}")
+            failed.append(name)
+
+    if args.json:
+        print_json(profiles)
+    else:
+        for name, profile in profiles.items():
+            rows, columns = profile["shape"]
+            missing = sum(profile["missing_values"].values())
+            memory = f", {profile['memory_usage_mb']:.1f} MB" if "memory_usage_mb" in profile else ""
+            print(f"📊 {name}: {rows} rows, {columns} columns{memory}, "
+                  f"{missing} missing values, {profile['duplicate_rows']} duplicate rows")
+    return 1 if failed else 0
+
+
+# 🔍 validate-only
+def validate_dataset(engine, name: str, path: str) -> Dict[str, Any]:
+    """Structure, rule violation and duplicate findings for one raw dataset (nothing is written)"""
+    from src.data.pipeline import DUPLICATE_SUBSETS, EXPECTED_COLUMNS
+    from src.data.rules import CompiledRules
+    from src.utils.dedup import duplicate_masks
+
+    df = engine.safe_read_csv(path, schema=name)
+    expected = EXPECTED_COLUMNS[name]
+    compiled = CompiledRules(engine.dataset_rules(name), df.columns.tolist())
+    counts = compiled.rule_counts(compiled.evaluate(df))
+    subset = [col for col in DUPLICATE_SUBSETS[name] if col in df.columns]
+    exact, partial = duplicate_masks(engine.row_fingerprints(df), engine.row_fingerprints(df, subset))
+    return {
+        "rows": len(df),
+        "missing_columns": [col for col in expected if col not in df.columns],
+        "extra_columns": [col for col in df.columns if col not in expected],
+        "rule_violations": {rule["name"]: count for rule, count in zip(compiled.rules, counts)},
+        "exact_duplicates": int(exact.sum()),
+        "partial_duplicates": int(partial.sum()),
+    }
+
+
+def run_validate(args: argparse.Namespace) -> int:
+    overrides = settings(args)
+    engine = configured_engine(overrides)
+    console_logging(engine)
+    engine.load_encoding_cache(os.path.join(output_dir(overrides), "encoding_cache.json"))
+
+    findings, failed = {}, False
+    for name, path in dataset_paths(args).items():
+        try:
+            found = validate_dataset(engine, name, path)
+        except Exception as e:
+            findings[name] = {"error": str(e)}
+            failed = True
+            continue
+        findings[name] = found
+        dirty = any(found["rule_violations"].values()) or found["exact_duplicates"] or found["partial_duplicates"]
+        failed = failed or bool(found["missing_columns"]) or (args.strict and bool(dirty))
+
+    if args.json:
+        print_json(findings)
+        return 1 if failed else 0
+
+    for name, found in findings.items():
+        if "error" in found:
+            print(f"❌ {name}: {found['error']}")
+            continue
+        ok = not found["missing_columns"]
+        print(f"{'✅' if ok else '❌'} {name}: {found['rows']} rows, "
+              f"{found['exact_duplicates']} exact / {found['partial_duplicates']} partial duplicates")
+        if found["missing_columns"]:
+            print(f"  - missing columns: {', '.join(found['missing_columns'])}")
+        if found["extra_columns"]:
+            print(f"  - extra columns: {', '.join(found['extra_columns'])}")
+        for rule, count in found["rule_violations"].items():
+            if count:
+                print(f"  - {rule}: {count} rows violate")
+    return 1 if failed else 0
+
+
+# 🧭 dry-run
+def plan_dataset(name: str, path: str, manifest: Dict[str, Any], use_cache: bool) -> Dict[str, Any]:
+    """What clean would do with one dataset, from the manifest alone (settings are checked by the caller)"""
+    entry = manifest.get("datasets", {}).get(name)
+    plan = {"path": os.path.abspath(path), "action": "process", "reason": None,
+            "updated": entry.get("updated") if entry else None}
+    if not os.path.exists(path):
+        plan.update(action="fail", reason="raw file not found")
+    elif not use_cache:
+        plan["reason"] = "cache disabled"
+    elif not entry:
+        plan["reason"] = "not in the manifest"
+    elif not outputs_exist(entry):
+        plan["reason"] = "cleaned outputs missing"
+    elif not input_unchanged(path, entry.get("input")):
+        plan["reason"] = "raw input changed"
+    else:
+        plan.update(action="reuse", reason="unchanged since last run")
+    return plan
+
+
+def run_dry_run(args: argparse.Namespace) -> int:
+    overrides = settings(args)
+    # Overrides can change the cache key and incremental mode needs the engine's
+    # watermarked datasets; otherwise the manifest decides without pandas
+    engine = configured_engine(overrides) if overrides or args.incremental else None
+    manifest = load_manifest(output_dir(overrides))
+    use_cache = engine.CONFIG["use_cache"] if engine else True
+    plans = {name: plan_dataset(name, path, manifest, use_cache) for name, path in dataset_paths(args).items()}
+
+    # An unchanged input is only reused if its outputs were written under the current settings
+    if any(plan["action"] == "reuse" for plan in plans.values()):
+        engine = engine or configured_engine(overrides)
+        current = engine.cache_config_fingerprint()
+        for name, plan in plans.items():
+            if plan["action"] == "reuse" and manifest["datasets"][name].get("config") != current:
+                plan.update(action="process", reason="cache settings changed")
+
+    if engine is not None and (args.incremental or engine.CONFIG["incremental"]):
+        for name, plan in plans.items():
+            if plan["action"] == "process" and name in engine.INCREMENTAL_DATASETS:
+                plan["action"] = "append"
+
+    if args.json:
+        print_json(plans)
+    else:
+        icons = {"process": "🧹", "append": "📈", "reuse": "♻️", "fail": "❌"}
+        for name, plan in plans.items():
+            updated = f" (cleaned {plan['updated']})" if plan["updated"] and plan["action"] == "reuse" else ""
+            print(f"{icons[plan['action']]} {name}: {plan['action']} - {plan['reason']}{updated}")
+            print(f"  {plan['path']}")
+    return 1 if any(plan["action"] == "fail" for plan in plans.values()) else 0
+
+
+COMMANDS = {
+    "clean": run_clean,
+    "profile": run_profile,
+    "validate-only": run_validate,
+    "dry-run": run_dry_run,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    start = time.perf_counter()
+    try:
+        status = COMMANDS[args.command](args)
+    except ValueError as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        return 2
+    logging.info(f"⏱️ {args.command} finished in {time.perf_counter() - start:.2f}s")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
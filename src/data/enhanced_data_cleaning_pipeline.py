@@ -9,17 +9,66 @@ This enhanced version includes:
 - Comprehensive data validation
 - Memory optimization
 - Extended data profiling
+- Chunked streaming mode for files larger than memory
+- Process-pool mode that handles datasets in parallel
+- Typed Parquet output with a raw-input manifest cache
+- Memory-mapped Arrow IPC copies of the cleaned datasets, shared across readers
+- Schema registry applying categoricals, downcast integers and parsed dates at read time
+- Incremental, append-only ingestion of new IDSP weeks and AQI days
+- Pre-aggregated AQI rollup cube, updated as new days arrive
+- Background export queue for inconsistency reports and cleaned CSVs
 """
 
 import pandas as pd
 import numpy as np
+import io
 import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+import functools
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Any
-import chardet
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, Any, Iterator
+import codecs
+import mmap
 import warnings
 
+# Make the repository root importable when run as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.utils.dates import lookup_date_features
+from src.utils.dedup import FINGERPRINT_VERSION, DuplicateFinder, duplicate_masks, row_fingerprints, rows_in
+from src.utils.exports import ExportQueue, compressed_path, write_csv
+from src.utils.instrumentation import StageRecorder, instrument, instrument_iter, recording
+from src.utils.inputs import raw_file_paths
+from src.utils.instrumentation import stage as instrumented_stage
+from src.utils.profiling import profile_stats
+from src.utils.storage import (
+    arrow_path,
+    file_fingerprint,
+    input_unchanged,
+    load_manifest,
+    outputs_exist,
+    parquet_path,
+    save_manifest,
+    write_arrow_part,
+    write_parquet_dataset,
+)
+
+# Dataset-specific modules (AQI cube, geography index, rule compiler) are
+# imported inside the functions that use them, so e.g. cleaning only vahan
+# never loads the AQI cube or the gazetteer
+if TYPE_CHECKING:
+    from src.data.geography import GeoIndex
+
 warnings.filterwarnings("ignore")
 
 # 📋 Configuration
@@ -29,8 +78,31 @@ CONFIG = {
     "inconsistency_dir": "inconsistencies",
     "log_level": "INFO",
     "memory_threshold_mb": 1000,
+    "streaming": False,
+    "chunk_size": 100_000,
+    "max_workers": 1,  # >1 loads, profiles and cleans datasets in a process pool
+    "output_formats": ["csv", "parquet", "arrow"],  # "arrow": memory-mapped store read by storage.load_shared_dataset
+    "use_cache": True,  # skip datasets whose raw input matches the manifest
+    "profile_quantile_sample": None,  # rows sampled for approximate quartiles on large frames
+    "incremental": False,  # clean only rows past the stored watermark and append them
+    "trace_memory": False,  # record tracemalloc peaks per stage (slows allocation-heavy stages)
+    "metrics_prometheus": False,  # also write stage metrics in Prometheus text format
+    "rules_file": None,  # JSON file replacing rules.DATASET_RULES per dataset
+    "aqi_cube": True,  # materialise the AQI rollup cube (aqi_cube.AQICube) beside the cleaned outputs
+    "dedup_memory_mb": 256,  # streamed duplicate index spills hash partitions to disk past this size
+    "spill_dir": None,  # where spilled chunks and hash partitions go (system temp dir if None)
+    "async_exports": True,  # write CSV exports on background threads while cleaning continues
+    "export_workers": 1,  # export threads; writes to one file stay in order either way
+    "export_memory_mb": 128,  # queued export frames block the cleaner past this size
+    "export_compression": None,  # "gzip", "bz2", "xz" or "zstd" for CSV exports (suffix added)
+    "normalize_geography": True,  # map state/district spellings to canonical names (geography.GeoIndex)
+    "geo_match_threshold": 0.75,  # trigram similarity for approximate name matches; None = exact aliases only
 }
 
+# Settings that change cleaned output; editing any of them (or DATASET_SCHEMAS, or the rules) invalidates the cache
+CACHE_CONFIG_KEYS = ["inconsistency_threshold", "output_formats", "aqi_cube", "export_compression",
+                     "normalize_geography", "geo_match_threshold"]
+
 # 📁 Setup directories and logging
 def setup_environment():
     """Initialize directories and logging configuration"""
@@ -57,71 +129,359 @@ def setup_environment():
 # 📂 File path management
 def get_file_paths(base_dir: str) -> Dict[str, str]:
     """Get absolute file paths for all datasets"""
-    data_dir = os.path.join(base_dir, "../../data/raw")
-    return {
-        "aqi": os.path.join(data_dir, "aqi.csv"),
-        "idsp": os.path.join(data_dir, "idsp.csv"),
-        "pp": os.path.join(data_dir, "population_projection.csv"),
-        "vahan": os.path.join(data_dir, "vahan.csv"),
-    }
+    return raw_file_paths(os.path.join(base_dir, "../../data/raw"))
+
+# 🗂️ Dataset schemas (applied at read time)
+RAW_DATE_FORMAT = "%d-%m-%Y"
+
+DATASET_SCHEMAS = {
+    "idsp": {
+        "categories": ["state", "district", "disease_illness_name", "status", "unit"],
+        "integers": ["year", "week", "cases", "deaths"],
+        "dates": {"outbreak_starting_date": RAW_DATE_FORMAT, "reporting_date": RAW_DATE_FORMAT},
+    },
+    "aqi": {
+        "categories": ["state", "area", "prominent_pollutants", "air_quality_status", "unit"],
+        "integers": ["number_of_monitoring_stations", "aqi_value"],
+        "dates": {"date": RAW_DATE_FORMAT},
+    },
+    "pp": {
+        "categories": ["month", "state", "gender", "unit"],
+        "integers": ["year", "value"],
+        "dates": {},
+    },
+    "vahan": {
+        "categories": ["month", "state", "rto", "vehicle_class", "fuel", "unit"],
+        "integers": ["year", "value"],
+        "dates": {},
+    },
+}
+
+def get_schema(schema) -> Optional[Dict[str, Any]]:
+    """Resolve a dataset name or schema dict to a schema dict"""
+    if schema is None or isinstance(schema, dict):
+        return schema
+    return DATASET_SCHEMAS.get(schema)
+
+def object_memory_equivalent(series: pd.Series) -> int:
+    """Bytes the categorical series would use as an object column (deep)"""
+    categories = series.cat.categories
+    value_sizes = np.array([sys.getsizeof(value) for value in categories], dtype=np.int64)
+    codes = series.cat.codes.to_numpy()
+    present = codes >= 0
+    return int(len(series) * 8 + value_sizes[codes[present]].sum() + (~present).sum() * sys.getsizeof(np.nan))
+
+def parse_date_column(series: pd.Series, date_format: str) -> pd.Series:
+    """Parse dates once with an explicit format, inferring day-first only if the format matches nothing"""
+    parsed = pd.to_datetime(series, format=date_format, errors="coerce")
+    if parsed.isnull().all() and series.notna().any():
+        logging.warning(f"{series.name}: no values match {date_format}; inferring day-first dates")
+        parsed = pd.to_datetime(series, errors="coerce", dayfirst=True)
+    return parsed
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, Any], categorized: bool = False) -> pd.DataFrame:
+    """Downcast integers, parse dates and (unless already done by the reader) categorize
+
+    Memory saved per stage is recorded in df.attrs["memory_savings_mb"].
+    """
+    savings = {}
+    
+    categories = [col for col in schema.get("categories", []) if col in df.columns]
+    saved = 0
+    for col in categories:
+        if not categorized:
+            before = df[col].memory_usage(deep=True, index=False)
+            df[col] = df[col].astype("category")
+            saved += before - df[col].memory_usage(deep=True, index=False)
+        else:
+            saved += object_memory_equivalent(df[col]) - df[col].memory_usage(deep=True, index=False)
+    savings["categoricals"] = saved
+    
+    saved = 0
+    for col in schema.get("integers", []):
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            before = df[col].memory_usage(index=False)
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+            saved += before - df[col].memory_usage(index=False)
+    savings["integer_downcast"] = saved
+    
+    saved = 0
+    for col, date_format in schema.get("dates", {}).items():
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            before = df[col].memory_usage(deep=True, index=False)
+            df[col] = parse_date_column(df[col], date_format)
+            saved += before - df[col].memory_usage(deep=True, index=False)
+    savings["date_parsing"] = saved
+    
+    df.attrs["memory_savings_mb"] = {stage: bytes_ / (1024**2) for stage, bytes_ in savings.items()}
+    logging.info("Schema memory savings: " + ", ".join(
+        f"{stage} {mb:.2f} MB" for stage, mb in df.attrs["memory_savings_mb"].items()))
+    return df
+
+def schema_read_kwargs(path: str, encoding: str, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """read_csv dtype arguments so categorical columns never materialise as objects"""
+    if not schema:
+        return {}
+    header = pd.read_csv(path, encoding=encoding, nrows=0).columns
+    return {"dtype": {col: "category" for col in schema.get("categories", []) if col in header}}
 
 # 🔍 Enhanced encoding detection
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+LEGACY_ENCODINGS = ["cp1252", "latin1"]
+VALIDATION_BLOCK_BYTES = 16 * 1024 * 1024
+REGION_BYTES = 64 * 1024
+CHARDET_MIN_CONFIDENCE = 0.5
+
+# Detected encodings keyed by path, valid while size and mtime are unchanged
+_ENCODING_CACHE: Dict[str, Dict[str, Any]] = {}
+
+def load_encoding_cache(path: str):
+    """Seed the in-process encoding cache from a JSON file"""
+    try:
+        with open(path) as f:
+            _ENCODING_CACHE.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+def save_encoding_cache(path: str):
+    with open(path, "w") as f:
+        json.dump(_ENCODING_CACHE, f, indent=2)
+
+def cached_encoding(path: str) -> Optional[Dict[str, Any]]:
+    """Cache entry for path if its size and mtime still match"""
+    entry = _ENCODING_CACHE.get(os.path.abspath(path))
+    if entry is None:
+        return None
+    stat = os.stat(path)
+    if entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime_ns:
+        return None
+    return entry
+
+def first_invalid_byte(buf, encoding: str, start: int = 0) -> Optional[int]:
+    """Offset of the first byte that does not decode strictly, or None if all of buf[start:] does"""
+    decoder = codecs.getincrementaldecoder(encoding)("strict")
+    for offset in range(start, len(buf), VALIDATION_BLOCK_BYTES):
+        end = min(offset + VALIDATION_BLOCK_BYTES, len(buf))
+        try:
+            decoder.decode(buf[offset:end], final=end == len(buf))
+        except UnicodeDecodeError as e:
+            return offset + max(e.start, 0)
+    return None
+
+def is_ascii(buf, end: int) -> bool:
+    return all(bytes(buf[offset:min(offset + VALIDATION_BLOCK_BYTES, end)]).isascii()
+               for offset in range(0, end, VALIDATION_BLOCK_BYTES))
+
+def chardet_guess(sample: bytes) -> Optional[str]:
+    """Last-resort statistical guess; chardet is only imported when needed"""
+    try:
+        import chardet
+    except ImportError:
+        return None
+    result = chardet.detect(sample)
+    confidence = result.get("confidence") or 0
+    logging.info(f"chardet guess: {result.get('encoding')} (confidence: {confidence:.2f})")
+    return result.get("encoding") if confidence >= CHARDET_MIN_CONFIDENCE else None
+
+def detect_encoding_in_buffer(buf, start: int = 0) -> Tuple[str, str]:
+    """Pick an encoding that decodes all of buf, returning (encoding, method)
+
+    A BOM's encoding wins if it decodes the whole buffer, then strict UTF-8.
+    When UTF-8 fails, legacy encodings are validated from the failing region
+    onward (the bytes before it were ASCII, which every candidate decodes
+    identically), and chardet is asked about that region only if cp1252
+    cannot decode it. Whatever is returned decodes every byte, so callers
+    can parse the file once.
+    """
+    head = bytes(buf[:4])
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            if first_invalid_byte(buf, encoding) is None:
+                return encoding, "bom"
+            break
+    
+    failure = first_invalid_byte(buf, "utf-8", start)
+    if failure is None:
+        return "utf-8", "utf-8 validation"
+    
+    region_start = max(0, failure - REGION_BYTES // 2)
+    # A valid non-ASCII UTF-8 prefix means the whole file must be re-checked
+    check_from = region_start if is_ascii(buf, region_start) else 0
+    
+    def candidates():
+        yield LEGACY_ENCODINGS[0]
+        guess = chardet_guess(bytes(buf[region_start:region_start + REGION_BYTES]))
+        if guess:
+            yield guess
+        yield from LEGACY_ENCODINGS[1:]
+    
+    for encoding in candidates():
+        try:
+            if first_invalid_byte(buf, encoding, check_from) is None:
+                return encoding, f"validated from byte {check_from}"
+        except LookupError:
+            continue
+    return "latin1", "fallback"
+
 def detect_encoding(path: str) -> str:
-    """Detect file encoding with enhanced error handling"""
+    """Detect file encoding via BOM sniffing and strict validation over memory-mapped bytes
+
+    Results are cached per file fingerprint (path, size, mtime).
+    """
+    entry = cached_encoding(path)
+    if entry is not None:
+        logging.info(f"Detected encoding: {entry['encoding']} (cached)")
+        return entry["encoding"]
+    
     try:
-        with open(path, "rb") as f:
-            result = chardet.detect(f.read(100000))
-        encoding = result.get("encoding", "utf-8")
-        confidence = result.get("confidence", 0)
+        stat = os.stat(path)
+        if stat.st_size == 0:
+            return "utf-8"
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            encoding, method = detect_encoding_in_buffer(mm)
         
-        logging.info(f"Detected encoding: {encoding} (confidence: {confidence:.2f})")
+        _ENCODING_CACHE[os.path.abspath(path)] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "encoding": encoding,
+        }
+        logging.info(f"Detected encoding: {encoding} ({method})")
         return encoding
     except Exception as e:
         logging.warning(f"Encoding detection failed: {e}. Using utf-8 as fallback.")
         return "utf-8"
 
-def safe_read_csv(path: str) -> pd.DataFrame:
-    """Read CSV with multiple encoding fallbacks and validation"""
+def safe_read_csv(path: str, schema=None, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read CSV once, with an encoding detect_encoding validated over every byte
+
+    schema: dataset name in DATASET_SCHEMAS (or a schema dict) whose dtypes are
+    applied while reading. usecols: read only these columns.
+    """
     if not os.path.exists(path):
         raise FileNotFoundError(f"File not found: {path}")
     
-    encodings = [detect_encoding(path), "utf-8", "latin1", "cp1252"]
+    encoding = detect_encoding(path)
+    schema = get_schema(schema)
     
-    for encoding in encodings:
-        try:
-            df = pd.read_csv(path, encoding=encoding)
-            logging.info(f"Successfully read {path} with {encoding} encoding")
-            return df
-        except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            logging.error(f"Failed to read {path}: {e}")
-            raise
+    try:
+        df = pd.read_csv(path, encoding=encoding, usecols=usecols, **schema_read_kwargs(path, encoding, schema))
+    except UnicodeDecodeError as e:
+        # Every byte was validated, so the file changed after detection; re-detect next time
+        _ENCODING_CACHE.pop(os.path.abspath(path), None)
+        logging.error(f"Failed to read {path}: {e}")
+        raise ValueError(f"Could not read {path} with {encoding} encoding") from e
+    except Exception as e:
+        logging.error(f"Failed to read {path}: {e}")
+        raise
     
-    raise ValueError(f"Could not read {path} with any encoding")
+    logging.info(f"Successfully read {path} with {encoding} encoding")
+    return apply_schema(df, schema, categorized=True) if schema else df
+
+def iter_csv_chunks(path: str, chunk_size: Optional[int] = None, schema=None) -> Iterator[pd.DataFrame]:
+    """Yield a CSV in bounded chunks so peak memory follows chunk size, not file size"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+
+    chunk_size = chunk_size or CONFIG["chunk_size"]
+    encoding = detect_encoding(path)
+    schema = get_schema(schema)
+    logging.info(f"Streaming {path} in chunks of {chunk_size} rows ({encoding} encoding)")
+
+    with pd.read_csv(path, encoding=encoding, chunksize=chunk_size,
+                     **schema_read_kwargs(path, encoding, schema)) as reader:
+        for chunk in reader:
+            yield apply_schema(chunk, schema, categorized=True) if schema else chunk
 
 # 📊 Data profiling and validation
 def profile_dataframe(df: pd.DataFrame, name: str) -> Dict[str, Any]:
     """Generate comprehensive data profile"""
+    stats = profile_stats(df, quantile_sample=CONFIG["profile_quantile_sample"])
     profile = {
         "name": name,
         "shape": df.shape,
         "memory_usage_mb": df.memory_usage(deep=True).sum() / (1024**2),
-        "missing_values": df.isnull().sum().to_dict(),
-        "duplicate_rows": df.duplicated().sum(),
+        "missing_values": stats["missing_values"],
+        "duplicate_rows": stats["duplicate_rows"],
         "dtypes": df.dtypes.to_dict(),
-        "numeric_columns": df.select_dtypes(include=[np.number]).columns.tolist(),
+        "numeric_columns": stats["numeric_columns"],
         "datetime_columns": df.select_dtypes(include=['datetime64']).columns.tolist(),
         "object_columns": df.select_dtypes(include=['object']).columns.tolist(),
     }
     
     # Add basic statistics for numeric columns
     if profile["numeric_columns"]:
-        profile["numeric_stats"] = df[profile["numeric_columns"]].describe().to_dict()
+        profile["numeric_stats"] = stats["numeric_stats"]
+        profile["outlier_counts"] = stats["outlier_counts"]
+    
+    # Memory saved by the schema registry at read time
+    if "memory_savings_mb" in df.attrs:
+        profile["memory_savings_mb"] = dict(df.attrs["memory_savings_mb"])
     
     logging.info(f"Data profile for {name}: {profile['shape'][0]} rows, {profile['shape'][1]} columns")
     return profile
 
+class StreamingProfile:
+    """Accumulate a profile_dataframe-style profile one chunk at a time"""
+
+    def __init__(self, name: str, event_date_columns: Optional[List[str]] = None):
+        self.name = name
+        self.event_date_columns = event_date_columns
+        self.latest_event_date = None
+        self.rows = 0
+        self.columns: List[str] = []
+        self.dtypes: Dict[str, Any] = {}
+        self.missing = None
+        self.peak_chunk_mb = 0.0
+        self.seen_rows = HashSeenSet()
+        self.duplicate_rows = 0
+        self.memory_savings: Dict[str, float] = {}
+
+    def update(self, chunk: pd.DataFrame):
+        if not self.columns:
+            self.columns = chunk.columns.tolist()
+            self.dtypes = chunk.dtypes.to_dict()
+
+        missing = chunk.isnull().sum()
+        self.missing = missing if self.missing is None else self.missing.add(missing, fill_value=0)
+        self.rows += len(chunk)
+        self.peak_chunk_mb = max(self.peak_chunk_mb, chunk.memory_usage(deep=True).sum() / (1024**2))
+        self.duplicate_rows += int(self.seen_rows.check_and_add(row_fingerprints(chunk)).sum())
+        for stage, mb in chunk.attrs.get("memory_savings_mb", {}).items():
+            self.memory_savings[stage] = self.memory_savings.get(stage, 0.0) + mb
+        if self.event_date_columns:
+            latest = event_dates(chunk, self.event_date_columns).max()
+            if pd.notna(latest) and (self.latest_event_date is None or latest > self.latest_event_date):
+                self.latest_event_date = latest
+
+    def to_dict(self) -> Dict[str, Any]:
+        dtypes = pd.Series(self.dtypes, dtype=object)
+        profile = {
+            "name": self.name,
+            "shape": (self.rows, len(self.columns)),
+            "memory_usage_mb": self.peak_chunk_mb,
+            "missing_values": {} if self.missing is None else self.missing.astype(int).to_dict(),
+            "duplicate_rows": self.duplicate_rows,
+            "dtypes": self.dtypes,
+            "numeric_columns": [c for c, t in dtypes.items() if pd.api.types.is_numeric_dtype(t)],
+            "datetime_columns": [c for c, t in dtypes.items() if pd.api.types.is_datetime64_any_dtype(t)],
+            "object_columns": [c for c, t in dtypes.items() if pd.api.types.is_object_dtype(t)],
+            "streamed": True,
+        }
+        if self.memory_savings:
+            profile["memory_savings_mb"] = self.memory_savings
+        if self.latest_event_date is not None:
+            profile["latest_event_date"] = self.latest_event_date
+
+        logging.info(f"Streaming profile for {self.name}: {profile['shape'][0]} rows, {profile['shape'][1]} columns "
+                     f"(peak chunk {self.peak_chunk_mb:.2f} MB)")
+        return profile
+
 def validate_dataframe_structure(df: pd.DataFrame, expected_columns: List[str], name: str) -> bool:
     """Validate dataframe has expected structure"""
     missing_cols = set(expected_columns) - set(df.columns)
@@ -134,6 +494,45 @@ def validate_dataframe_structure(df: pd.DataFrame, expected_columns: List[str],
     
     return len(missing_cols) == 0
 
+# 📤 Row export helpers
+_EXPORT_QUEUE: Optional[ExportQueue] = None
+
+def export_queue() -> ExportQueue:
+    """This process's export queue (a forked worker gets its own)"""
+    global _EXPORT_QUEUE
+    if _EXPORT_QUEUE is None or _EXPORT_QUEUE.pid != os.getpid():
+        _EXPORT_QUEUE = ExportQueue(CONFIG["export_memory_mb"], CONFIG["export_workers"])
+    return _EXPORT_QUEUE
+
+def flush_exports() -> List[str]:
+    """Wait for queued exports to reach disk; returns the errors of failed writes"""
+    if _EXPORT_QUEUE is None or _EXPORT_QUEUE.pid != os.getpid():
+        return []
+    return _EXPORT_QUEUE.flush()
+
+def wait_for_exports(name: str):
+    """Flush the export queue before a dataset's outputs are recorded, raising if a write failed"""
+    errors = instrument(name, "flush_exports", flush_exports)
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+def export_rows(rows: pd.DataFrame, output_file: str, written: Optional[set] = None) -> str:
+    """Write rows to CSV; files already in `written` (this stream) are appended to
+
+    The write is queued when CONFIG["async_exports"] is set; call
+    flush_exports() before relying on the file. Returns the path written,
+    with the CONFIG["export_compression"] suffix.
+    """
+    output_file = compressed_path(output_file, CONFIG["export_compression"])
+    append = written is not None and output_file in written
+    if written is not None:
+        written.add(output_file)
+    if CONFIG["async_exports"]:
+        export_queue().submit(rows, output_file, append=append)
+    else:
+        write_csv(rows, output_file, append=append)
+    return output_file
+
 # 🧼 Enhanced logical consistency checker
 def check_and_fix_logical_inconsistency(
     df: pd.DataFrame, 
@@ -142,7 +541,8 @@ def check_and_fix_logical_inconsistency(
     condition: callable, 
     name: str, 
     swap: bool = False, 
-    threshold: float = None
+    threshold: float = None,
+    written: Optional[set] = None
 ) -> pd.DataFrame:
     """Enhanced logical consistency checker with better reporting"""
     threshold = threshold or CONFIG["inconsistency_threshold"]
@@ -166,7 +566,7 @@ def check_and_fix_logical_inconsistency(
         
         # Export inconsistent rows
         output_file = os.path.join(CONFIG["inconsistency_dir"], f"{name.replace(' ', '_').lower()}_inconsistent.csv")
-        inconsistent_rows.to_csv(output_file, index=False)
+        output_file = export_rows(inconsistent_rows, output_file, written=written)
         logging.info(f"Exported inconsistent rows to: {output_file}")
         return df
     
@@ -178,9 +578,73 @@ def check_and_fix_logical_inconsistency(
     
     return df
 
+# 🧮 Hash-based seen-sets for streaming (fingerprints from dedup.row_fingerprints)
+class HashSeenSet:
+    """Compact sorted set of 64-bit row fingerprints (8 bytes per distinct row)
+
+    Fill it from row_fingerprints only: its encoding does not depend on the
+    dtypes each chunk happened to infer, so hashes from different chunks compare.
+    """
+
+    def __init__(self):
+        self._hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Boolean mask of hashes recorded by earlier calls"""
+        if len(self._hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        idx = np.searchsorted(self._hashes, hashes)
+        idx[idx == len(self._hashes)] = 0
+        return self._hashes[idx] == hashes
+
+    def add(self, hashes: np.ndarray):
+        self._hashes = np.union1d(self._hashes, hashes)
+
+    def check_and_add(self, hashes: np.ndarray) -> np.ndarray:
+        """Mask of repeats (seen earlier, or earlier in this batch), then record the batch"""
+        repeats = self.contains(hashes) | pd.Series(hashes).duplicated().to_numpy()
+        self.add(hashes[~repeats])
+        return repeats
+
+    def save(self, path: str):
+        np.save(path, self._hashes)
+
+    @classmethod
+    def load(cls, path: str) -> "HashSeenSet":
+        seen = cls()
+        if os.path.exists(path):
+            seen._hashes = np.load(path)
+        return seen
+
+class ChunkState:
+    """Cross-chunk state threaded through clean_idsp_dataset in streaming mode"""
+
+    def __init__(self):
+        self.chunk_index = 0
+        self.rows = HashSeenSet()
+        self.keys = HashSeenSet()
+        self.written: set = set()
+        self.columns: Optional[List[str]] = None  # output schema fixed by the first chunk
+        self.gazetteer: Optional["GeoIndex"] = None  # geography index shared by every chunk
+
 # 🧹 Enhanced duplicate handler
-def handle_duplicates(df: pd.DataFrame, subset_cols: List[str], name: str) -> pd.DataFrame:
-    """Enhanced duplicate detection and handling"""
+def handle_duplicates(
+    df: pd.DataFrame,
+    subset_cols: List[str],
+    name: str,
+    state: Optional[ChunkState] = None
+) -> pd.DataFrame:
+    """Enhanced duplicate detection and handling
+
+    Rows are compared by 64-bit fingerprints of the full row and of the
+    subset key rather than by their values. With a ChunkState, duplicates are
+    also detected against earlier chunks via hashed seen-sets. Partial
+    duplicates of rows from earlier chunks are exported as they are found; the
+    earlier occurrence was already written with its chunk.
+    """
     logging.info(f"🔍 Checking for duplicates in {name} based on: {subset_cols}")
     
     # Check if subset columns exist
@@ -192,7 +656,10 @@ def handle_duplicates(df: pd.DataFrame, subset_cols: List[str], name: str) -> pd
     initial_count = len(df)
     
     # Handle exact duplicates
-    exact_dupes = df.duplicated()
+    if state is None:
+        exact_dupes, partial_dupes = duplicate_masks(row_fingerprints(df), row_fingerprints(df, subset_cols))
+    else:
+        exact_dupes = state.rows.check_and_add(row_fingerprints(df))
     exact_dupe_count = exact_dupes.sum()
     
     if exact_dupe_count > 0:
@@ -200,13 +667,18 @@ def handle_duplicates(df: pd.DataFrame, subset_cols: List[str], name: str) -> pd
         logging.info(f"📌 Removed {exact_dupe_count} exact duplicates")
     
     # Handle partial duplicates
-    partial_dupes = df.duplicated(subset=subset_cols, keep=False)
+    if state is None:
+        partial_dupes = partial_dupes[~exact_dupes]
+    else:
+        key_hashes = row_fingerprints(df, subset_cols)
+        partial_dupes = state.keys.contains(key_hashes) | pd.Series(key_hashes).duplicated(keep=False).to_numpy()
+        state.keys.add(key_hashes)
     partial_dupe_count = partial_dupes.sum()
     
     if partial_dupe_count > 0:
         logging.warning(f"⚠️ Found {partial_dupe_count} partial duplicates")
         output_file = os.path.join(CONFIG["inconsistency_dir"], f"{name.lower()}_partial_duplicates.csv")
-        df[partial_dupes].to_csv(output_file, index=False)
+        output_file = export_rows(df[partial_dupes], output_file, written=state.written if state else None)
         logging.info(f"Exported partial duplicates to: {output_file}")
     
     final_count = len(df)
@@ -215,7 +687,7 @@ def handle_duplicates(df: pd.DataFrame, subset_cols: List[str], name: str) -> pd
     return df
 
 # 📅 Enhanced week validator
-def add_week_validation_flag(df: pd.DataFrame) -> pd.DataFrame:
+def add_week_validation_flag(df: pd.DataFrame, written: Optional[set] = None) -> pd.DataFrame:
     """Enhanced week validation with better error handling"""
     if "reporting_date" not in df.columns:
         logging.warning("reporting_date column not found. Skipping week validation.")
@@ -225,8 +697,8 @@ def add_week_validation_flag(df: pd.DataFrame) -> pd.DataFrame:
         logging.warning("reporting_date is not datetime type. Skipping week validation.")
         return df
     
-    # Calculate ISO week
-    df["iso_week"] = df["reporting_date"].dt.isocalendar().week
+    # Look up ISO week in the shared date dimension
+    df["iso_week"] = lookup_date_features(df["reporting_date"], ["iso_week"])["iso_week"]
     df["week_is_valid"] = df["week"] == df["iso_week"]
     
     valid_count = df["week_is_valid"].sum()
@@ -238,7 +710,7 @@ def add_week_validation_flag(df: pd.DataFrame) -> pd.DataFrame:
     if mismatch_rate >= CONFIG["inconsistency_threshold"]:
         logging.warning("❌ High week mismatch rate. Exporting for manual review.")
         output_file = os.path.join(CONFIG["inconsistency_dir"], "week_mismatch.csv")
-        df[~df["week_is_valid"]].to_csv(output_file, index=False)
+        output_file = export_rows(df[~df["week_is_valid"]], output_file, written=written)
         logging.info(f"Exported week mismatches to: {output_file}")
     else:
         df["original_week"] = df["week"]
@@ -247,6 +719,18 @@ def add_week_validation_flag(df: pd.DataFrame) -> pd.DataFrame:
     
     return df
 
+# 📜 Consistency rules
+def dataset_rules(name: str) -> List[Dict[str, Any]]:
+    """Rules for a dataset (DATASET_RULES, or CONFIG["rules_file"] overrides)"""
+    from src.data.rules import load_rules
+    return load_rules(CONFIG["rules_file"]).get(name, [])
+
+def apply_rules_for(df: pd.DataFrame, name: str, written: Optional[set] = None) -> pd.DataFrame:
+    """apply_rules with the configured rules, threshold and inconsistency directory"""
+    from src.data.rules import apply_rules
+    return apply_rules(df, name, rules=dataset_rules(name), threshold=CONFIG["inconsistency_threshold"],
+                       export_dir=CONFIG["inconsistency_dir"], written=written, export=export_rows)
+
 # 🔧 Memory monitoring
 def monitor_memory_usage(df: pd.DataFrame, stage: str):
     """Monitor and log memory usage"""
@@ -257,8 +741,39 @@ def monitor_memory_usage(df: pd.DataFrame, stage: str):
         logging.warning(f"High memory usage detected: {memory_mb:.2f} MB")
 
 # 🧪 Enhanced data cleaning pipeline
-def clean_idsp_dataset(df: pd.DataFrame) -> pd.DataFrame:
-    """Clean IDSP dataset with comprehensive validation"""
+IDSP_DUPLICATE_SUBSET = ["reporting_date", "outbreak_starting_date", "state", "district", "disease_illness_name"]
+
+# 🗺️ Geography names
+def load_gazetteer(output_dir: str) -> Optional["GeoIndex"]:
+    """The geography index saved with the cleaned store (None if normalisation is off)"""
+    if not CONFIG["normalize_geography"]:
+        return None
+    from src.data.geography import GEO_INDEX_FILE, GeoIndex
+    return GeoIndex.load(os.path.join(output_dir, GEO_INDEX_FILE))
+
+def save_gazetteer(gazetteer: Optional["GeoIndex"], output_dir: str):
+    """Persist names and aliases learned while cleaning"""
+    if gazetteer is not None and gazetteer.changed:
+        from src.data.geography import GEO_INDEX_FILE
+        path = gazetteer.save(os.path.join(output_dir, GEO_INDEX_FILE))
+        logging.info(f"🗺️ Saved geography index to: {path}")
+
+def clean_idsp_dataset(
+    df: pd.DataFrame, 
+    state: Optional[ChunkState] = None, 
+    deduplicate: bool = True,
+    gazetteer: Optional["GeoIndex"] = None
+) -> pd.DataFrame:
+    """Clean IDSP dataset with comprehensive validation
+
+    Pass a ChunkState when cleaning one chunk of a streamed file: exports are
+    appended and duplicates are checked against earlier chunks (unless
+    deduplicate is False, when the caller handles duplicates itself).
+    With a gazetteer (or one on the ChunkState), state and district names are
+    mapped to their canonical spellings before rules and duplicate checks.
+    """
+    written = state.written if state else None
+    gazetteer = gazetteer or (state.gazetteer if state else None)
     logging.info("📊 Starting IDSP dataset cleaning")
     monitor_memory_usage(df, "IDSP initial")
     
@@ -270,95 +785,723 @@ def clean_idsp_dataset(df: pd.DataFrame) -> pd.DataFrame:
     
     # Convert date columns
     date_columns = ["reporting_date", "outbreak_starting_date"]
-    for col in date_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-            null_dates = df[col].isnull().sum()
-            if null_dates > 0:
-                logging.warning(f"Found {null_dates} null dates in {col}")
-    
-    # Logical consistency checks
-    df = check_and_fix_logical_inconsistency(
-        df=df,
-        col_a="reporting_date",
-        col_b="outbreak_starting_date",
-        condition=lambda df: df["reporting_date"] < df["outbreak_starting_date"],
-        name="Reporting Date vs Outbreak Starting Date",
-        swap=True
-    )
+    with instrumented_stage("idsp", "parse_dates", rows_in=len(df)) as stage_result:
+        for col in date_columns:
+            if col in df.columns:
+                # Already parsed when read with the idsp schema
+                if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                    df[col] = parse_date_column(df[col], RAW_DATE_FORMAT)
+                null_dates = df[col].isnull().sum()
+                if null_dates > 0:
+                    logging.warning(f"Found {null_dates} null dates in {col}")
+        stage_result["rows_out"] = len(df)
     
-    df = check_and_fix_logical_inconsistency(
-        df=df,
-        col_a="deaths",
-        col_b="cases",
-        condition=lambda df: df["deaths"] > df["cases"],
-        name="Deaths vs Cases",
-        swap=False  # Don't swap deaths and cases, just flag
-    )
+    # Canonical state and district names, so spelling variants group and deduplicate together
+    if gazetteer is not None:
+        from src.data.geography import canonicalize_geography
+        df = instrument("idsp", "normalize_geography", canonicalize_geography, df, gazetteer,
+                        "state", ["district"], threshold=CONFIG["geo_match_threshold"])
+    
+    # Logical consistency rules, evaluated together with one export
+    df = instrument("idsp", "apply_rules", apply_rules_for, df, "idsp", written=written)
     
     # Week validation
     if "week" in df.columns:
-        df = add_week_validation_flag(df)
+        df = instrument("idsp", "add_week_validation_flag", add_week_validation_flag, df, written=written)
     
     # Handle duplicates
-    df = handle_duplicates(df, 
-                          subset_cols=["reporting_date", "outbreak_starting_date", 
-                                     "state", "district", "disease_illness_name"],
-                          name="IDSP")
+    if deduplicate:
+        df = instrument("idsp", "handle_duplicates", handle_duplicates, df,
+                        subset_cols=IDSP_DUPLICATE_SUBSET,
+                        name="IDSP",
+                        state=state)
     
     monitor_memory_usage(df, "IDSP final")
     logging.info("✅ IDSP dataset cleaning complete")
     
     return df
 
-def run_enhanced_cleaning_pipeline():
-    """Run the enhanced data cleaning pipeline"""
+# 💾 Output writers
+class DatasetWriter:
+    """Write a dataset in every configured format, whole or chunk by chunk"""
+
+    def __init__(self, name: str, output_dir: str, write_csv: bool = True, start_part: int = 0):
+        self.name = name
+        self.csv_path = compressed_path(os.path.join(output_dir, f"cleaned_{name}.csv"), CONFIG["export_compression"])
+        self.parquet_path = parquet_path(output_dir, name)
+        self.write_csv = write_csv and "csv" in CONFIG["output_formats"]
+        self.write_parquet = "parquet" in CONFIG["output_formats"]
+        self.arrow_path = arrow_path(output_dir, name)
+        self.write_arrow = "arrow" in CONFIG["output_formats"]
+        self.parts = start_part
+        self.appending = start_part > 0
+        self.schema = None
+        self.arrow_schema = None
+        self.written: set = set()
+        self.cube_dir = os.path.join(output_dir, "cube")
+        self.cube_parts: Optional[List[pd.DataFrame]] = [] if name == "aqi" and CONFIG["aqi_cube"] else None
+        self.cube_outputs: List[str] = []
+        
+        # Continuing an existing store: append to its CSV and add Parquet parts
+        if start_part > 0 and os.path.exists(self.csv_path):
+            self.written.add(self.csv_path)
+        if self.appending and self.cube_parts is not None:
+            from src.data.aqi_cube import AQICube
+            if AQICube.load(self.cube_dir).empty:
+                logging.warning("No stored AQI cube to update; run a full rebuild to materialise it")
+                self.cube_parts = None
+        if self.appending and self.write_arrow and not os.path.isdir(self.arrow_path):
+            logging.warning(f"No shared Arrow store for {name} to append to; run a full rebuild to publish it")
+            self.write_arrow = False
+
+    def write(self, df: pd.DataFrame):
+        if self.write_csv:
+            export_rows(df, self.csv_path, written=self.written)
+        if self.write_parquet:
+            try:
+                self.schema = write_parquet_dataset(df, self.parquet_path, part=self.parts, schema=self.schema)
+            except ImportError:
+                logging.warning("pyarrow is not installed; skipping Parquet output")
+                self.write_parquet = False
+        if self.write_arrow:
+            try:
+                self.arrow_schema = write_arrow_part(df, self.arrow_path, part=self.parts, schema=self.arrow_schema)
+            except ImportError:
+                logging.warning("pyarrow is not installed; skipping the shared Arrow store")
+                self.write_arrow = False
+        if self.cube_parts is not None and len(df):
+            from src.data.aqi_cube import aggregate_readings
+            self.cube_parts.append(aggregate_readings(df))
+        self.parts += 1
+
+    def close(self):
+        """Fold the day aggregates of everything written into the stored AQI cube"""
+        if not self.cube_parts:
+            return
+        from src.data.aqi_cube import AQICube
+        cube = AQICube.load(self.cube_dir) if self.appending else AQICube()
+        try:
+            self.cube_outputs = cube.merge(self.cube_parts).save(self.cube_dir)
+        except ImportError:
+            logging.warning("pyarrow is not installed; skipping the AQI cube")
+        self.cube_parts = []
+
+    @property
+    def outputs(self) -> List[str]:
+        paths = [self.csv_path] if self.write_csv else []
+        if self.write_parquet and self.parts:
+            paths.append(self.parquet_path)
+        if self.write_arrow and self.parts:
+            paths.append(self.arrow_path)
+        return paths + self.cube_outputs
+
+# 🌊 Streaming (chunked) cleaning
+def clean_idsp_dataset_streaming(
+    path: str, 
+    writer: "DatasetWriter", 
+    chunk_size: Optional[int] = None, 
+    state: Optional[ChunkState] = None,
+    profile: Optional[StreamingProfile] = None,
+    gazetteer: Optional["GeoIndex"] = None
+) -> Dict[str, Any]:
+    """Clean IDSP chunk by chunk, appending cleaned rows through writer
+
+    Inconsistency thresholds and week correction are decided per chunk, so keep
+    CONFIG["chunk_size"] large enough for the rates to be representative.
+    Returns the raw-data profile accumulated while streaming.
+    
+    Without a ChunkState, duplicates are handled over the whole file, with the
+    same result as in memory: cleaned chunks are spilled to disk while a
+    DuplicateFinder indexes their fingerprints (itself spilling past
+    CONFIG["dedup_memory_mb"]), then a second pass writes the rows that are
+    not exact duplicates and exports whole partial-duplicate groups. With a
+    ChunkState (incremental runs), each chunk is checked against earlier ones
+    and written straight away.
+    """
+    logging.info("🌊 Starting streaming IDSP dataset cleaning")
+    spill = state is None
+    state = state or ChunkState()
+    state.gazetteer = gazetteer or state.gazetteer
+    profile = profile or StreamingProfile("idsp")
+    rows_out = 0
+    finder = DuplicateFinder(CONFIG["dedup_memory_mb"], spill_dir=CONFIG["spill_dir"]) if spill else None
+    chunk_dir = tempfile.mkdtemp(prefix="airpure_chunks_", dir=CONFIG["spill_dir"]) if spill else None
+    spilled_chunks: List[Tuple[str, int]] = []
+
+    try:
+        for chunk in instrument_iter("idsp", "read_chunk", iter_csv_chunks(path, chunk_size, schema="idsp")):
+            instrument("idsp", "profile_chunk", profile.update, chunk)
+            cleaned = instrument("idsp", "clean_idsp_dataset", clean_idsp_dataset, chunk, 
+                                 state=state, deduplicate=not spill)
+
+            # Week correction is decided per chunk; keep the output schema stable
+            if "week_is_valid" in cleaned.columns and "original_week" not in cleaned.columns:
+                cleaned["original_week"] = cleaned["week"]
+            if state.columns is None:
+                state.columns = cleaned.columns.tolist()
+            cleaned = cleaned.reindex(columns=state.columns)
+
+            if spill:
+                instrument("idsp", "index_duplicates", finder.add, 
+                           row_fingerprints(cleaned), row_fingerprints(cleaned, IDSP_DUPLICATE_SUBSET))
+                chunk_path = os.path.join(chunk_dir, f"chunk_{state.chunk_index:05d}.pkl")
+                instrument("idsp", "spill_chunk", cleaned.to_pickle, chunk_path)
+                spilled_chunks.append((chunk_path, len(cleaned)))
+            else:
+                instrument("idsp", "write", writer.write, cleaned)
+                rows_out += len(cleaned)
+            state.chunk_index += 1
+
+        if spill:
+            rows_out = write_deduplicated_chunks(spilled_chunks, finder, writer, state.written)
+    finally:
+        if finder is not None:
+            finder.close()
+        if chunk_dir is not None:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+
+    logging.info(f"✅ Streamed {profile.rows} rows in {state.chunk_index} chunks -> {rows_out} cleaned rows")
+    return profile.to_dict()
+
+def write_deduplicated_chunks(
+    chunks: List[Tuple[str, int]], 
+    finder: DuplicateFinder, 
+    writer: "DatasetWriter", 
+    written: set
+) -> int:
+    """Second streaming pass: drop exact duplicates and export partial-duplicate rows, chunk by chunk"""
+    exact, partial = instrument("idsp", "resolve_duplicates", finder.resolve)
+    if len(exact):
+        logging.info(f"📌 Removed {len(exact)} exact duplicates")
+    if len(partial):
+        logging.warning(f"⚠️ Found {len(partial)} partial duplicates")
+    output_file = os.path.join(CONFIG["inconsistency_dir"], "idsp_partial_duplicates.csv")
+    
+    start = 0
+    rows_out = 0
+    for chunk_path, rows in chunks:
+        chunk = pd.read_pickle(chunk_path)
+        keep = np.ones(rows, dtype=bool)
+        keep[rows_in(exact, start, start + rows)] = False
+        flagged = rows_in(partial, start, start + rows)
+        if len(flagged):
+            output_file = export_rows(chunk.iloc[flagged], output_file, written=written)
+        
+        chunk = chunk[keep]
+        instrument("idsp", "write", writer.write, chunk)
+        rows_out += len(chunk)
+        start += rows
+        os.remove(chunk_path)
+    
+    if len(partial):
+        logging.info(f"Exported partial duplicates to: {output_file}")
+    return rows_out
+
+def profile_csv_streaming(
+    path: str, 
+    name: str, 
+    chunk_size: Optional[int] = None, 
+    writer: Optional[DatasetWriter] = None
+) -> Dict[str, Any]:
+    """Profile a CSV without materialising it, optionally passing chunks to writer"""
+    profile = StreamingProfile(name)
+    for chunk in instrument_iter(name, "read_chunk", iter_csv_chunks(path, chunk_size, schema=name)):
+        instrument(name, "profile_chunk", profile.update, chunk)
+        if writer is not None:
+            instrument(name, "write", writer.write, chunk)
+    return profile.to_dict()
+
+# ⏱️ Stage metrics
+def with_stage_metrics(func):
+    """Record the stages run by an outcome-returning function into outcome["stages"]
+
+    Each call gets its own recorder, so records survive the trip back from a
+    worker process and are merged by run_enhanced_cleaning_pipeline.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with recording(trace_memory=CONFIG["trace_memory"]) as recorder:
+            outcome = func(*args, **kwargs)
+        outcome["stages"] = recorder.to_list()
+        return outcome
+    return wrapper
+
+def write_stage_metrics(recorder: StageRecorder, logs_dir: str, stamp: str, metadata: Dict[str, Any]) -> List[str]:
+    """Write stage metrics as JSON (and Prometheus text if configured) beside the report"""
+    paths = [recorder.write_json(os.path.join(logs_dir, f"cleaning_metrics_{stamp}.json"), metadata)]
+    if CONFIG["metrics_prometheus"]:
+        paths.append(recorder.write_prometheus(os.path.join(logs_dir, f"cleaning_metrics_{stamp}.prom")))
+    return paths
+
+# 📈 Incremental (append-only) ingestion
+INCREMENTAL_DATASETS = {
+    # Event date = first non-null of date_columns; subset = duplicate-index key
+    "idsp": {"date_columns": ["reporting_date", "outbreak_starting_date"], "subset": IDSP_DUPLICATE_SUBSET},
+    "aqi": {"date_columns": ["date"], "subset": ["date", "state", "area"]},
+}
+TAIL_BYTES = 64 * 1024
+
+class IncrementalState:
+    """Watermark, raw-file offset and persisted duplicate index for one dataset"""
+
+    def __init__(self, name: str, output_dir: str):
+        self.name = name
+        self.dir = os.path.join(output_dir, "incremental")
+        self.meta: Dict[str, Any] = {}
+        self.chunk_state = ChunkState()
+        self.raw_rows = HashSeenSet()  # raw-row fingerprints (schema applied), so re-sent rows are dropped before cleaning
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.dir, f"{self.name}{suffix}")
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self._path(".json"))
+
+    def load(self) -> "IncrementalState":
+        """Read the stored state; meta stays empty if there is none or its fingerprints are outdated"""
+        if self.exists:
+            with open(self._path(".json")) as f:
+                meta = json.load(f)
+            if meta.get("fingerprint_version") != FINGERPRINT_VERSION:
+                logging.warning(f"📈 {self.name}: stored duplicate index uses an older row fingerprint; "
+                                f"rebuilding it from the full file")
+                return self
+            self.meta = meta
+            self.chunk_state.rows = HashSeenSet.load(self._path("_rows.npy"))
+            self.chunk_state.keys = HashSeenSet.load(self._path("_keys.npy"))
+            self.raw_rows = HashSeenSet.load(self._path("_raw.npy"))
+        return self
+
+    def save(self):
+        os.makedirs(self.dir, exist_ok=True)
+        self.chunk_state.rows.save(self._path("_rows.npy"))
+        self.chunk_state.keys.save(self._path("_keys.npy"))
+        self.raw_rows.save(self._path("_raw.npy"))
+        self.meta["fingerprint_version"] = FINGERPRINT_VERSION
+        with open(self._path(".json"), "w") as f:
+            json.dump(self.meta, f, indent=2, default=str)
+
+    def reset(self):
+        """Forget the watermark and index (after a full rebuild of the store)"""
+        for suffix in [".json", "_rows.npy", "_keys.npy", "_raw.npy"]:
+            if os.path.exists(self._path(suffix)):
+                os.remove(self._path(suffix))
+
+def tail_hash(path: str, offset: int) -> str:
+    """Hash of the bytes just before offset, used to confirm the file was only appended to"""
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - TAIL_BYTES))
+        return hashlib.blake2b(f.read(min(offset, TAIL_BYTES)), digest_size=16).hexdigest()
+
+def complete_rows_end(path: str) -> int:
+    """Byte offset just past the last newline, so a half-written final row waits for the next run"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        tail = f.read()
+    last_newline = tail.rfind(b"\n")
+    return size if last_newline < 0 else size - len(tail) + last_newline + 1
+
+def event_dates(df: pd.DataFrame, date_columns: List[str]) -> pd.Series:
+    """First non-null of date_columns per row (the watermark column)"""
+    dates = None
+    for col in date_columns:
+        if col in df.columns:
+            dates = df[col] if dates is None else dates.fillna(df[col])
+    return dates if dates is not None else pd.Series(pd.NaT, index=df.index)
+
+def read_appended_rows(path: str, name: str, inc: IncrementalState, end: int) -> Optional[pd.DataFrame]:
+    """Rows written after the stored offset, or None if the file was not just appended to"""
+    offset = inc.meta.get("byte_offset")
+    if offset is None or end < offset or tail_hash(path, offset) != inc.meta.get("tail_hash"):
+        return None
+    
+    encoding = detect_encoding(path)
+    schema = get_schema(name)
+    header = pd.read_csv(path, encoding=encoding, nrows=0).columns.tolist()
+    with open(path, "rb") as f:
+        f.seek(offset)
+        delta = f.read(end - offset)
+    logging.info(f"📈 {name}: reading {len(delta)} appended bytes from offset {offset}")
+    
+    if not delta.strip():
+        return pd.DataFrame(columns=header)
+    
+    dtype = {col: "category" for col in (schema or {}).get("categories", []) if col in header}
+    df = pd.read_csv(io.BytesIO(delta), encoding=encoding, header=None, names=header, dtype=dtype)
+    return apply_schema(df, schema, categorized=True) if schema else df
+
+def read_rows_past_watermark(path: str, name: str, inc: IncrementalState) -> pd.DataFrame:
+    """Full-file fallback: stream the file and keep rows newer than the watermark"""
+    watermark = pd.Timestamp(inc.meta["watermark"]) if inc.meta.get("watermark") else None
+    date_columns = INCREMENTAL_DATASETS[name]["date_columns"]
+    logging.warning(f"📈 {name}: raw file was rewritten; filtering on watermark {watermark}")
+    
+    parts = []
+    for chunk in iter_csv_chunks(path, schema=name):
+        if watermark is not None:
+            chunk = chunk[(event_dates(chunk, date_columns) > watermark).to_numpy()]
+        parts.append(chunk)
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+@with_stage_metrics
+def process_dataset_incremental(name: str, path: str, base_dir: str) -> Dict[str, Any]:
+    """Clean only rows added since the last run and append them to the cleaned store
+
+    The first run (or a run after a full rebuild) processes the whole file in
+    chunks and seeds the watermark and the duplicate index. Later runs read
+    just the bytes appended since the stored offset; if the raw file was
+    rewritten instead, rows are filtered on the date watermark. New IDSP rows
+    already ingested are dropped and the rest cleaned; other datasets are
+    appended as loaded, like a full rebuild stores them, and only recorded
+    in the persisted duplicate index.
+    """
+    outcome = {"name": name, "profile": None, "errors": [], "manifest_entry": None, "encoding": None}
+    if not os.path.exists(path):
+        logging.warning(f"⚠️ File not found: {path}")
+        return outcome
+    
+    output_dir = os.path.join(base_dir, CONFIG["output_dir"])
+    spec = INCREMENTAL_DATASETS[name]
+    inc = IncrementalState(name, output_dir).load()
+    end = complete_rows_end(path)
+    if name == "idsp":
+        inc.chunk_state.gazetteer = load_gazetteer(output_dir)
+    
+    try:
+        if not inc.meta:
+            logging.info(f"📈 {name}: no incremental state; bootstrapping from the full file")
+            writer = DatasetWriter(name, output_dir, write_csv=name == "idsp")
+            profile = StreamingProfile(name, event_date_columns=spec["date_columns"])
+            if name == "idsp":
+                outcome["profile"] = clean_idsp_dataset_streaming(path, writer, state=inc.chunk_state, profile=profile)
+            else:
+                outcome["profile"] = _append_indexed(path, name, writer, inc, profile)
+            inc.raw_rows = profile.seen_rows
+            new_dates = outcome["profile"].get("latest_event_date")
+        else:
+            new_rows = instrument(name, "read_appended_rows", read_appended_rows, path, name, inc, end)
+            if new_rows is None:
+                new_rows = instrument(name, "read_rows_past_watermark", read_rows_past_watermark, path, name, inc)
+            
+            writer = DatasetWriter(name, output_dir, write_csv=name == "idsp", start_part=inc.meta.get("parts", 0))
+            outcome["profile"] = instrument(name, "profile_dataframe", profile_dataframe, new_rows, name)
+            new_dates = event_dates(new_rows, spec["date_columns"]).max() if len(new_rows) else None
+            
+            if len(new_rows):
+                if name == "idsp":
+                    resent = inc.raw_rows.check_and_add(row_fingerprints(new_rows))
+                    if resent.any():
+                        logging.info(f"📌 {name}: dropped {resent.sum()} rows already ingested")
+                        new_rows = new_rows[~resent]
+                    cleaned = instrument(name, "clean_idsp_dataset", clean_idsp_dataset, new_rows, state=inc.chunk_state)
+                    if "week_is_valid" in cleaned.columns and "original_week" not in cleaned.columns:
+                        cleaned["original_week"] = cleaned["week"]
+                else:
+                    inc.raw_rows.add(row_fingerprints(new_rows))
+                    cleaned = instrument(name, "index_rows", index_rows, new_rows, spec["subset"], inc.chunk_state)
+                if inc.meta.get("columns"):
+                    cleaned = cleaned.reindex(columns=inc.meta["columns"])
+                if len(cleaned):
+                    instrument(name, "write", writer.write, cleaned)
+                logging.info(f"📈 {name}: appended {len(cleaned)} of {len(new_rows)} new rows")
+            else:
+                logging.info(f"📈 {name}: no new rows since {inc.meta.get('watermark')}")
+        instrument(name, "update_cube", writer.close)
+        wait_for_exports(name)
+        
+        watermark = inc.meta.get("watermark")
+        if new_dates is not None and pd.notna(new_dates) and (watermark is None or new_dates > pd.Timestamp(watermark)):
+            watermark = pd.Timestamp(new_dates).isoformat()
+        
+        inc.meta["columns"] = inc.meta.get("columns") or inc.chunk_state.columns
+        inc.meta.update({
+            "watermark": watermark,
+            "byte_offset": end,
+            "tail_hash": tail_hash(path, end),
+            "parts": writer.parts,
+            "updated": datetime.now().isoformat(),
+        })
+        inc.save()
+        save_gazetteer(inc.chunk_state.gazetteer, output_dir)
+        
+        outcome["profile"]["incremental"] = {"watermark": watermark, "byte_offset": end}
+        outcome["encoding"] = _ENCODING_CACHE.get(os.path.abspath(path))
+        outputs = [p for p in writer.outputs if os.path.exists(p)]
+        outcome["manifest_entry"] = build_manifest_entry(file_fingerprint(path), outputs, outcome["profile"])
+    except Exception as e:
+        error_msg = f"Failed incremental update of {name}: {str(e)}"
+        logging.error(error_msg)
+        outcome["errors"].append(error_msg)
+    
+    return outcome
+
+def index_rows(df: pd.DataFrame, subset_cols: List[str], state: ChunkState) -> pd.DataFrame:
+    """Record df's row and subset-key fingerprints in the duplicate index; df is returned unchanged"""
+    state.rows.add(row_fingerprints(df))
+    if not set(subset_cols) - set(df.columns):
+        state.keys.add(row_fingerprints(df, subset_cols))
+    return df
+
+def _append_indexed(
+    path: str, 
+    name: str, 
+    writer: "DatasetWriter", 
+    inc: IncrementalState, 
+    profile: StreamingProfile
+) -> Dict[str, Any]:
+    """Stream a dataset that has no cleaner into the store as loaded, seeding the duplicate index"""
+    state = inc.chunk_state
+    for chunk in instrument_iter(name, "read_chunk", iter_csv_chunks(path, schema=name)):
+        instrument(name, "profile_chunk", profile.update, chunk)
+        chunk = instrument(name, "index_rows", index_rows, chunk, INCREMENTAL_DATASETS[name]["subset"], state)
+        state.columns = state.columns or chunk.columns.tolist()
+        instrument(name, "write", writer.write, chunk.reindex(columns=state.columns))
+        state.chunk_index += 1
+    return profile.to_dict()
+
+# ⚙️ Per-dataset processing
+@with_stage_metrics
+def process_dataset(name: str, path: str, base_dir: str, streaming: bool = False) -> Dict[str, Any]:
+    """Load, profile and (for IDSP) clean one dataset
+
+    Self-contained so it can run in a worker process; returns an outcome dict
+    with the dataset name, its profile (None if not loaded) and any errors.
+    """
+    outcome = {"name": name, "profile": None, "errors": [], "manifest_entry": None, "encoding": None}
+    
+    if not os.path.exists(path):
+        logging.warning(f"⚠️ File not found: {path}")
+        return outcome
+    
+    # Fingerprint before reading so a file replaced mid-run is not cached as current
+    fingerprint = file_fingerprint(path)
+    
+    # Only IDSP gets cleaned; the other datasets are stored typed, as loaded
+    output_dir = os.path.join(base_dir, CONFIG["output_dir"])
+    writer = DatasetWriter(name, output_dir, write_csv=name == "idsp")
+    gazetteer = load_gazetteer(output_dir) if name == "idsp" else None
+    
+    # A full rebuild replaces the store, so any incremental watermark is stale
+    IncrementalState(name, output_dir).reset()
+    
+    if streaming:
+        try:
+            if name == "idsp":
+                outcome["profile"] = clean_idsp_dataset_streaming(path, writer, gazetteer=gazetteer)
+                save_gazetteer(gazetteer, output_dir)
+                logging.info(f"💾 Saved cleaned IDSP dataset to: {', '.join(writer.outputs)}")
+            else:
+                outcome["profile"] = profile_csv_streaming(path, name, writer=writer)
+            instrument(name, "build_cube", writer.close)
+            wait_for_exports(name)
+            logging.info(f"✅ Streamed {name}: {outcome['profile']['shape']}")
+            outcome["encoding"] = _ENCODING_CACHE.get(os.path.abspath(path))
+            outcome["manifest_entry"] = build_manifest_entry(fingerprint, writer.outputs, outcome["profile"])
+        except Exception as e:
+            error_msg = f"Failed to stream {name}: {str(e)}"
+            logging.error(error_msg)
+            outcome["errors"].append(error_msg)
+        return outcome
+    
+    try:
+        df = instrument(name, "safe_read_csv", safe_read_csv, path, schema=name)
+        outcome["encoding"] = _ENCODING_CACHE.get(os.path.abspath(path))
+        outcome["profile"] = instrument(name, "profile_dataframe", profile_dataframe, df, name)
+        logging.info(f"✅ Loaded {name}: {outcome['profile']['shape']}")
+    except Exception as e:
+        error_msg = f"Failed to load {name}: {str(e)}"
+        logging.error(error_msg)
+        outcome["errors"].append(error_msg)
+        return outcome
+    
+    # Clean IDSP dataset (primary focus)
+    try:
+        if name == "idsp":
+            df = instrument(name, "clean_idsp_dataset", clean_idsp_dataset, df, gazetteer=gazetteer)
+            save_gazetteer(gazetteer, output_dir)
+        instrument(name, "write", writer.write, df)
+        instrument(name, "build_cube", writer.close)
+        wait_for_exports(name)
+        if name == "idsp":
+            logging.info(f"💾 Saved cleaned IDSP dataset to: {', '.join(writer.outputs)}")
+        outcome["manifest_entry"] = build_manifest_entry(fingerprint, writer.outputs, outcome["profile"])
+    except Exception as e:
+        error_msg = f"Failed to clean {name}: {str(e)}"
+        logging.error(error_msg)
+        outcome["errors"].append(error_msg)
+    
+    return outcome
+
+# 🗃️ Manifest cache
+def cache_config_fingerprint() -> str:
+    """Hash of the CONFIG settings that affect cleaned output"""
+    from src.data.rules import load_rules
+    settings = json.dumps({"config": {key: CONFIG[key] for key in CACHE_CONFIG_KEYS},
+                           "schemas": DATASET_SCHEMAS,
+                           "rules": load_rules(CONFIG["rules_file"])}, sort_keys=True)
+    return hashlib.blake2b(settings.encode(), digest_size=8).hexdigest()
+
+def build_manifest_entry(fingerprint: Dict[str, Any], outputs: List[str], profile: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "input": fingerprint,
+        "outputs": outputs,
+        "config": cache_config_fingerprint(),
+        "profile": json.loads(json.dumps(profile, default=str)),
+        "updated": datetime.now().isoformat(),
+    }
+
+def cached_outcome(name: str, path: str, manifest: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Outcome from the manifest if the raw input and config are unchanged"""
+    entry = manifest.get("datasets", {}).get(name)
+    if not entry or entry.get("config") != cache_config_fingerprint():
+        return None
+    if not outputs_exist(entry) or not input_unchanged(path, entry.get("input")):
+        return None
+    
+    logging.info(f"♻️ {name} unchanged since {entry.get('updated')}; reusing cached outputs")
+    return {"name": name, "profile": entry["profile"], "errors": [], "manifest_entry": entry, "cached": True}
+
+def _init_worker(log_queue, config: Dict[str, Any], encoding_cache: Dict[str, Dict[str, Any]]):
+    """Route worker logging through the parent's queue and mirror its CONFIG and caches"""
+    CONFIG.update(config)
+    _ENCODING_CACHE.update(encoding_cache)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(getattr(logging, CONFIG["log_level"]))
+
+def process_datasets_parallel(
+    file_paths: Dict[str, str], 
+    base_dir: str, 
+    streaming: bool = False, 
+    max_workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Run process_dataset for every file in a process pool
+
+    Worker log records are queued to the parent, whose existing handlers write
+    them whole, so the log file never sees interleaved lines.
+    """
+    max_workers = min(max_workers or CONFIG["max_workers"], len(file_paths))
+    logging.info(f"⚙️ Processing {len(file_paths)} datasets with {max_workers} worker processes")
+    
+    ctx = multiprocessing.get_context()
+    log_queue = ctx.Queue()
+    listener = QueueListener(log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+    listener.start()
+    
+    outcomes = []
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(log_queue, dict(CONFIG), dict(_ENCODING_CACHE))) as pool:
+            futures = {name: pool.submit(process_dataset, name, path, base_dir, streaming)
+                       for name, path in file_paths.items()}
+            for name, future in futures.items():
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    error_msg = f"Worker for {name} failed: {str(e)}"
+                    logging.error(error_msg)
+                    outcomes.append({"name": name, "profile": None, "errors": [error_msg],
+                                     "manifest_entry": None, "encoding": None})
+    finally:
+        listener.stop()
+    
+    return outcomes
+
+def run_enhanced_cleaning_pipeline(
+    streaming: Optional[bool] = None, 
+    max_workers: Optional[int] = None, 
+    incremental: Optional[bool] = None,
+    datasets: Optional[List[str]] = None,
+    paths: Optional[Dict[str, str]] = None
+):
+    """Run the enhanced data cleaning pipeline
+
+    streaming: read, profile and clean in CONFIG["chunk_size"] chunks instead of
+    loading whole files (defaults to CONFIG["streaming"]).
+    max_workers: process datasets in parallel when > 1 (defaults to CONFIG["max_workers"]).
+    incremental: append only new IDSP/AQI rows to the cleaned store (defaults to CONFIG["incremental"]).
+    datasets: process only these datasets (default all); the manifest keeps the others' entries.
+    paths: raw CSV per dataset name, replacing the default data/raw locations.
+    """
     start_time = datetime.now()
-    logging.info("🚀 Starting Enhanced Data Cleaning Pipeline")
+    streaming = CONFIG["streaming"] if streaming is None else streaming
+    incremental = CONFIG["incremental"] if incremental is None else incremental
+    file_paths = get_file_paths(os.path.dirname(os.path.abspath(__file__)))
+    unknown = sorted((set(datasets or []) | set(paths or {})) - set(file_paths))
+    if unknown:
+        raise ValueError(f"Unknown datasets {unknown}; expected some of {list(file_paths)}")
+    file_paths.update(paths or {})
+    if datasets is not None:
+        file_paths = {name: path for name, path in file_paths.items() if name in datasets}
     
-    # Setup environment
+    # Setup environment (before the first log call, so the log file handler is installed)
     base_dir = setup_environment()
-    file_paths = get_file_paths(base_dir)
+    logging.info(f"🚀 Starting Enhanced Data Cleaning Pipeline{' (streaming)' if streaming else ''}")
     
     # Initialize results dictionary
     results = {
         "start_time": start_time,
         "datasets_processed": [],
+        "datasets_cached": [],
         "profiles": {},
-        "errors": []
+        "errors": [],
+        "stage_metrics": []
     }
+    recorder = StageRecorder()
     
     try:
-        # Load datasets
+        # Load, profile and clean datasets
         logging.info("📂 Loading datasets...")
-        datasets = {}
+        output_dir = os.path.join(base_dir, CONFIG["output_dir"])
+        manifest = load_manifest(output_dir)
+        encoding_cache_path = os.path.join(output_dir, "encoding_cache.json")
+        load_encoding_cache(encoding_cache_path)
         
-        for name, path in file_paths.items():
-            try:
-                if os.path.exists(path):
-                    datasets[name] = safe_read_csv(path)
-                    results["datasets_processed"].append(name)
-                    
-                    # Generate profile
-                    profile = profile_dataframe(datasets[name], name)
-                    results["profiles"][name] = profile
-                    
-                    logging.info(f"✅ Loaded {name}: {profile['shape']}")
-                else:
-                    logging.warning(f"⚠️ File not found: {path}")
-            except Exception as e:
-                error_msg = f"Failed to load {name}: {str(e)}"
-                logging.error(error_msg)
-                results["errors"].append(error_msg)
+        # Unchanged inputs are served from the manifest without being read
+        cached = {}
+        if CONFIG["use_cache"]:
+            for name, path in file_paths.items():
+                outcome = cached_outcome(name, path, manifest)
+                if outcome is not None:
+                    cached[name] = outcome
+        pending = {name: path for name, path in file_paths.items() if name not in cached}
         
-        # Clean IDSP dataset (primary focus)
-        if "idsp" in datasets:
-            datasets["idsp_cleaned"] = clean_idsp_dataset(datasets["idsp"])
-            
-            # Save cleaned dataset
-            output_path = os.path.join(base_dir, CONFIG["output_dir"], "cleaned_idsp.csv")
-            datasets["idsp_cleaned"].to_csv(output_path, index=False)
-            logging.info(f"💾 Saved cleaned IDSP dataset to: {output_path}")
+        # Incremental mode appends deltas for datasets with a watermark column
+        fresh = []
+        if incremental:
+            for name in [name for name in pending if name in INCREMENTAL_DATASETS]:
+                fresh.append(process_dataset_incremental(name, pending.pop(name), base_dir))
+        
+        max_workers = max_workers or CONFIG["max_workers"]
+        if max_workers > 1 and len(pending) > 1:
+            fresh += process_datasets_parallel(pending, base_dir, streaming, max_workers)
+        else:
+            fresh += [process_dataset(name, path, base_dir, streaming) for name, path in pending.items()]
+        
+        # Merge per-dataset outcomes in file order
+        outcomes = {**cached, **{outcome["name"]: outcome for outcome in fresh}}
+        for name in file_paths:
+            outcome = outcomes[name]
+            if outcome["profile"] is not None:
+                results["datasets_processed"].append(name)
+                results["profiles"][name] = outcome["profile"]
+            if outcome.get("cached"):
+                results["datasets_cached"].append(name)
+            if outcome.get("manifest_entry") is not None:
+                manifest.setdefault("datasets", {})[name] = outcome["manifest_entry"]
+            if outcome.get("encoding") is not None:
+                _ENCODING_CACHE[os.path.abspath(file_paths[name])] = outcome["encoding"]
+            recorder.merge(outcome.get("stages", []))
+            results["errors"].extend(outcome["errors"])
+        
+        # Nothing may still be writing once results are returned
+        results["errors"].extend(flush_exports())
+        save_manifest(manifest, output_dir)
+        save_encoding_cache(encoding_cache_path)
         
         # Generate final report
         end_time = datetime.now()
@@ -367,17 +1510,32 @@ def run_enhanced_cleaning_pipeline():
         results.update({
             "end_time": end_time,
             "duration_seconds": duration.total_seconds(),
-            "success": len(results["errors"]) == 0
+            "success": len(results["errors"]) == 0,
+            "stage_metrics": recorder.to_list()
         })
         
-        # Save processing report
-        report_path = os.path.join(base_dir, "logs", f"cleaning_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+        # Save stage metrics and the processing report under one timestamp
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        metrics_paths = write_stage_metrics(recorder, os.path.join(base_dir, "logs"), stamp, {
+            "started": start_time.isoformat(),
+            "duration_seconds": duration.total_seconds(),
+            "streaming": streaming,
+            "incremental": incremental,
+            "datasets_processed": results["datasets_processed"],
+            "datasets_cached": results["datasets_cached"],
+        })
+        report_path = os.path.join(base_dir, "logs", f"cleaning_report_{stamp}.log")
+        slowest = ", ".join(f"{record['dataset']}.{record['stage']} {record['wall_seconds']:.2f}s"
+                            for record in recorder.slowest())
         with open(report_path, 'w') as f:
             f.write(f"Data Cleaning Pipeline Report\n")
             f.write(f"Started: {start_time}\n")
             f.write(f"Completed: {end_time}\n")
             f.write(f"Duration: {duration}\n")
             f.write(f"Datasets Processed: {', '.join(results['datasets_processed'])}\n")
+            f.write(f"Datasets Reused From Cache: {', '.join(results['datasets_cached']) or 'none'}\n")
+            f.write(f"Slowest Stages: {slowest or 'none'}\n")
+            f.write(f"Stage Metrics: {', '.join(metrics_paths)}\n")
             f.write(f"Errors: {len(results['errors'])}\n")
             for error in results["errors"]:
                 f.write(f"  - {error}\n")
@@ -389,16 +1547,12 @@ def run_enhanced_cleaning_pipeline():
         error_msg = f"Pipeline failed: {str(e)}"
         logging.error(error_msg)
         results["errors"].append(error_msg)
+        results["errors"].extend(flush_exports())
         results["success"] = False
         return results
 
 # 🔧 Main execution
 if __name__ == "__main__":
-    results = run_enhanced_cleaning_pipeline()
-    
-    if results["success"]:
-        print("✅ Data cleaning pipeline completed successfully!")
-    else:
-        print("❌ Data cleaning pipeline completed with errors:")
-        for error in results["errors"]:
-            print(f"  - {error}")
+    # Same as `python -m src.data clean`; the CLI also takes dataset selection and CONFIG overrides
+    from src.data.cli import main
+    sys.exit(main(["clean", *sys.argv[1:]]))
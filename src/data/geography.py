@@ -0,0 +1,417 @@
+"""
+Geography surrogate keys for joining the AirPure datasets
+
+AQI, IDSP, population projections and vahan spell states (and districts,
+areas, RTOs) differently: "NCT of Delhi" / "Delhi", "Orissa" / "Odisha",
+"Jammu & Kashmir" / "Jammu and Kashmir", stray case and whitespace. GeoIndex
+resolves every spelling through an alias index of normalised name keys to a
+dense integer id, once per distinct value, so joins compare integers instead
+of free text. Ids are append-only: a saved index keeps every id valid as new
+names arrive.
+
+Spellings with no exact alias can be matched approximately: each name's
+character trigrams are looked up in a trigram index of the known names, and
+the best match above a Dice-similarity threshold becomes a learned alias
+(saved with the index). canonicalize_geography() resolves every distinct
+value of a column once and remaps rows through their category codes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+GEO_INDEX_FILE = "geo_index.json"
+
+# Dice similarity of character trigrams needed to accept an approximate match
+FUZZY_THRESHOLD = 0.75
+# Shorter keys ("up", "wb") are too ambiguous to match approximately
+MIN_FUZZY_LENGTH = 4
+# Tokens that tell otherwise similar places apart ("24 Parganas North" / "South")
+DISTINGUISHING_WORDS = {"north", "south", "east", "west", "central", "urban", "rural", "new", "old",
+                        "upper", "lower"}
+
+# Canonical state / UT names and the spellings seen in Indian public datasets
+STATE_ALIASES: Dict[str, List[str]] = {
+    "Andaman and Nicobar Islands": ["Andaman & Nicobar Islands", "Andaman & Nicobar", "A & N Islands"],
+    "Andhra Pradesh": ["AP"],
+    "Arunachal Pradesh": [],
+    "Assam": [],
+    "Bihar": [],
+    "Chandigarh": [],
+    "Chhattisgarh": ["Chattisgarh", "Chhatisgarh"],
+    "Dadra and Nagar Haveli and Daman and Diu": ["Dadra & Nagar Haveli and Daman & Diu", "DNH and DD",
+                                                 "Dadra and Nagar Haveli", "Daman and Diu"],
+    "Delhi": ["NCT of Delhi", "National Capital Territory of Delhi", "New Delhi", "Delhi NCT"],
+    "Goa": [],
+    "Gujarat": [],
+    "Haryana": [],
+    "Himachal Pradesh": [],
+    "Jammu and Kashmir": ["Jammu & Kashmir", "J&K", "J & K"],
+    "Jharkhand": [],
+    "Karnataka": [],
+    "Kerala": [],
+    "Ladakh": [],
+    "Lakshadweep": [],
+    "Madhya Pradesh": ["MP"],
+    "Maharashtra": [],
+    "Manipur": [],
+    "Meghalaya": [],
+    "Mizoram": [],
+    "Nagaland": [],
+    "Odisha": ["Orissa"],
+    "Puducherry": ["Pondicherry"],
+    "Punjab": [],
+    "Rajasthan": [],
+    "Sikkim": [],
+    "Tamil Nadu": ["Tamilnadu", "TN"],
+    "Telangana": ["Telengana"],
+    "Tripura": [],
+    "Uttar Pradesh": ["UP"],
+    "Uttarakhand": ["Uttaranchal"],
+    "West Bengal": ["WB"],
+}
+
+
+def geo_key(name) -> str:
+    """Normalised lookup key: case-folded, '&' as 'and', punctuation and extra spaces removed"""
+    text = str(name).casefold().replace("&", " and ")
+    return re.sub(r"[\W_]+", " ", text).strip()
+
+
+def tidy_name(name) -> str:
+    """Display spelling of a name seen for the first time (whitespace collapsed)"""
+    return re.sub(r"\s+", " ", str(name)).strip()
+
+
+def factorize_names(values: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Codes and distinct values of a text column (categorical codes reused)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values)
+
+
+def trigrams(key: str) -> List[str]:
+    """Distinct character trigrams of a name key, padded so word starts count"""
+    padded = f"  {key} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def distinguishing_tokens(key: str) -> frozenset:
+    """Numbers and direction/qualifier words, which an approximate match must preserve"""
+    return frozenset(token for token in key.split() if token.isdigit() or token in DISTINGUISHING_WORDS)
+
+
+class TrigramIndex:
+    """Approximate lookup of name keys through posting lists of their trigrams"""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.values: List[int] = []
+        self.sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+
+    def add(self, key: str, value: int):
+        position = len(self.keys)
+        grams = trigrams(key)
+        self.keys.append(key)
+        self.values.append(value)
+        self.sizes.append(len(grams))
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(position)
+
+    def match(self, key: str, threshold: float = FUZZY_THRESHOLD) -> Optional[int]:
+        """Value of the most similar key with Dice similarity >= threshold (None if there is none)"""
+        grams = trigrams(key)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return None
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.keys))
+        scores = 2 * shared / (len(grams) + np.asarray(self.sizes))
+        tokens = distinguishing_tokens(key)
+        for position in np.argsort(-scores, kind="stable"):
+            if scores[position] < threshold:
+                return None
+            if distinguishing_tokens(self.keys[position]) == tokens:
+                return self.values[position]
+        return None
+
+
+def canonical_categorical(labels: Sequence, codes: np.ndarray) -> pd.Categorical:
+    """Rows as categorical labels, from one label per distinct code (-1 stays missing)"""
+    remap, categories = pd.factorize(pd.Series(list(labels), dtype=object))
+    return pd.Categorical.from_codes(np.append(remap, -1)[codes], categories=categories)
+
+
+def frequency_order(codes: np.ndarray, n: int) -> np.ndarray:
+    """Distinct codes, most frequent first (so a new name's commonest spelling becomes canonical)"""
+    counts = np.bincount(codes[codes >= 0], minlength=n)
+    return np.argsort(-counts, kind="stable")
+
+
+class GeoIndex:
+    """Integer surrogate keys for states and places, resolved through a name-alias index
+
+    Place ids (districts, AQI areas, RTOs) are scoped to their state, so
+    "Aurangabad" in Bihar and in Maharashtra get different ids. Unknown
+    names are added with the next free id unless add=False, when they map
+    to -1 like missing values.
+    """
+
+    def __init__(self):
+        self.states: List[str] = []
+        self.places: List[Tuple[int, str]] = []
+        self.aliases: Dict[str, str] = {}
+        self.learned: List[Tuple[str, str]] = []
+        self.changed = False
+        self._state_ids: Dict[str, int] = {}
+        self._place_ids: Dict[Tuple[int, str], int] = {}
+        self._state_grams: Optional[TrigramIndex] = None
+        self._place_grams: Dict[int, TrigramIndex] = {}
+
+    @classmethod
+    def default(cls) -> "GeoIndex":
+        """Index seeded with STATE_ALIASES, so state ids do not depend on the data"""
+        index = cls()
+        for canonical, aliases in STATE_ALIASES.items():
+            index.add_alias(canonical, *aliases)
+        index.changed = False
+        return index
+
+    def __repr__(self) -> str:
+        return f"GeoIndex({len(self.states)} states, {len(self.places)} places, {len(self.aliases)} aliases)"
+
+    # 🏷️ States
+    def add_alias(self, canonical: str, *aliases: str) -> int:
+        """Register a canonical state name and spellings that resolve to it; returns its id"""
+        canonical_key = geo_key(canonical)
+        if canonical_key not in self._state_ids:
+            self._state_ids[canonical_key] = len(self.states)
+            self.states.append(canonical)
+        state = self._state_ids[canonical_key]
+        for name in (canonical,) + aliases:
+            key = geo_key(name)
+            if self.aliases.get(key) != self.states[state]:
+                self.aliases[key] = self.states[state]
+                self.changed = True
+                if self._state_grams is not None:
+                    self._state_grams.add(key, state)
+        return state
+
+    def state_id(self, name, add: bool = True, threshold: Optional[float] = None) -> int:
+        """Id of a state spelling; with a threshold, unknown spellings are matched approximately first"""
+        if name is None or pd.isna(name) or not geo_key(name):
+            return -1
+        canonical = self.aliases.get(geo_key(name))
+        if canonical is None and threshold is not None and len(geo_key(name)) >= MIN_FUZZY_LENGTH:
+            state = self.state_grams().match(geo_key(name), threshold)
+            if state is not None:
+                self.learned.append((tidy_name(name), self.states[state]))
+                return self.add_alias(self.states[state], name)
+        if canonical is None:
+            if not add:
+                return -1
+            return self.add_alias(tidy_name(name))
+        return self._state_ids[geo_key(canonical)]
+
+    def state_ids(self, values: pd.Series, add: bool = True, threshold: Optional[float] = None) -> np.ndarray:
+        """State id per row, resolved once per distinct spelling (-1 if missing)"""
+        codes, uniques = factorize_names(values)
+        lookup = np.array([self.state_id(name, add, threshold) for name in uniques] + [-1], dtype=np.int32)
+        return lookup[codes]
+
+    def state_grams(self) -> TrigramIndex:
+        """Trigram index over every state alias key, built on first use"""
+        if self._state_grams is None:
+            self._state_grams = TrigramIndex()
+            for key, canonical in self.aliases.items():
+                self._state_grams.add(key, self._state_ids[geo_key(canonical)])
+        return self._state_grams
+
+    # 📍 Places
+    def place_id(self, state_id: int, name, add: bool = True, threshold: Optional[float] = None) -> int:
+        """Id of a place spelling within a state; with a threshold, matched approximately before adding"""
+        if state_id < 0 or name is None or pd.isna(name) or not geo_key(name):
+            return -1
+        key = (int(state_id), geo_key(name))
+        if key in self._place_ids:
+            return self._place_ids[key]
+        if threshold is not None and len(key[1]) >= MIN_FUZZY_LENGTH:
+            place = self.place_grams(key[0]).match(key[1], threshold)
+            if place is not None:
+                self.learned.append((tidy_name(name), self.places[place][1]))
+                return self.add_place_alias(key, place)
+        if not add:
+            return -1
+        return self.add_place_alias(key, len(self.places), tidy_name(name))
+
+    def add_place_alias(self, key: Tuple[int, str], place: int, name: Optional[str] = None) -> int:
+        """Map a (state id, name key) to a place id, registering the place if name is given"""
+        if name is not None:
+            self.places.append((key[0], name))
+        self._place_ids[key] = place
+        self.changed = True
+        if key[0] in self._place_grams:
+            self._place_grams[key[0]].add(key[1], place)
+        return place
+
+    def place_grams(self, state_id: int) -> TrigramIndex:
+        """Trigram index over the place keys of one state, built on first use"""
+        if state_id not in self._place_grams:
+            grams = TrigramIndex()
+            for (state, key), place in self._place_ids.items():
+                if state == state_id:
+                    grams.add(key, place)
+            self._place_grams[state_id] = grams
+        return self._place_grams[state_id]
+
+    def place_ids(self, state_ids: np.ndarray, values: pd.Series, add: bool = True,
+                  threshold: Optional[float] = None) -> np.ndarray:
+        """Place id per row within its state, resolved once per distinct (state, spelling)"""
+        codes, uniques = factorize_names(values)
+        pair_codes, pair_states, name_codes = factorize_pairs(state_ids, codes, len(uniques))
+        lookup = np.array([self.place_id(state, uniques[code] if code < len(uniques) else None, add, threshold)
+                           for state, code in zip(pair_states, name_codes)] + [-1], dtype=np.int32)
+        return lookup[pair_codes]
+
+    def place_aliases(self) -> List[List]:
+        """[state id, name key, place id] for keys that are not the key of the place's own name"""
+        return [[state, key, place] for (state, key), place in self._place_ids.items()
+                if key != geo_key(self.places[place][1])]
+
+    # 🔤 Names
+    def state_names(self, ids: np.ndarray) -> np.ndarray:
+        names = np.array(self.states + [None], dtype=object)
+        return names[np.where(ids >= 0, ids, len(self.states))]
+
+    def place_names(self, ids: np.ndarray) -> np.ndarray:
+        names = np.array([name for _, name in self.places] + [None], dtype=object)
+        return names[np.where(ids >= 0, ids, len(self.places))]
+
+    def version(self) -> str:
+        """Fingerprint of the alias index (changes when a spelling is remapped)"""
+        aliases = json.dumps([sorted(self.aliases.items()), sorted(self.place_aliases())], ensure_ascii=False)
+        return hashlib.blake2b(aliases.encode(), digest_size=8).hexdigest()
+
+    # 💾 Persistence
+    def to_dict(self) -> Dict:
+        return {"states": self.states, "places": [list(place) for place in self.places], "aliases": self.aliases,
+                "place_aliases": self.place_aliases()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GeoIndex":
+        index = cls()
+        for name in data.get("states", []):
+            index.add_alias(name)
+        for alias, canonical in data.get("aliases", {}).items():
+            index.aliases[alias] = canonical
+        for state_id, name in data.get("places", []):
+            index.place_id(state_id, name)
+        for state_id, key, place in data.get("place_aliases", []):
+            index._place_ids[(state_id, key)] = place
+        index.changed = False
+        return index
+
+    def save(self, path: str) -> str:
+        """Atomically write the index as JSON"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.changed = False
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "GeoIndex":
+        """Saved index at path, or the default one if there is none yet"""
+        try:
+            with open(path) as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return cls.default()
+        except (OSError, ValueError) as e:
+            logging.warning(f"Unreadable geography index {path} ({e}); starting from the defaults")
+            return cls.default()
+
+    def extend(self, aliases: Dict[str, Iterable[str]]) -> "GeoIndex":
+        """Add {canonical: [spellings]} state aliases"""
+        for canonical, names in aliases.items():
+            self.add_alias(canonical, *names)
+        return self
+
+
+def factorize_pairs(state_ids: np.ndarray, codes: np.ndarray, n_names: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Distinct (state id, name code) pairs via one int64 key: pair code per row, states and name codes per pair
+
+    Missing names (code -1) take code n_names.
+    """
+    names = np.where(codes >= 0, codes, n_names)
+    pair_codes, pairs = pd.factorize(state_ids.astype(np.int64) * (n_names + 1) + names)
+    pair_states, name_codes = np.divmod(pairs, n_names + 1)
+    return pair_codes, pair_states, name_codes
+
+
+# 🗺️ Column normalisation
+def as_column(values: pd.Categorical, like: pd.Series):
+    """Categorical values in the dtype family of the original column"""
+    return values if isinstance(like.dtype, pd.CategoricalDtype) else values.astype(object)
+
+
+def canonicalize_geography(
+    df: pd.DataFrame,
+    index: GeoIndex,
+    state_column: str = "state",
+    place_columns: Sequence[str] = (),
+    threshold: Optional[float] = FUZZY_THRESHOLD,
+) -> pd.DataFrame:
+    """Replace state and place spellings with their canonical names from index
+
+    Each distinct spelling (and, for places, each distinct (state, spelling))
+    is resolved once: exact alias, else an approximate trigram match above
+    threshold (None disables it), else it is registered as a new name. Rows
+    are then remapped through category codes. Places are matched within
+    their row's state. index learns the new names and aliases; save it to
+    keep them.
+    """
+    if state_column not in df.columns:
+        logging.warning(f"Column {state_column} not found. Skipping geography normalisation.")
+        return df
+    learned_before = len(index.learned)
+
+    codes, uniques = factorize_names(df[state_column])
+    ids = np.full(len(uniques) + 1, -1, dtype=np.int32)
+    labels = list(uniques)
+    for code in frequency_order(codes, len(uniques)):
+        ids[code] = index.state_id(uniques[code], threshold=threshold)
+        labels[code] = index.states[ids[code]] if ids[code] >= 0 else uniques[code]
+    remapped = sum(label != original for label, original in zip(labels, uniques))
+    df[state_column] = as_column(canonical_categorical(labels, codes), df[state_column])
+    state_ids = ids[codes]
+    logging.info(f"🗺️ Normalised {state_column}: {remapped} of {len(uniques)} spellings mapped to canonical names")
+
+    for col in place_columns:
+        if col not in df.columns:
+            continue
+        codes, uniques = factorize_names(df[col])
+        pair_codes, pair_states, name_codes = factorize_pairs(state_ids, codes, len(uniques))
+        labels = [None] * len(name_codes)
+        remapped = 0
+        for pair in frequency_order(pair_codes, len(name_codes)):
+            original = uniques[name_codes[pair]] if name_codes[pair] < len(uniques) else None
+            place = index.place_id(pair_states[pair], original, threshold=threshold)
+            labels[pair] = index.places[place][1] if place >= 0 else original
+            remapped += labels[pair] != original
+        df[col] = as_column(canonical_categorical(labels, pair_codes), df[col])
+        logging.info(f"🗺️ Normalised {col}: {remapped} of {len(labels)} (state, spelling) pairs remapped")
+
+    learned = index.learned[learned_before:]
+    if learned:
+        shown = ", ".join(f"{alias!r} -> {canonical!r}" for alias, canonical in learned[:5])
+        logging.info(f"🗺️ Learned {len(learned)} approximate aliases: {shown}{' ...' if len(learned) > 5 else ''}")
+    return df
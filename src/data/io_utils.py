@@ -0,0 +1,61 @@
+"""
+Input/output utilities for the cleaned datasets
+
+Reading and encoding detection come from the enhanced pipeline; this module
+adds the quality-report and cleaned-data writers used by DataCleaningPipeline.
+"""
+
+import logging
+import os
+from typing import Any, List, Optional
+
+import pandas as pd
+
+from src.utils.lib import detailed_data_quality_report
+from src.utils.storage import DEFAULT_CLEANED_DIR
+
+from .enhanced_data_cleaning_pipeline import DatasetWriter, detect_encoding, safe_read_csv, wait_for_exports
+
+
+def export_data_quality_report(
+    df: pd.DataFrame,
+    output_path: str,
+    table_name: str = "Dataset",
+    target_col: Optional[str] = None,
+    expected_categories: Optional[List[Any]] = None,
+) -> pd.DataFrame:
+    """Write the per-column data quality report for df to a CSV and return it"""
+    report = detailed_data_quality_report(
+        df, table_name=table_name, target_col=target_col, expected_categories=expected_categories
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    report.to_csv(output_path, index=False)
+    logging.info(f"Exported data quality report for {table_name} to: {output_path}")
+    return report
+
+
+def save_cleaned_data(
+    df: pd.DataFrame,
+    name: str,
+    output_dir: Optional[str] = None,
+    formats: Optional[List[str]] = None,
+) -> List[str]:
+    """Write a cleaned frame as cleaned_<name>.csv, a Parquet dataset and/or the shared Arrow store
+
+    formats defaults to CONFIG["output_formats"]; returns the written paths.
+    """
+    output_dir = output_dir or DEFAULT_CLEANED_DIR
+    os.makedirs(output_dir, exist_ok=True)
+
+    writer = DatasetWriter(name, output_dir)
+    if formats is not None:
+        writer.write_csv = "csv" in formats
+        writer.write_parquet = "parquet" in formats
+        writer.write_arrow = "arrow" in formats
+    writer.write(df)
+    writer.close()
+    wait_for_exports(name)
+
+    logging.info(f"Saved cleaned {name} ({len(df)} rows) to: {writer.outputs}")
+    return writer.outputs
+
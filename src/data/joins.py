@@ -0,0 +1,342 @@
+"""
+Analytical fact table joining AQI, IDSP, population projections and vahan
+
+Each dataset is reduced to integer keys first: state and place ids from the
+GeoIndex alias index, and a period number at week or month grain. Rows are
+aggregated on one packed int64 key (state | place | period), so every
+source becomes a table sorted by that key. Joins are then sort-merge lookups
+(np.searchsorted) on those keys rather than merges on free-text names.
+
+AQI and IDSP share the fact grain and are outer-joined into the key spine.
+Population projections and vahan registrations are monthly and state-level.
+They are attached to each fact row through its state and month (at week
+grain, the month its Monday falls in).
+
+load_fact_table() builds from the cleaned store and caches the result in
+the shared Arrow store, keyed on the manifest's raw-input hashes and
+cleaning config fingerprints.
+"""
+
+import calendar
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.storage import (
+    DEFAULT_CLEANED_DIR,
+    load_cleaned_dataset,
+    load_manifest,
+    load_shared_dataset,
+    publish_shared_dataset,
+)
+
+from .geography import GEO_INDEX_FILE, GeoIndex
+
+GRAINS = ["week", "month"]
+LEVELS = ["state", "place"]
+FACTS_DIR = "facts"
+
+# Packed key layout: 16 bits state | 24 bits place (+1, 0 = whole state) | 23 bits period
+PLACE_BITS = 24
+PERIOD_BITS = 23
+
+# Columns each source needs from the cleaned store, and where its places live
+SOURCE_COLUMNS = {
+    "aqi": ["date", "state", "area", "aqi_value"],
+    "idsp": ["reporting_date", "state", "district", "cases", "deaths"],
+    "pp": ["year", "month", "state", "gender", "value"],
+    "vahan": ["year", "month", "state", "fuel", "value"],
+}
+PLACE_COLUMNS = {"aqi": "area", "idsp": "district"}
+
+# Id columns are built int32; the Arrow store widens integers to int64
+ID_DTYPES = {"state_id": np.int32, "place_id": np.int32}
+
+# Vahan fuel labels counted as EV registrations ("ELECTRIC(BOV)", "PURE EV", "STRONG HYBRID EV")
+EV_FUEL_PATTERN = r"ELECTRIC|\bEV\b"
+
+MONTH_NUMBERS = {name.casefold(): number for number, name in enumerate(calendar.month_name) if name}
+MONTH_NUMBERS.update({name.casefold(): number for number, name in enumerate(calendar.month_abbr) if name})
+
+
+# 🗓️ Period numbers
+def day_numbers(dates: pd.Series) -> np.ndarray:
+    """Days since 1970-01-01 (NaT as -1)"""
+    days = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    return np.where(np.isnat(days), -1, days.view("int64"))
+
+
+def date_periods(dates: pd.Series, grain: str) -> np.ndarray:
+    """Week number (weeks since Monday 1969-12-29) or month number (months since 1970-01) per date; -1 if NaT"""
+    days = day_numbers(dates)
+    if grain == "week":
+        # Day 0 (1970-01-01) was a Thursday, so day + 3 counts from the Monday before
+        periods = (days + 3) // 7
+    else:
+        periods = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[M]").view("int64")
+    return np.where(days >= 0, periods, -1)
+
+
+def month_periods(years: pd.Series, months: pd.Series) -> np.ndarray:
+    """Month number from year and month columns (month names, abbreviations or numbers)"""
+    codes, uniques = pd.factorize(months)
+    lookup = []
+    for month in uniques:
+        number = MONTH_NUMBERS.get(str(month).strip().casefold())
+        if number is None and str(month).strip().isdigit():
+            number = int(str(month).strip())
+        lookup.append(number if number and 1 <= number <= 12 else 0)
+    numbers = np.array(lookup + [0], dtype=np.int64)[codes]
+    years = pd.to_numeric(years, errors="coerce").to_numpy(dtype="float64")
+    valid = (numbers > 0) & ~np.isnan(years) & (years >= 1970)
+    return np.where(valid, (np.nan_to_num(years).astype(np.int64) - 1970) * 12 + numbers - 1, -1)
+
+
+def week_months(weeks: np.ndarray) -> np.ndarray:
+    """Month number containing each week's Monday"""
+    mondays = (weeks * 7 - 3).astype("datetime64[D]")
+    return mondays.astype("datetime64[M]").view("int64")
+
+
+def period_dates(periods: np.ndarray, grain: str) -> np.ndarray:
+    """First day of each period number"""
+    if grain == "week":
+        return (periods * 7 - 3).astype("datetime64[D]").astype("datetime64[ns]")
+    return periods.astype("datetime64[M]").astype("datetime64[ns]")
+
+
+# 🔑 Packed keys
+def pack_keys(states: np.ndarray, places: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """One int64 per (state, place, period); place -1 means the whole state"""
+    return ((states.astype(np.int64) << (PLACE_BITS + PERIOD_BITS))
+            | ((places.astype(np.int64) + 1) << PERIOD_BITS)
+            | periods.astype(np.int64))
+
+
+def unpack_keys(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    states = keys >> (PLACE_BITS + PERIOD_BITS)
+    places = ((keys >> PERIOD_BITS) & ((1 << PLACE_BITS) - 1)) - 1
+    periods = keys & ((1 << PERIOD_BITS) - 1)
+    return states, places, periods
+
+
+def aggregate(keys: np.ndarray, measures: Dict[str, Tuple[np.ndarray, str]], name: str) -> pd.DataFrame:
+    """Group measures on packed keys (rows keyed -1 dropped); result is indexed by key, sorted"""
+    valid = keys >= 0
+    if not valid.all():
+        logging.info(f"🔗 {name}: {int((~valid).sum())} rows without a state or period left out of the join")
+    frame = pd.DataFrame({column: values[valid] for column, (values, _) in measures.items()})
+    result = frame.groupby(keys[valid], sort=True).agg({column: how for column, (_, how) in measures.items()})
+    result.index.name = "key"
+    return result
+
+
+def lookup(source: pd.DataFrame, keys: np.ndarray) -> pd.DataFrame:
+    """Sort-merge lookup of a key-sorted aggregate at keys (NaN where absent)"""
+    source_keys = source.index.to_numpy()
+    positions = np.clip(np.searchsorted(source_keys, keys), 0, max(len(source_keys) - 1, 0))
+    found = source_keys[positions] == keys if len(source_keys) else np.zeros(len(keys), dtype=bool)
+    values = {column: np.where(found, source[column].to_numpy(dtype="float64")[positions], np.nan)
+              for column in source.columns}
+    return pd.DataFrame(values)
+
+
+# 🧮 Source aggregates
+def geo_keys(df: pd.DataFrame, source: str, index: GeoIndex, level: str) -> Tuple[np.ndarray, np.ndarray]:
+    states = index.state_ids(df["state"])
+    place_column = PLACE_COLUMNS.get(source)
+    if level == "place" and place_column in df.columns:
+        return states, index.place_ids(states, df[place_column])
+    return states, np.full(len(df), -1, dtype=np.int32)
+
+
+def keyed(states: np.ndarray, places: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    return np.where((states >= 0) & (periods >= 0), pack_keys(states, places, periods), -1)
+
+
+def aqi_facts(df: pd.DataFrame, index: GeoIndex, grain: str, level: str) -> pd.DataFrame:
+    """AQI readings, sum, max and mean per key"""
+    states, places = geo_keys(df, "aqi", index, level)
+    keys = keyed(states, places, date_periods(df["date"], grain))
+    values = pd.to_numeric(df["aqi_value"], errors="coerce").to_numpy(dtype="float64")
+    facts = aggregate(keys, {"aqi_readings": (~np.isnan(values), "sum"), "aqi_sum": (values, "sum"),
+                             "aqi_max": (values, "max")}, "aqi")
+    facts["aqi_mean"] = facts["aqi_sum"] / facts["aqi_readings"].where(facts["aqi_readings"] > 0)
+    return facts
+
+
+def idsp_facts(df: pd.DataFrame, index: GeoIndex, grain: str, level: str) -> pd.DataFrame:
+    """IDSP outbreaks reported, cases and deaths per key"""
+    states, places = geo_keys(df, "idsp", index, level)
+    keys = keyed(states, places, date_periods(df["reporting_date"], grain))
+    return aggregate(keys, {
+        "outbreaks": (np.ones(len(df), dtype=np.int64), "sum"),
+        "cases": (pd.to_numeric(df["cases"], errors="coerce").to_numpy(dtype="float64"), "sum"),
+        "deaths": (pd.to_numeric(df["deaths"], errors="coerce").to_numpy(dtype="float64"), "sum"),
+    }, "idsp")
+
+
+def population_facts(df: pd.DataFrame, index: GeoIndex) -> pd.DataFrame:
+    """Projected population per state and month (gender "Total" rows, else the sum over genders)"""
+    if "gender" in df.columns:
+        is_total = df["gender"].astype(str).str.strip().str.casefold().eq("total").to_numpy()
+        if is_total.any():
+            df = df[is_total]
+    states = index.state_ids(df["state"])
+    keys = keyed(states, np.full(len(df), -1), month_periods(df["year"], df["month"]))
+    values = pd.to_numeric(df["value"], errors="coerce").to_numpy(dtype="float64")
+    return aggregate(keys, {"population": (values, "sum")}, "pp")
+
+
+def vahan_facts(df: pd.DataFrame, index: GeoIndex) -> pd.DataFrame:
+    """Vehicle and EV registrations per state and month"""
+    states = index.state_ids(df["state"])
+    keys = keyed(states, np.full(len(df), -1), month_periods(df["year"], df["month"]))
+    values = pd.to_numeric(df["value"], errors="coerce").to_numpy(dtype="float64")
+    fuel_codes, fuels = pd.factorize(df["fuel"])
+    is_ev = np.append(pd.Series(fuels, dtype=object).astype(str).str.contains(EV_FUEL_PATTERN, case=False).to_numpy(),
+                      False)[fuel_codes]
+    facts = aggregate(keys, {"registrations": (values, "sum"), "ev_registrations": (np.where(is_ev, values, 0), "sum")},
+                      "vahan")
+    facts["ev_share"] = facts["ev_registrations"] / facts["registrations"].where(facts["registrations"] > 0)
+    return facts
+
+
+# 🔗 Fact table
+def build_fact_table(
+    frames: Dict[str, pd.DataFrame],
+    grain: str = "month",
+    level: str = "state",
+    index: Optional[GeoIndex] = None,
+) -> pd.DataFrame:
+    """Join cleaned frames ("aqi", "idsp", "pp", "vahan"; any may be missing) into one fact table
+
+    One row per (state[, place], period) seen in AQI or IDSP. level "place"
+    keeps AQI areas and IDSP districts apart (they join where the names
+    match within a state); population and vahan measures are state-wide.
+    index is updated in place with any new names; pass a saved one to keep
+    ids stable across runs.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain {grain!r}; expected one of {GRAINS}")
+    if level not in LEVELS:
+        raise ValueError(f"Unknown level {level!r}; expected one of {LEVELS}")
+    index = index if index is not None else GeoIndex.default()
+
+    events = []
+    if frames.get("aqi") is not None:
+        events.append(aqi_facts(frames["aqi"], index, grain, level))
+    if frames.get("idsp") is not None:
+        events.append(idsp_facts(frames["idsp"], index, grain, level))
+    if not events:
+        raise ValueError("build_fact_table needs the aqi or idsp frame to define its rows")
+
+    # Key spine: every key in either event source, sorted
+    keys = events[0].index.to_numpy()
+    for facts in events[1:]:
+        keys = np.union1d(keys, facts.index.to_numpy())
+    states, places, periods = unpack_keys(keys)
+
+    table = pd.DataFrame({"state_id": states.astype(ID_DTYPES["state_id"])})
+    if level == "place":
+        table["place_id"] = places.astype(ID_DTYPES["place_id"])
+    table["period"] = period_dates(periods, grain)
+    table["state"] = index.state_names(states)
+    if level == "place":
+        table["place"] = index.place_names(places)
+    parts = [table] + [lookup(facts, keys) for facts in events]
+
+    # Monthly, state-wide sources attach through (state, month)
+    months = week_months(periods) if grain == "week" else periods
+    monthly_keys = pack_keys(states, np.full(len(keys), -1), months)
+    if frames.get("pp") is not None:
+        parts.append(lookup(population_facts(frames["pp"], index), monthly_keys))
+    if frames.get("vahan") is not None:
+        parts.append(lookup(vahan_facts(frames["vahan"], index), monthly_keys))
+
+    facts = pd.concat(parts, axis=1)
+    # No IDSP report for a key means no outbreak (and no cases) was reported there
+    for column in ["aqi_readings", "outbreaks", "cases", "deaths"]:
+        if column in facts.columns:
+            facts[column] = facts[column].fillna(0).astype(np.int64)
+    if "population" in facts.columns and "cases" in facts.columns:
+        # Population is in thousands (unit "value in Thousands")
+        facts["cases_per_100k"] = facts["cases"] / (facts["population"] / 100)
+    logging.info(f"🔗 Built {level}/{grain} fact table: {len(facts)} rows from {', '.join(k for k, v in frames.items() if v is not None)}")
+    return facts
+
+
+# 💾 Cached fact table
+def fact_table_name(grain: str, level: str) -> str:
+    return f"facts_{level}_{grain}"
+
+
+def fact_table_key(inputs: Dict[str, Any], grain: str, level: str, index: GeoIndex) -> str:
+    settings = json.dumps({"inputs": inputs, "grain": grain, "level": level, "geo": index.version()}, sort_keys=True)
+    return hashlib.blake2b(settings.encode(), digest_size=8).hexdigest()
+
+
+def load_source(name: str, output_dir: str) -> Optional[pd.DataFrame]:
+    """A cleaned dataset's join columns, from the shared Arrow store or Parquet (None if absent)"""
+    for loader in (load_shared_dataset, load_cleaned_dataset):
+        try:
+            return loader(name, output_dir, columns=SOURCE_COLUMNS[name])
+        except (FileNotFoundError, KeyError, ValueError):
+            continue
+        except ImportError:
+            break
+    return None
+
+
+def load_fact_table(
+    grain: str = "month",
+    level: str = "state",
+    output_dir: Optional[str] = None,
+    rebuild: bool = False,
+) -> pd.DataFrame:
+    """Fact table for the cleaned store in output_dir, rebuilt only when its inputs changed
+
+    The table is cached in the shared Arrow store as facts_<level>_<grain>;
+    the cache is reused while the manifest's raw-input hashes, the
+    cleaning config each source was stored with and the geography alias
+    index are unchanged.
+    """
+    output_dir = output_dir or DEFAULT_CLEANED_DIR
+    index_path = os.path.join(output_dir, GEO_INDEX_FILE)
+    index = GeoIndex.load(index_path)
+    datasets = load_manifest(output_dir).get("datasets", {})
+    inputs = {name: {"hash": datasets[name].get("input", {}).get("hash"), "config": datasets[name].get("config")}
+              for name in SOURCE_COLUMNS if name in datasets}
+    key = fact_table_key(inputs, grain, level, index)
+
+    name = fact_table_name(grain, level)
+    meta_path = os.path.join(output_dir, FACTS_DIR, f"{name}.json")
+    if not rebuild and os.path.exists(meta_path):
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("key") == key:
+                logging.info(f"♻️ Reusing cached {level}/{grain} fact table from {meta.get('updated')}")
+                facts = load_shared_dataset(name, output_dir)
+                return facts.astype({column: dtype for column, dtype in ID_DTYPES.items() if column in facts.columns})
+        except (OSError, ValueError, FileNotFoundError):
+            pass
+
+    frames = {source: load_source(source, output_dir) for source in SOURCE_COLUMNS}
+    facts = build_fact_table(frames, grain=grain, level=level, index=index)
+
+    # Cache under the key of the index as used (new names were appended to it)
+    index.save(index_path)
+    publish_shared_dataset(facts, name, output_dir)
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+    with open(meta_path, "w") as f:
+        json.dump({"key": fact_table_key(inputs, grain, level, index), "rows": len(facts),
+                   "sources": [source for source, frame in frames.items() if frame is not None],
+                   "updated": datetime.now().isoformat()}, f, indent=2)
+    return facts
@@ -0,0 +1,402 @@
+"""
+Composable, lazily evaluated cleaning pipeline for the AirPure datasets
+
+Each dataset has a declared list of stages. Consecutive "map" stages (which
+change columns in place and keep every row) are fused: they run one after
+another over the same frame, with no copy in between and one memory check
+per run. "barrier" stages such as duplicate removal may drop rows and end a
+fused run. Nothing is read until a dataset is collected, and only the
+requested dataset (with the columns its stages need) is loaded, so asking
+for AQI never touches IDSP or vahan.
+
+Usage:
+    pipeline = DataCleaningPipeline()
+    aqi = pipeline["aqi"].collect()
+    results = pipeline.run(["idsp", "aqi"])
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.instrumentation import instrument, recording
+
+from . import enhanced_data_cleaning_pipeline as engine
+from .enhanced_data_cleaning_pipeline import IDSP_DUPLICATE_SUBSET, clean_idsp_dataset
+from .geography import GEO_INDEX_FILE, GeoIndex
+from .io_utils import safe_read_csv, save_cleaned_data
+from .pollutants import POLLUTANT_COLUMN, encode_pollutant_column
+from .transformers import normalize_text_columns, standardize_dates
+from .rules import rule_columns
+from .validators import validate_dataframe_structure
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+EXPECTED_COLUMNS = {
+    "idsp": ["year", "week", "outbreak_starting_date", "reporting_date",
+             "state", "district", "disease_illness_name", "status", "cases", "deaths"],
+    "aqi": ["date", "state", "area", "number_of_monitoring_stations",
+            "prominent_pollutants", "aqi_value", "air_quality_status"],
+    "pp": ["year", "month", "state", "gender", "value"],
+    "vahan": ["year", "month", "state", "rto", "vehicle_class", "fuel", "value"],
+}
+
+DUPLICATE_SUBSETS = {
+    "idsp": IDSP_DUPLICATE_SUBSET,
+    "aqi": ["date", "state", "area"],
+    "pp": ["year", "month", "state", "gender"],
+    "vahan": ["year", "month", "state", "rto", "vehicle_class", "fuel"],
+}
+
+IDSP_DATE_COLUMNS = ["reporting_date", "outbreak_starting_date"]
+
+
+# 🧩 Stages
+class Stage:
+    """One declared step of a dataset's cleaning graph
+
+    kind "map": changes columns of the frame it is given in place and returns
+    that same frame, keeping every row, so runs of map stages are fused.
+    kind "barrier": may drop rows. columns: columns the stage reads (None =
+    all), used to project the load.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[pd.DataFrame], pd.DataFrame],
+        kind: str = "map",
+        columns: Optional[List[str]] = None,
+    ):
+        if kind not in ("map", "barrier"):
+            raise ValueError(f"Unknown stage kind: {kind}")
+        self.name = name
+        self.func = func
+        self.kind = kind
+        self.columns = columns
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, kind={self.kind!r})"
+
+
+def fuse_stages(stages: List[Stage]) -> List[List[Stage]]:
+    """Group consecutive map stages; every barrier forms its own group"""
+    groups: List[List[Stage]] = []
+    for stage in stages:
+        if stage.kind == "map" and groups and groups[-1][-1].kind == "map":
+            groups[-1].append(stage)
+        else:
+            groups.append([stage])
+    return groups
+
+
+def apply_stages(df: pd.DataFrame, stages: List[Stage], name: str) -> pd.DataFrame:
+    """Run stages over df, fused groups sharing one frame without intermediate copies
+
+    name is the dataset key; each stage is recorded under (name, stage.name)
+    while a stage recorder is active. A map stage that drops rows raises
+    ValueError; one that returns a new frame instead of the one it was given
+    is logged, since it copies the data inside a fused run.
+    """
+    for group in fuse_stages(stages):
+        for stage in group:
+            result = instrument(name, stage.name, stage.func, df)
+            if stage.kind == "map":
+                if len(result) != len(df):
+                    raise ValueError(f"Map stage {stage.name} changed {name} from {len(df)} to {len(result)} rows")
+                if result is not df:
+                    logging.warning(f"Map stage {stage.name} returned a copy of {name}; modify the frame in place")
+            df = result
+        engine.monitor_memory_usage(df, f"{name.upper()} after {'+'.join(stage.name for stage in group)}")
+    return df
+
+
+def required_columns(stages: List[Stage], columns: Optional[List[str]]) -> Optional[List[str]]:
+    """Columns to read for `columns` after `stages` (None = all)"""
+    if columns is None or any(stage.columns is None for stage in stages):
+        return None
+    needed = list(columns)
+    for stage in stages:
+        needed += [col for col in stage.columns if col not in needed]
+    return needed
+
+
+def duplicates_stage(name: str) -> Stage:
+    """Exact duplicates over every expected column, then partial ones over DUPLICATE_SUBSETS[name]"""
+    subset = DUPLICATE_SUBSETS[name]
+    return Stage(
+        "drop_duplicates",
+        lambda df: engine.handle_duplicates(df, subset_cols=subset, name=name.upper()),
+        kind="barrier",
+        columns=EXPECTED_COLUMNS[name] + [col for col in subset if col not in EXPECTED_COLUMNS[name]],
+    )
+
+
+def structure_stage(name: str) -> Stage:
+    def check(df: pd.DataFrame) -> pd.DataFrame:
+        validate_dataframe_structure(df, EXPECTED_COLUMNS[name], name.upper())
+        return df
+    return Stage("validate_structure", check, columns=[])
+
+
+def rules_stage(name: str) -> Stage:
+    """All of a dataset's consistency rules as one vectorized stage"""
+    columns = []
+    for rule in engine.dataset_rules(name):
+        columns += [col for col in rule_columns(rule["expr"]) if col not in columns]
+    return Stage("apply_rules", lambda df: engine.apply_rules_for(df, name), columns=columns)
+
+
+def text_stage(
+    columns: List[str],
+    gazetteer: Optional[GeoIndex] = None,
+    place_columns: Optional[List[str]] = None,
+) -> Stage:
+    """Whitespace normalisation of text columns, plus canonical geography names with a gazetteer"""
+    return Stage(
+        "normalize_text",
+        lambda df: normalize_text_columns(df, columns, gazetteer=gazetteer, place_columns=place_columns,
+                                          threshold=engine.CONFIG["geo_match_threshold"]),
+        columns=columns,
+    )
+
+
+def default_stages(gazetteer: Optional[GeoIndex] = None) -> Dict[str, List[Stage]]:
+    """Declared cleaning graph for every dataset
+
+    With a gazetteer, the text stages also map state and place names to their
+    canonical spellings (IDSP gains a state/district text stage).
+    """
+    idsp_text = [text_stage(["state", "district"], gazetteer)] if gazetteer is not None else []
+    return {
+        "idsp": [
+            structure_stage("idsp"),
+            Stage("parse_dates", lambda df: standardize_dates(df, IDSP_DATE_COLUMNS), columns=IDSP_DATE_COLUMNS),
+            *idsp_text,
+            rules_stage("idsp"),
+            Stage("validate_week", engine.add_week_validation_flag, columns=["week", "reporting_date"]),
+            duplicates_stage("idsp"),
+        ],
+        "aqi": [
+            structure_stage("aqi"),
+            Stage("parse_dates", lambda df: standardize_dates(df, ["date"]), columns=["date"]),
+            text_stage(["state", "area"], gazetteer),
+            Stage("encode_pollutants", encode_pollutant_column, columns=[POLLUTANT_COLUMN]),
+            rules_stage("aqi"),
+            duplicates_stage("aqi"),
+        ],
+        "pp": [
+            structure_stage("pp"),
+            text_stage(["state"], gazetteer),
+            rules_stage("pp"),
+            duplicates_stage("pp"),
+        ],
+        "vahan": [
+            structure_stage("vahan"),
+            text_stage(["state", "rto"], gazetteer, place_columns=[]),
+            rules_stage("vahan"),
+            duplicates_stage("vahan"),
+        ],
+    }
+
+
+# 🧪 Dataset cleaners
+def clean_aqi_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean AQI: parse dates, tidy state/area text, encode pollutants, consistency rules, duplicates"""
+    logging.info("📊 Starting AQI dataset cleaning")
+    df = apply_stages(df, default_stages()["aqi"], "aqi")
+    logging.info("✅ AQI dataset cleaning complete")
+    return df
+
+
+def clean_population_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean population projections: tidy state text, consistency rules, duplicates"""
+    logging.info("📊 Starting population projection dataset cleaning")
+    df = apply_stages(df, default_stages()["pp"], "pp")
+    logging.info("✅ Population projection dataset cleaning complete")
+    return df
+
+
+def clean_vahan_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean vahan registrations: tidy state/RTO text, consistency rules, duplicates"""
+    logging.info("📊 Starting vahan dataset cleaning")
+    df = apply_stages(df, default_stages()["vahan"], "vahan")
+    logging.info("✅ Vahan dataset cleaning complete")
+    return df
+
+
+# 💤 Lazy datasets
+class LazyDataset:
+    """Deferred handle on one dataset; nothing is read until collect()"""
+
+    def __init__(self, pipeline: "DataCleaningPipeline", name: str,
+                 columns: Optional[List[str]] = None, cleaned: bool = True):
+        self.pipeline = pipeline
+        self.name = name
+        self.columns = columns
+        self.cleaned = cleaned
+
+    def select(self, columns: List[str]) -> "LazyDataset":
+        return LazyDataset(self.pipeline, self.name, list(columns), self.cleaned)
+
+    def raw(self) -> "LazyDataset":
+        """The dataset as read (schema applied), skipping the cleaning stages"""
+        return LazyDataset(self.pipeline, self.name, self.columns, cleaned=False)
+
+    def explain(self) -> str:
+        return self.pipeline.explain(self.name, self.columns, self.cleaned)
+
+    def collect(self) -> pd.DataFrame:
+        return self.pipeline.materialize(self.name, self.columns, self.cleaned)
+
+    def __repr__(self) -> str:
+        return f"LazyDataset({self.name!r}, columns={self.columns}, cleaned={self.cleaned})"
+
+
+# 🏗️ Pipeline
+class DataCleaningPipeline:
+    """Declared, composable cleaning graph over the raw datasets
+
+    config overrides keys of the enhanced pipeline's CONFIG while stages run.
+    Cleaned frames are memoised per dataset until its stages change.
+    """
+
+    def __init__(
+        self,
+        paths: Optional[Dict[str, str]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        stages: Optional[Dict[str, List[Stage]]] = None,
+    ):
+        self.paths = paths or engine.get_file_paths(BASE_DIR)
+        self.config = {**engine.CONFIG, **(config or {})}
+        self.gazetteer_path = os.path.join(BASE_DIR, self.config["output_dir"], GEO_INDEX_FILE)
+        self.gazetteer = GeoIndex.load(self.gazetteer_path) if self.config["normalize_geography"] else None
+        self.stages = {name: list(declared) for name, declared in (stages or default_stages(self.gazetteer)).items()}
+        self._frames: Dict[Tuple[str, bool, Optional[Tuple[str, ...]]], pd.DataFrame] = {}
+
+    # Composition
+    def add_stage(self, name: str, stage: Stage, before: Optional[str] = None) -> "DataCleaningPipeline":
+        """Append stage to a dataset's graph (or insert it before the named stage)"""
+        stages = self.stages.setdefault(name, [])
+        position = len(stages)
+        if before is not None:
+            position = next(i for i, existing in enumerate(stages) if existing.name == before)
+        stages.insert(position, stage)
+        self.invalidate(name)
+        return self
+
+    def remove_stage(self, name: str, stage_name: str) -> "DataCleaningPipeline":
+        self.stages[name] = [stage for stage in self.stages[name] if stage.name != stage_name]
+        self.invalidate(name)
+        return self
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop memoised frames (for one dataset, or all)"""
+        self._frames = {key: df for key, df in self._frames.items() if name is not None and key[0] != name}
+
+    # Lazy access
+    def dataset(self, name: str) -> LazyDataset:
+        if name not in self.paths:
+            raise KeyError(f"Unknown dataset: {name}")
+        return LazyDataset(self, name)
+
+    __getitem__ = dataset
+
+    def plan(self, name: str, cleaned: bool = True) -> List[List[Stage]]:
+        return fuse_stages(self.stages.get(name, [])) if cleaned else []
+
+    def explain(self, name: str, columns: Optional[List[str]] = None, cleaned: bool = True) -> str:
+        stages = self.stages.get(name, []) if cleaned else []
+        read = required_columns(stages, columns)
+        lines = [f"read {self.paths[name]} columns={read or 'all'}"]
+        for group in self.plan(name, cleaned):
+            label = "fused" if len(group) > 1 else group[0].kind
+            lines.append(f"{label}: {' -> '.join(stage.name for stage in group)}")
+        if columns is not None:
+            lines.append(f"select {columns}")
+        return "\n".join(lines)
+
+    @contextmanager
+    def _engine_config(self):
+        """Apply this pipeline's config to the shared CONFIG while stages run"""
+        saved = dict(engine.CONFIG)
+        engine.CONFIG.update(self.config)
+        if not os.path.isabs(engine.CONFIG["inconsistency_dir"]):
+            engine.CONFIG["inconsistency_dir"] = os.path.join(BASE_DIR, engine.CONFIG["inconsistency_dir"])
+        os.makedirs(engine.CONFIG["inconsistency_dir"], exist_ok=True)
+        try:
+            yield
+        finally:
+            engine.CONFIG.clear()
+            engine.CONFIG.update(saved)
+
+    def materialize(self, name: str, columns: Optional[List[str]] = None, cleaned: bool = True) -> pd.DataFrame:
+        """Read and (if cleaned) run the dataset's stages, reusing memoised frames"""
+        stages = self.stages.get(name, []) if cleaned else []
+        read = required_columns(stages, columns)
+        key = (name, cleaned, tuple(read) if read is not None else None)
+
+        df = self._frames.get((name, cleaned, None), self._frames.get(key))
+        if df is None:
+            logging.info(f"⚙️ Materialising {name} ({'cleaned' if cleaned else 'raw'})")
+            # Projected reads skip columns the file lacks, so validate_structure can report them
+            usecols = None if read is None else (lambda col, wanted=frozenset(read): col in wanted)
+            df = instrument(name, "safe_read_csv", safe_read_csv, self.paths[name], schema=name, usecols=usecols)
+            if stages:
+                with self._engine_config():
+                    df = apply_stages(df, stages, name)
+            self._frames[key] = df
+        return df[columns] if columns is not None else df
+
+    # Batch run
+    def run(self, datasets: Optional[List[str]] = None, save: bool = True) -> Dict[str, Any]:
+        """Clean datasets (default: every raw file present) and optionally save them"""
+        start = time.time()
+        names = datasets or [name for name, path in self.paths.items() if os.path.exists(path)]
+        results = {"datasets_processed": [], "profiles": {}, "outputs": {}, "errors": [], "success": True}
+
+        with recording(trace_memory=self.config["trace_memory"]) as recorder:
+            self._run_datasets(names, save, results)
+            # Stage exports (inconsistency reports) are queued; let them land before returning
+            export_errors = engine.flush_exports()
+        if save and self.gazetteer is not None and self.gazetteer.changed:
+            self.gazetteer.save(self.gazetteer_path)
+            logging.info(f"🗺️ Saved geography index to: {self.gazetteer_path}")
+        results["errors"].extend(export_errors)
+        results["success"] = results["success"] and not export_errors
+
+        results["stage_metrics"] = recorder.to_list()
+        results["duration"] = time.time() - start
+        logging.info(f"🎉 Cleaned {len(results['datasets_processed'])} datasets in {results['duration']:.2f} seconds")
+        return results
+
+    def _run_datasets(self, names: List[str], save: bool, results: Dict[str, Any]):
+        for name in names:
+            try:
+                df = self.materialize(name)
+                with self._engine_config():
+                    results["profiles"][name] = instrument(name, "profile_dataframe", engine.profile_dataframe, df, name)
+                if save:
+                    output_dir = os.path.join(BASE_DIR, self.config["output_dir"])
+                    results["outputs"][name] = instrument(
+                        name, "save_cleaned_data", save_cleaned_data,
+                        df, name, output_dir=output_dir, formats=self.config["output_formats"])
+                results["datasets_processed"].append(name)
+            except Exception as e:
+                error_msg = f"Failed to clean {name}: {str(e)}"
+                logging.error(error_msg)
+                results["errors"].append(error_msg)
+                results["success"] = False
+
+
+def run_cleaning_pipeline(
+    datasets: Optional[List[str]] = None,
+    config: Optional[Dict[str, Any]] = None,
+    save: bool = True,
+) -> Dict[str, Any]:
+    """Clean (and save) the selected datasets with a default DataCleaningPipeline"""
+    return DataCleaningPipeline(config=config).run(datasets, save=save)
@@ -0,0 +1,210 @@
+"""
+Pollutant bitmask encoding of the multi-valued prominent_pollutants column
+
+Values such as "PM2.5,PM10" name several pollutants. Each distinct string is
+parsed once into a bitmask over a pollutant-code dictionary (bit i set =
+codes[i] was prominent), and rows take the mask of their string. Counting,
+ranking and top/bottom-N then work per pollutant rather than per combination,
+as array operations over the masks.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .rules import bitmask_dtype
+
+POLLUTANT_COLUMN = "prominent_pollutants"
+MASK_COLUMN = "pollutant_mask"
+
+# The eight CPCB AQI pollutants, in a fixed order so their bits are stable;
+# tokens outside this list are appended to the dictionary as they are found
+KNOWN_POLLUTANTS = ["PM2.5", "PM10", "NO2", "SO2", "CO", "O3", "NH3", "Pb"]
+_CANONICAL = {name.upper(): name for name in KNOWN_POLLUTANTS}
+
+
+def split_pollutants(value) -> List[str]:
+    """Pollutant names in one cell ("pm10, PM2.5" -> ["PM10", "PM2.5"])"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    tokens = [token.strip() for token in str(value).replace(";", ",").split(",")]
+    return [_CANONICAL.get(token.upper(), token) for token in tokens if token]
+
+
+# 🔢 Encoding
+def encode_pollutants(values: pd.Series, codes: Optional[List[str]] = None) -> Tuple[np.ndarray, List[str]]:
+    """Bitmask per row plus the pollutant-code dictionary (parsed once per distinct value)
+
+    Pass the codes of an earlier encoding to keep bit positions consistent
+    across frames; new tokens are appended after them.
+    """
+    codes = list(codes or KNOWN_POLLUTANTS)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        row_codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        row_codes, uniques = pd.factorize(values)
+
+    positions = {name: bit for bit, name in enumerate(codes)}
+    distinct = []
+    for value in uniques:
+        mask = 0
+        for name in split_pollutants(value):
+            if name not in positions:
+                positions[name] = len(codes)
+                codes.append(name)
+            mask |= 1 << positions[name]
+        distinct.append(mask)
+
+    dtype = bitmask_dtype(len(codes))
+    # Missing values (code -1) take the trailing zero mask
+    lookup = np.array(distinct + [0], dtype=dtype)
+    return lookup[row_codes], codes
+
+
+def decode_pollutants(masks: np.ndarray, codes: List[str]) -> np.ndarray:
+    """Comma-separated pollutant names per mask (decoded once per distinct mask)"""
+    row_codes, uniques = pd.factorize(masks)
+    names = np.array([",".join(name for bit, name in enumerate(codes) if int(mask) >> bit & 1) for mask in uniques],
+                     dtype=object)
+    return names[row_codes]
+
+
+def pollutant_matrix(masks: np.ndarray, codes: List[str]) -> np.ndarray:
+    """Boolean one-hot matrix, one row per mask and one column per pollutant code"""
+    bits = np.arange(len(codes), dtype=np.uint64)
+    return (masks.astype(np.uint64)[:, None] >> bits & np.uint64(1)).astype(bool)
+
+
+def encode_pollutant_column(
+    df: pd.DataFrame,
+    column: str = POLLUTANT_COLUMN,
+    codes: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Add the MASK_COLUMN bitmask; the code dictionary goes to df.attrs["pollutant_codes"]"""
+    if column not in df.columns:
+        logging.warning(f"Column {column} not found. Skipping pollutant encoding.")
+        return df
+    masks, codes = encode_pollutants(df[column], codes)
+    df[MASK_COLUMN] = masks
+    df.attrs["pollutant_codes"] = codes
+    logging.info(f"🧪 Encoded {column} over {len(codes)} pollutants")
+    return df
+
+
+# 📊 Counts and rankings
+def group_codes(df: pd.DataFrame, by: List[str]) -> Tuple[np.ndarray, pd.Index]:
+    """Dense group number per row plus the sorted group keys (one int64 key, not tuples)"""
+    codes, uniques = zip(*(pd.factorize(df[col], sort=True, use_na_sentinel=False) for col in by))
+    key = np.zeros(len(df), dtype=np.int64)
+    for col_codes, col_uniques in zip(codes, uniques):
+        key = key * len(col_uniques) + col_codes
+    groups, keys = pd.factorize(key, sort=True)
+
+    levels = []
+    for col_uniques in reversed(uniques):
+        keys, col_codes = np.divmod(keys, len(col_uniques))
+        levels.insert(0, col_uniques.take(col_codes))
+    if len(by) == 1:
+        return groups, pd.Index(levels[0], name=by[0])
+    return groups, pd.MultiIndex.from_arrays(levels, names=by)
+
+
+def pollutant_counts(
+    df: pd.DataFrame,
+    by: Optional[List[str]] = None,
+    weights: Optional[str] = None,
+    codes: Optional[List[str]] = None,
+    column: str = POLLUTANT_COLUMN,
+) -> pd.DataFrame:
+    """Readings naming each pollutant per group (wide: one column per pollutant)
+
+    Uses df[MASK_COLUMN] when present (with codes from the argument or
+    df.attrs), otherwise encodes `column`. weights names a column of row
+    counts, e.g. "count" when counting rows of a pre-aggregated cube. The
+    "readings" column holds the group's total, so shares can be taken
+    against it (a reading naming two pollutants counts for both).
+    """
+    by = list(by or [])
+    codes = codes or df.attrs.get("pollutant_codes")
+    if MASK_COLUMN in df.columns and codes:
+        masks = df[MASK_COLUMN].to_numpy()
+    else:
+        masks, codes = encode_pollutants(df[column], codes)
+    matrix = pollutant_matrix(masks, codes)
+    row_weights = np.ones(len(df)) if weights is None else df[weights].to_numpy(dtype="float64")
+
+    if by:
+        groups, index = group_codes(df, by)
+    else:
+        groups, index = np.zeros(len(df), dtype=np.intp), pd.Index(["all"], name="group")
+    n_groups, n_codes = len(index), len(codes)
+
+    # One bincount over (group, pollutant) cells of the set bits
+    rows, cols = np.nonzero(matrix)
+    counts = np.bincount(groups[rows] * n_codes + cols, weights=row_weights[rows],
+                         minlength=n_groups * n_codes).reshape(n_groups, n_codes)
+    readings = np.bincount(groups, weights=row_weights, minlength=n_groups)
+
+    result = pd.DataFrame(counts, index=index, columns=codes)
+    # Drop pollutants never seen (e.g. known codes absent from this data)
+    result = result.loc[:, result.sum(axis=0) > 0]
+    result.insert(0, "readings", readings)
+    return result if weights is not None else result.astype(np.int64)
+
+
+def rank_pollutants(counts: pd.DataFrame, n: int = 2) -> pd.DataFrame:
+    """Top-n and bottom-n pollutants per group of a pollutant_counts() result (long format)
+
+    Pollutants a group never names are left out of its ranking. Columns:
+    the group keys, pollutant, count, percentage (of the group's readings),
+    rank_type ("Top 1".."Top n", "Bottom n".."Bottom 1") and rank.
+    """
+    values = counts.drop(columns="readings")
+    matrix = values.to_numpy(dtype="float64")
+    seen = matrix > 0
+    readings = counts["readings"].to_numpy(dtype="float64")
+
+    # Stable descending order by count, unseen pollutants last
+    order = np.argsort(np.where(seen, -matrix, np.inf), axis=1, kind="stable")
+    n_seen = seen.sum(axis=1)
+    position = np.broadcast_to(np.arange(matrix.shape[1]), matrix.shape)
+
+    top = position < np.minimum(n, n_seen)[:, None]
+    bottom = (position >= np.maximum(n_seen - n, 0)[:, None]) & (position < n_seen[:, None]) & ~top
+
+    group_index, slot = np.nonzero(top | bottom)
+    is_top = top[group_index, slot]
+    pollutant = order[group_index, slot]
+    count = matrix[group_index, pollutant]
+    place = np.where(is_top, slot + 1, n_seen[group_index] - slot).astype(str)
+
+    result = counts.index[group_index].to_frame(index=False)
+    result["pollutant"] = values.columns.to_numpy()[pollutant]
+    result["count"] = count.astype(np.int64) if pd.api.types.is_integer_dtype(values.dtypes.iloc[0]) else count
+    result["percentage"] = np.round(count / readings[group_index] * 100, 1)
+    result["rank_type"] = np.char.add(np.where(is_top, "Top ", "Bottom "), place)
+    result["rank"] = slot + 1
+    return result
+
+
+def top_bottom_pollutants(
+    df: pd.DataFrame,
+    by: Optional[List[str]] = None,
+    n: int = 2,
+    weights: Optional[str] = None,
+) -> pd.DataFrame:
+    """Per-group top/bottom-n pollutants straight from readings (or cube rows with weights)"""
+    return rank_pollutants(pollutant_counts(df, by, weights=weights), n)
+
+
+def pollutant_shares(counts: pd.DataFrame) -> pd.DataFrame:
+    """Percentage of each group's readings naming each pollutant"""
+    values = counts.drop(columns="readings")
+    return values.div(counts["readings"].where(counts["readings"] > 0), axis=0) * 100
+
+
+def pollutant_dictionary(codes: List[str]) -> Dict[str, int]:
+    """Pollutant name -> bit value, for filtering masks (e.g. mask & d["PM10"])"""
+    return {name: 1 << bit for bit, name in enumerate(codes)}
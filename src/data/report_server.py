@@ -0,0 +1,287 @@
+"""
+Local report server for the dashboard layer
+
+Serves filtered AQI aggregates over HTTP from the AQI rollup cube that
+run_enhanced_cleaning_pipeline materialises beside the cleaned outputs
+(cleaned/cube). The cube is held in memory with its cell index, so a slicer
+change (state, area, pollutant, date range) is answered without reloading
+any cleaned file. Serialised responses are kept in an LRU cache.
+
+Every request compares the stored cube and manifest against the version
+the server loaded. When the pipeline publishes new data, the cube is
+reloaded and the cache cleared before answering.
+
+Endpoints (GET, JSON unless format=csv):
+    /aqi         measures grouped by ?by=state,period; filters state=, area=,
+                 pollutant= (cells naming it), prominent_pollutants=, any
+                 calendar attribute (year=2024), start=, end=, grain=
+    /pollutants  readings naming each pollutant (?top=n for rankings)
+    /status      loaded version, cube metadata and cache statistics
+    /refresh     reload the cube now and clear the cache
+
+Run with: python -m src.data.report_server [--output-dir cleaned] [--port 8765]
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from src.utils.dates import DATE_DIMENSION_COLUMNS
+from src.utils.storage import DEFAULT_CLEANED_DIR, MANIFEST_NAME
+
+from .aqi_cube import AQICube
+from .pollutants import POLLUTANT_COLUMN, split_pollutants
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CUBE_DIR = "cube"
+CUBE_META = "aqi_cube.json"
+
+# Query parameters that are not cube filters
+OPTION_PARAMS = ["by", "start", "end", "grain", "top", "format", "pollutant"]
+
+
+def parse_value(column: str, text: str) -> Any:
+    """Filter value from a query string (calendar attributes are numbers or booleans)"""
+    if column in DATE_DIMENSION_COLUMNS:
+        if text.lstrip("-").isdigit():
+            return int(text)
+        if text.lower() in ("true", "false"):
+            return text.lower() == "true"
+    return text
+
+
+def serialise(result: pd.DataFrame, fmt: str) -> Tuple[bytes, str]:
+    """Response body and content type for a query result"""
+    result = result.reset_index() if result.index.name or isinstance(result.index, pd.MultiIndex) else result
+    if fmt == "csv":
+        return result.to_csv(index=False).encode(), "text/csv; charset=utf-8"
+    if fmt != "json":
+        raise ValueError(f"Unknown format {fmt!r}; expected 'json' or 'csv'")
+    return result.to_json(orient="records", date_format="iso").encode(), "application/json"
+
+
+class QueryCache:
+    """Thread-safe LRU cache of serialised responses"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Any, Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry: Tuple[bytes, str]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits,
+                    "misses": self.misses}
+
+
+class ReportService:
+    """Answers report queries from the in-memory AQI cube, reloading it when the pipeline publishes"""
+
+    def __init__(self, output_dir: Optional[str] = None, cache_size: int = 256):
+        self.output_dir = output_dir or DEFAULT_CLEANED_DIR
+        self.cube_dir = os.path.join(self.output_dir, CUBE_DIR)
+        self.cache = QueryCache(cache_size)
+        self.cube = AQICube()
+        self.loaded_version: Optional[Tuple] = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def version(self) -> Tuple:
+        """Modification stamps of the cube metadata and the manifest (written last on publish)"""
+        stamps = []
+        for path in (os.path.join(self.cube_dir, CUBE_META), os.path.join(self.output_dir, MANIFEST_NAME)):
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload the cube and clear the cache if the store changed; returns whether it reloaded"""
+        version = self.version()
+        if not force and version == self.loaded_version:
+            return False
+        with self._lock:
+            if not force and version == self.loaded_version:
+                return False
+            start = time.perf_counter()
+            try:
+                cube = AQICube.load(self.cube_dir)
+            except Exception as e:
+                # A publish may be mid-write; keep serving the loaded cube and retry next request
+                logging.warning(f"Could not reload the AQI cube from {self.cube_dir}: {str(e)}")
+                return False
+            for grain in cube.tables:
+                cube.index(grain)
+            self.cube, self.loaded_version = cube, version
+            self.cache.clear()
+        logging.info(f"📡 Loaded AQI cube ({cube.meta.get('rows', 0)} readings, "
+                     f"{cube.meta.get('first_day')}..{cube.meta.get('last_day')}) in {time.perf_counter() - start:.2f}s")
+        return True
+
+    # 🔎 Queries
+    def query_args(self, params: Dict[str, List[str]]) -> Dict[str, Any]:
+        """cube.query() arguments from query-string parameters"""
+        by = [col.strip() for value in params.get("by", []) for col in value.split(",") if col.strip()]
+        filters = {col: [parse_value(col, value) for value in values]
+                   for col, values in params.items() if col not in OPTION_PARAMS}
+        if "pollutant" in params:
+            wanted = set(params["pollutant"])
+            combinations = [value for value in self.pollutant_combinations()
+                            if wanted & set(split_pollutants(value))]
+            filters[POLLUTANT_COLUMN] = [value for value in combinations
+                                         if value in filters.get(POLLUTANT_COLUMN, combinations)]
+        args = {"by": by, "filters": filters}
+        for option in ("start", "end", "grain"):
+            if option in params:
+                args[option] = params[option][-1]
+        return args
+
+    def pollutant_combinations(self) -> List[str]:
+        if self.cube.empty or POLLUTANT_COLUMN not in self.cube.tables["day"].columns:
+            return []
+        return list(self.cube.index("day")[POLLUTANT_COLUMN])
+
+    def answer(self, endpoint: str, params: Dict[str, List[str]]) -> Tuple[bytes, str]:
+        """Serialised result of a query endpoint, from the cache when possible"""
+        self.refresh()
+        key = (self.loaded_version, endpoint, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        cube, args = self.cube, self.query_args(params)
+        if endpoint == "aqi":
+            result = cube.query(**args)
+        else:
+            top = int(params["top"][-1]) if "top" in params else None
+            result = cube.pollutants(top=top, **args)
+        entry = serialise(result, params.get("format", ["json"])[-1])
+        self.cache.put(key, entry)
+        return entry
+
+    def status(self) -> Dict[str, Any]:
+        return {"output_dir": self.output_dir, "version": self.loaded_version, "cube": self.cube.meta,
+                "cache": self.cache.stats()}
+
+
+# 🌐 HTTP
+def make_handler(service: ReportService):
+    """Request handler class bound to a ReportService"""
+
+    class ReportHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            endpoint = url.path.strip("/")
+            params = parse_qs(url.query)
+            start = time.perf_counter()
+            try:
+                if endpoint in ("aqi", "pollutants"):
+                    body, content_type = service.answer(endpoint, params)
+                elif endpoint == "status":
+                    body, content_type = json.dumps(service.status(), default=str).encode(), "application/json"
+                elif endpoint == "refresh":
+                    reloaded = service.refresh(force=True)
+                    body, content_type = json.dumps({"reloaded": reloaded}).encode(), "application/json"
+                else:
+                    return self.send_json(404, {"error": f"Unknown endpoint /{endpoint}"})
+            except (ValueError, KeyError) as e:
+                return self.send_json(400, {"error": str(e)})
+            except Exception as e:
+                logging.error(f"Report query {self.path} failed: {str(e)}")
+                return self.send_json(500, {"error": str(e)})
+            self.send_body(200, body, content_type)
+            logging.debug(f"📡 {self.path} answered in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        do_POST = do_GET
+
+        def send_json(self, status: int, payload: Dict[str, Any]):
+            self.send_body(status, json.dumps(payload).encode(), "application/json")
+
+        def send_body(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.debug(f"📡 {self.address_string()} {format % args}")
+
+    return ReportHandler
+
+
+def make_server(
+    output_dir: Optional[str] = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    cache_size: int = 256,
+) -> ThreadingHTTPServer:
+    """HTTP server over the cleaned store in output_dir (call serve_forever() to run it)"""
+    service = ReportService(output_dir, cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.service = service
+    return server
+
+
+def serve(
+    output_dir: Optional[str] = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    cache_size: int = 256,
+):
+    """Run the report server until interrupted"""
+    server = make_server(output_dir, host, port, cache_size)
+    logging.info(f"📡 Report server on http://{host}:{server.server_address[1]} for {server.service.output_dir}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("📡 Report server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve AQI report queries from the cleaned store")
+    parser.add_argument("--output-dir", default=None, help="cleaned output directory (default: src/data/cleaned)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-size", type=int, default=256, help="cached responses kept (LRU)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    serve(args.output_dir, args.host, args.port, args.cache_size)
@@ -0,0 +1,225 @@
+"""
+City Risk Score
+
+Each city (AQI area) gets a row of risk components over a rolling window
+of months ending at as_of:
+- aqi_severity: mean AQI of the window's readings, aqi_peak: worst monthly max
+- population: its state's projected population (exposure / market size)
+- health_burden: IDSP cases per 100k in its state over the window
+- ev_share: share of its state's registrations that are EVs (lowers risk)
+- income: optional, supplied per state (no dataset carries it)
+
+Components are min-max normalised once into a city × component matrix.
+Weight scenarios form a scenario × component matrix, so every scenario is
+scored with one matrix product. The inputs come from the cached fact tables
+(joins.load_fact_table), so re-weighting never goes back to the cleaned data.
+"""
+
+import itertools
+import logging
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .joins import load_fact_table
+
+# Component -> direction (+1: higher value is higher risk, -1: lower risk)
+RISK_COMPONENTS = {
+    "aqi_severity": 1,
+    "aqi_peak": 1,
+    "population": 1,
+    "health_burden": 1,
+    "ev_share": -1,
+    "income": 1,
+}
+
+DEFAULT_SCENARIOS = {
+    "balanced": {"aqi_severity": 0.35, "aqi_peak": 0.05, "population": 0.25, "health_burden": 0.2,
+                 "ev_share": 0.05, "income": 0.1},
+    "air_quality": {"aqi_severity": 0.55, "aqi_peak": 0.15, "population": 0.1, "health_burden": 0.2},
+    "market_size": {"aqi_severity": 0.3, "population": 0.4, "income": 0.3},
+    "health": {"aqi_severity": 0.3, "health_burden": 0.6, "population": 0.1},
+}
+
+Scenarios = Union[pd.DataFrame, Dict[str, Dict[str, float]]]
+
+
+def scenario_matrix(scenarios: Scenarios) -> pd.DataFrame:
+    """Scenario × component weights (missing weights are 0); unknown components raise ValueError"""
+    weights = scenarios if isinstance(scenarios, pd.DataFrame) else pd.DataFrame.from_dict(scenarios, orient="index")
+    unknown = sorted(set(weights.columns) - set(RISK_COMPONENTS))
+    if unknown:
+        raise ValueError(f"Unknown risk components {unknown}; expected some of {list(RISK_COMPONENTS)}")
+    weights = weights.reindex(columns=list(RISK_COMPONENTS)).fillna(0.0).astype("float64")
+    if (weights.to_numpy() < 0).any():
+        raise ValueError("Risk weights must be non-negative; component directions are fixed in RISK_COMPONENTS")
+    return weights
+
+
+def weight_grid(components: List[str], step: float = 0.1) -> pd.DataFrame:
+    """Every weighting of components on a step grid summing to 1 (for sensitivity sweeps)"""
+    units = int(round(1 / step))
+    rows = [combo for combo in itertools.product(range(units + 1), repeat=len(components) - 1)
+            if sum(combo) <= units]
+    weights = np.array([list(combo) + [units - sum(combo)] for combo in rows], dtype="float64") / units
+    names = ["/".join(f"{w:g}" for w in row) for row in weights]
+    return pd.DataFrame(weights, index=names, columns=components)
+
+
+# 🧮 Components
+def month_numbers(periods: pd.Series) -> np.ndarray:
+    return periods.to_numpy(dtype="datetime64[ns]").astype("datetime64[M]").view("int64")
+
+
+def window_rows(facts: pd.DataFrame, end: int, window: int) -> pd.DataFrame:
+    months = month_numbers(facts["period"])
+    return facts[(months > end - window) & (months <= end)]
+
+
+def city_components(place_facts: pd.DataFrame, end: int, window: int) -> pd.DataFrame:
+    """AQI severity and peak per city over the window"""
+    rows = window_rows(place_facts, end, window)
+    rows = rows[rows["aqi_readings"] > 0]
+    codes, cities = pd.factorize(rows["place_id"])
+    readings = np.bincount(codes, weights=rows["aqi_readings"].to_numpy(dtype="float64"), minlength=len(cities))
+    totals = np.bincount(codes, weights=rows["aqi_sum"].to_numpy(dtype="float64"), minlength=len(cities))
+    peaks = np.full(len(cities), -np.inf)
+    np.maximum.at(peaks, codes, rows["aqi_max"].to_numpy(dtype="float64"))
+
+    first = rows.drop_duplicates("place_id")
+    return pd.DataFrame({
+        "state": first["state"].to_numpy(),
+        "city": first["place"].to_numpy(),
+        "state_id": first["state_id"].to_numpy(),
+        "place_id": cities,
+        "aqi_readings": readings.astype(np.int64),
+        "aqi_severity": totals / readings,
+        "aqi_peak": peaks,
+    })
+
+
+def state_components(state_facts: pd.DataFrame, end: int, window: int) -> pd.DataFrame:
+    """Population, health burden and EV share per state over the window (indexed by state_id)"""
+    rows = window_rows(state_facts, end, window).sort_values("period")
+    grouped = rows.groupby("state_id", sort=True)
+    result = pd.DataFrame(index=grouped.size().index)
+    if "population" in rows.columns:
+        # Latest projection in the window (a stock, not summed)
+        result["population"] = grouped["population"].last()
+    if "cases" in rows.columns and "population" in result.columns:
+        # Population is in thousands
+        result["health_burden"] = grouped["cases"].sum() / (result["population"] / 100)
+    if "registrations" in rows.columns:
+        registrations = grouped["registrations"].sum(min_count=1)
+        result["ev_share"] = grouped["ev_registrations"].sum(min_count=1) / registrations.where(registrations > 0)
+    return result
+
+
+# 🏙️ Model
+class RiskModel:
+    """City risk components, normalised once and scored under any number of weightings"""
+
+    def __init__(self, inputs: pd.DataFrame, as_of: Optional[pd.Timestamp] = None, window: int = 3):
+        self.inputs = inputs.reset_index(drop=True)
+        self.as_of = as_of
+        self.window = window
+        self.components = [col for col in RISK_COMPONENTS if col in self.inputs.columns]
+
+        # Min-max normalise each component, flipping those that lower risk
+        values = self.inputs[self.components].astype("float64")
+        low, high = values.min(), values.max()
+        normalised = ((values - low) / (high - low).where(high > low, 1.0)).to_numpy()
+        directions = np.array([RISK_COMPONENTS[col] for col in self.components])
+        normalised = np.where(directions > 0, normalised, 1 - normalised)
+        self.available = ~np.isnan(normalised)
+        self.matrix = np.nan_to_num(normalised)
+
+    def __repr__(self) -> str:
+        return f"RiskModel({len(self.inputs)} cities, components={self.components}, as_of={self.as_of}, window={self.window})"
+
+    @classmethod
+    def from_facts(
+        cls,
+        place_facts: pd.DataFrame,
+        state_facts: pd.DataFrame,
+        window: int = 3,
+        as_of: Optional[str] = None,
+        income: Optional[pd.Series] = None,
+    ) -> "RiskModel":
+        """Components from month-grain place and state fact tables (joins.build_fact_table)
+
+        as_of defaults to the latest month with AQI readings. income, if given,
+        is indexed by state name.
+        """
+        with_aqi = place_facts[place_facts["aqi_readings"] > 0]
+        if with_aqi.empty:
+            raise ValueError("No AQI readings in the fact table; cannot score cities")
+        end = (month_numbers(pd.Series([pd.Timestamp(as_of)]))[0] if as_of is not None
+               else month_numbers(with_aqi["period"]).max())
+
+        inputs = city_components(place_facts, end, window)
+        states = state_components(state_facts, end, window)
+        inputs = inputs.join(states, on="state_id")
+        if income is not None:
+            inputs["income"] = inputs["state"].map(income).astype("float64")
+
+        as_of = pd.Timestamp(np.datetime64(int(end), "M"))
+        logging.info(f"🏙️ Risk inputs for {len(inputs)} cities, {window} months to {as_of:%Y-%m}")
+        return cls(inputs, as_of=as_of, window=window)
+
+    @classmethod
+    def load(
+        cls,
+        output_dir: Optional[str] = None,
+        window: int = 3,
+        as_of: Optional[str] = None,
+        income: Optional[pd.Series] = None,
+        rebuild: bool = False,
+    ) -> "RiskModel":
+        """Model over the cleaned store, reading the cached month-grain fact tables"""
+        place_facts = load_fact_table("month", "place", output_dir, rebuild=rebuild)
+        state_facts = load_fact_table("month", "state", output_dir, rebuild=rebuild)
+        return cls.from_facts(place_facts, state_facts, window=window, as_of=as_of, income=income)
+
+    # 📊 Scoring
+    def scores(self, scenarios: Optional[Scenarios] = None, method: str = "additive") -> pd.DataFrame:
+        """0-100 risk score of every city (rows) under every scenario (columns)
+
+        A city missing a component is scored on the weights of the components
+        it has. method "additive" is a weighted mean of the normalised
+        components; "multiplicative" a weighted geometric mean, closer to the
+        README's AQI × population × income.
+        """
+        weights = scenario_matrix(DEFAULT_SCENARIOS if scenarios is None else scenarios)[self.components]
+        w = weights.to_numpy().T
+        # Weight each city actually has per scenario (cities × scenarios)
+        totals = self.available @ w
+        safe_totals = np.where(totals > 0, totals, 1.0)
+        if method == "additive":
+            mean = (self.matrix * self.available) @ w / safe_totals
+        elif method == "multiplicative":
+            # Offset so a component at its minimum does not zero the whole product
+            mean = np.exp((np.log(self.matrix + 0.01) * self.available) @ w / safe_totals) - 0.01
+        else:
+            raise ValueError(f"Unknown scoring method {method!r}; expected 'additive' or 'multiplicative'")
+        result = np.where(totals > 0, mean * 100, np.nan)
+        return pd.DataFrame(result, index=self.city_index(), columns=weights.index)
+
+    def city_index(self) -> pd.MultiIndex:
+        return pd.MultiIndex.from_arrays([self.inputs["state"], self.inputs["city"]], names=["state", "city"])
+
+    def rankings(self, scenarios: Optional[Scenarios] = None, method: str = "additive") -> pd.DataFrame:
+        """Rank of every city (1 = highest risk) under every scenario"""
+        return self.scores(scenarios, method).rank(ascending=False, method="min").astype("Int64")
+
+    def top(self, n: int = 10, scenario: str = "balanced", scenarios: Optional[Scenarios] = None) -> pd.DataFrame:
+        """Top-n cities of one scenario with their score and raw components"""
+        scores = self.scores(scenarios)[scenario]
+        table = self.inputs.set_index(["state", "city"])[self.components].assign(risk_score=scores)
+        return table.sort_values("risk_score", ascending=False).head(n)
+
+    def top_share(self, n: int = 10, scenarios: Optional[Scenarios] = None) -> pd.Series:
+        """Share of scenarios that put each city in its top n (rank stability across weightings)"""
+        ranks = self.rankings(scenarios if scenarios is not None else weight_grid(self.components, 0.25))
+        return (ranks <= n).mean(axis=1).sort_values(ascending=False)
@@ -0,0 +1,333 @@
+"""
+Declarative logical-consistency rules, evaluated in one vectorized pass
+
+Each rule states what a valid row looks like as a boolean expression over
+columns (e.g. "deaths <= cases"). All rules of a dataset are compiled into a
+single expression that yields one violation bitmask per row (bit i set =
+rule i violated), evaluated by numexpr when it is installed and every column
+is numeric, and rule by rule with pandas.eval otherwise. Rows where a rule's
+columns are null do not violate it. All violating rows are exported in one
+write, and rules with a "swap" fix are corrected when their violation rate
+is below the threshold.
+
+Expressions are parsed with ast and may only use column names, constants,
+comparisons, and/or/not, arithmetic, the & | ~ operators and
+where(condition, a, b); anything else (attribute access, other calls,
+subscripts, ...) is rejected when the rules load. Nothing is ever passed to
+Python's eval.
+
+Rules default to DATASET_RULES and can be replaced per dataset from a JSON
+file ({"idsp": [{"name": ..., "expr": ...}], ...}) via load_rules().
+"""
+
+import ast
+import copy
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+VIOLATION_COLUMN = "rule_violations"
+
+DATASET_RULES: Dict[str, List[Dict[str, Any]]] = {
+    "idsp": [
+        {"name": "reporting_after_outbreak", "expr": "reporting_date >= outbreak_starting_date",
+         "fix": {"swap": ["reporting_date", "outbreak_starting_date"]}},
+        {"name": "deaths_within_cases", "expr": "deaths <= cases"},
+        {"name": "non_negative_counts", "expr": "(cases >= 0) & (deaths >= 0)"},
+    ],
+    "aqi": [
+        {"name": "aqi_value_in_range", "expr": "(aqi_value >= 0) & (aqi_value <= 500)"},
+        {"name": "stations_positive", "expr": "number_of_monitoring_stations > 0"},
+    ],
+    "pp": [
+        {"name": "value_non_negative", "expr": "value >= 0"},
+    ],
+    "vahan": [
+        {"name": "value_non_negative", "expr": "value >= 0"},
+    ],
+}
+
+_NULL_SUFFIX = "__null"
+
+_COMPARE_OPS = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+_BINARY_OPS = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.Mod: "%", ast.Pow: "**",
+               ast.BitAnd: "&", ast.BitOr: "|"}
+_UNARY_OPS = {ast.Not: "~", ast.Invert: "~", ast.USub: "-", ast.UAdd: "+"}
+
+
+# 🛡️ Expression allowlist
+def _source(node: ast.AST, bound: Tuple[str, ...] = ()) -> str:
+    """Fully parenthesised source of an allowed node, with and/or/not spelled & | ~
+
+    Names in `bound` are temporaries of the pandas.eval fallback and skip the
+    column-name check.
+    """
+    if isinstance(node, ast.Name):
+        if node.id not in bound and (node.id.startswith("_") or node.id.endswith(_NULL_SUFFIX)
+                                     or node.id == "where"):
+            raise ValueError(f"name {node.id!r} is not allowed")
+        return node.id
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (bool, int, float, str)):
+            raise ValueError(f"constant {node.value!r} is not allowed")
+        return repr(node.value)
+    if isinstance(node, ast.Compare):
+        # a < b < c becomes (a < b) & (b < c)
+        operands = [node.left] + node.comparators
+        pairs = []
+        for left, op, right in zip(operands, node.ops, operands[1:]):
+            if type(op) not in _COMPARE_OPS:
+                raise ValueError(f"comparison {type(op).__name__} is not allowed")
+            pairs.append(f"({_source(left, bound)} {_COMPARE_OPS[type(op)]} {_source(right, bound)})")
+        return pairs[0] if len(pairs) == 1 else "(" + " & ".join(pairs) + ")"
+    if isinstance(node, ast.BoolOp):
+        joiner = " & " if isinstance(node.op, ast.And) else " | "
+        return "(" + joiner.join(_source(value, bound) for value in node.values) + ")"
+    if isinstance(node, ast.BinOp):
+        if type(node.op) not in _BINARY_OPS:
+            raise ValueError(f"operator {type(node.op).__name__} is not allowed")
+        return f"({_source(node.left, bound)} {_BINARY_OPS[type(node.op)]} {_source(node.right, bound)})"
+    if isinstance(node, ast.UnaryOp):
+        return f"({_UNARY_OPS[type(node.op)]}{_source(node.operand, bound)})"
+    if isinstance(node, ast.Call):
+        if not (isinstance(node.func, ast.Name) and node.func.id == "where"
+                and len(node.args) == 3 and not node.keywords):
+            raise ValueError("only where(condition, a, b) calls are allowed")
+        return "where(" + ", ".join(_source(arg, bound) for arg in node.args) + ")"
+    raise ValueError(f"{type(node).__name__} is not allowed")
+
+
+def rule_source(expr: str) -> str:
+    """Validate a rule expression against the allowlist; returns it normalised for numexpr/pandas.eval
+
+    Raises ValueError for syntax errors and for anything outside the allowlist.
+    """
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"invalid syntax in {expr!r}: {e.msg}") from None
+    try:
+        return _source(tree.body)
+    except ValueError as e:
+        raise ValueError(f"{e} in {expr!r}") from None
+
+
+def validate_rules(rules: Dict[str, List[Dict[str, Any]]]):
+    """Raise ValueError naming the first rule whose expression is not allowed"""
+    for dataset, dataset_rules in rules.items():
+        for rule in dataset_rules:
+            try:
+                rule_source(rule["expr"])
+            except ValueError as e:
+                raise ValueError(f"Rule {dataset}.{rule.get('name')}: {e}") from None
+
+
+def _pandas_eval(node: ast.AST, columns: Dict[str, pd.Series]) -> Any:
+    """Evaluate an allowed node with pandas.eval
+
+    pandas.eval has no where(), so each where() call is evaluated first (its
+    arguments through pandas.eval, the choice with np.where) and bound to a
+    temporary name in the expression.
+    """
+    temporaries: Dict[str, pd.Series] = {}
+
+    class BindWhere(ast.NodeTransformer):
+        def visit_Call(self, call):
+            condition, a, b = (np.asarray(_pandas_eval(arg, columns)) for arg in call.args)
+            name = f"_where{len(temporaries)}"
+            temporaries[name] = pd.Series(np.where(condition, a, b))
+            return ast.Name(id=name, ctx=ast.Load())
+
+    node = BindWhere().visit(copy.deepcopy(node))
+    source = _source(node, bound=tuple(temporaries))
+    return pd.eval(source, engine="python", local_dict={**columns, **temporaries})
+
+
+# 📜 Rule sets
+def load_rules(path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """DATASET_RULES, with datasets replaced by those in the JSON file at path
+
+    Every expression is checked with rule_source(); a disallowed one raises
+    ValueError here, before any data is touched.
+    """
+    rules = {name: list(dataset_rules) for name, dataset_rules in DATASET_RULES.items()}
+    if path:
+        with open(path) as f:
+            loaded = json.load(f)
+        validate_rules(loaded)
+        rules.update(loaded)
+    return rules
+
+
+def rule_columns(expr: str) -> List[str]:
+    """Column names referenced by a rule expression"""
+    nodes = list(ast.walk(ast.parse(expr, mode="eval")))
+    functions = {id(node.func) for node in nodes if isinstance(node, ast.Call)}
+    names = []
+    for node in nodes:
+        if isinstance(node, ast.Name) and id(node) not in functions and node.id not in names:
+            names.append(node.id)
+    return names
+
+
+def bitmask_dtype(n_rules: int) -> np.dtype:
+    """Smallest unsigned type with a bit per rule (63 max: bit values must fit an int64)"""
+    if n_rules > 63:
+        raise ValueError(f"At most 63 rules per dataset are supported, got {n_rules}")
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_rules <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+
+
+# 🧮 Compilation and evaluation
+class CompiledRules:
+    """A dataset's rules compiled into one bitmask expression
+
+    Rules referencing columns missing from the frame are skipped (logged), so
+    bit positions refer to self.rules, not to the declared list. Expressions
+    outside the allowlist raise ValueError.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], columns: List[str]):
+        self.rules = []
+        self.sources = []
+        for rule in rules:
+            source = rule_source(rule["expr"])
+            missing = [col for col in rule_columns(rule["expr"]) if col not in columns]
+            if missing:
+                logging.warning(f"Rule {rule['name']}: columns {missing} not found. Skipping.")
+                continue
+            self.rules.append(rule)
+            self.sources.append(source)
+
+        self.columns = []
+        terms = []
+        for bit, (rule, source) in enumerate(zip(self.rules, self.sources)):
+            used = rule_columns(rule["expr"])
+            self.columns += [col for col in used if col not in self.columns]
+            nulls = "".join(f" | {col}{_NULL_SUFFIX}" for col in used)
+            terms.append(f"where({source}{nulls}, 0, {1 << bit})")
+        self.expression = " + ".join(terms) if terms else "0"
+        self.dtype = bitmask_dtype(len(self.rules))
+
+    def _arrays(self, df: pd.DataFrame) -> Tuple[Dict[str, np.ndarray], bool]:
+        """Column arrays (datetimes as int64) plus null masks; flag if all are numeric"""
+        arrays = {}
+        numeric = True
+        for col in self.columns:
+            series = df[col]
+            arrays[col + _NULL_SUFFIX] = series.isna().to_numpy()
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = series.to_numpy().astype("datetime64[ns]").view("int64")
+            elif isinstance(series.dtype, np.dtype) and series.dtype.kind in "iufb":
+                values = series.to_numpy()
+            elif pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+                values = series.to_numpy(dtype="float64", na_value=np.nan)
+            else:
+                values = series.to_numpy(dtype=object)
+                numeric = False
+            arrays[col] = values
+        return arrays, numeric
+
+    def evaluate(self, df: pd.DataFrame) -> np.ndarray:
+        """One violation bitmask per row"""
+        if not self.rules or len(df) == 0:
+            return np.zeros(len(df), dtype=self.dtype)
+
+        arrays, numeric = self._arrays(df)
+        if numeric:
+            try:
+                import numexpr
+                return numexpr.evaluate(self.expression, local_dict=arrays).astype(self.dtype)
+            except ImportError:
+                pass
+
+        # Rule by rule with pandas.eval, setting the bits here
+        columns = {col: pd.Series(arrays[col], copy=False) for col in self.columns}
+        mask = np.zeros(len(df), dtype=self.dtype)
+        for bit, rule in enumerate(self.rules):
+            with np.errstate(invalid="ignore"):
+                valid = _pandas_eval(ast.parse(rule["expr"], mode="eval").body, columns)
+            valid = np.broadcast_to(np.asarray(valid, dtype=bool), mask.shape).copy()
+            for col in rule_columns(rule["expr"]):
+                valid |= arrays[col + _NULL_SUFFIX]
+            mask[~valid] |= self.dtype.type(1 << bit)
+        return mask
+
+    def rule_counts(self, mask: np.ndarray) -> List[int]:
+        return [int(np.count_nonzero(mask & self.dtype.type(1 << bit))) for bit in range(len(self.rules))]
+
+    def describe(self, mask: np.ndarray) -> np.ndarray:
+        """Comma-separated violated rule names per row (decoded once per distinct mask)"""
+        codes, uniques = pd.factorize(mask)
+        names = np.array([",".join(rule["name"] for bit, rule in enumerate(self.rules) if int(value) >> bit & 1)
+                          for value in uniques], dtype=object)
+        return names[codes]
+
+
+# 🧼 Apply to a dataset
+def apply_rules(
+    df: pd.DataFrame,
+    dataset: str,
+    rules: Optional[List[Dict[str, Any]]] = None,
+    threshold: float = 0.2,
+    export_dir: Optional[str] = None,
+    written: Optional[set] = None,
+    export: Optional[Callable] = None,
+) -> pd.DataFrame:
+    """Evaluate all rules at once, export violations in one write and apply swap fixes
+
+    Adds the VIOLATION_COLUMN bitmask (as found, before fixes). A rule's swap
+    fix is skipped when its violation rate reaches the threshold; those rows
+    are left for manual review in the export. Files already in `written`
+    (this stream) are appended to. export(rows, path, written=...) replaces
+    the direct CSV write and returns the path it wrote (the pipeline passes
+    its queued export_rows).
+    """
+    compiled = CompiledRules(DATASET_RULES.get(dataset, []) if rules is None else rules, df.columns.tolist())
+    mask = compiled.evaluate(df)
+    counts = compiled.rule_counts(mask)
+    total = len(df)
+
+    logging.info(f"🔎 Checking {len(compiled.rules)} {dataset} rules in one pass")
+    for rule, count in zip(compiled.rules, counts):
+        ratio = count / total if total else 0
+        logging.info(f"{rule['name']}: {count} of {total} rows violate ({ratio*100:.2f}%)")
+
+    violating = mask != 0
+    if violating.any() and export_dir is not None:
+        rows = df[violating].assign(**{
+            VIOLATION_COLUMN: mask[violating],
+            "violated_rules": compiled.describe(mask[violating]),
+        })
+        output_file = os.path.join(export_dir, f"{dataset}_rule_violations.csv")
+        if export is not None:
+            output_file = export(rows, output_file, written=written)
+        elif written is not None and output_file in written:
+            rows.to_csv(output_file, mode="a", header=False, index=False)
+        else:
+            rows.to_csv(output_file, index=False)
+            if written is not None:
+                written.add(output_file)
+        logging.info(f"Exported {int(violating.sum())} rule violations to: {output_file}")
+
+    for bit, (rule, count) in enumerate(zip(compiled.rules, counts)):
+        swap = rule.get("fix", {}).get("swap")
+        if not swap or count == 0:
+            continue
+        ratio = count / total
+        if ratio >= threshold:
+            logging.warning(f"❌ Skipping auto-fix of {rule['name']}: {ratio*100:.2f}% violations "
+                            f"exceed threshold ({threshold*100}%)")
+            continue
+        rows = (mask & compiled.dtype.type(1 << bit)) != 0
+        col_a, col_b = swap
+        df.loc[rows, [col_a, col_b]] = df.loc[rows, [col_b, col_a]].values
+        logging.info(f"✅ Fixed {count} rows of {rule['name']} by swapping {col_a} and {col_b}")
+
+    df[VIOLATION_COLUMN] = mask
+    return df
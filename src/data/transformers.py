@@ -0,0 +1,151 @@
+"""
+Column transformers shared by the dataset cleaners
+
+Every transformer changes columns of the frame it is given and returns that
+same frame, so DataCleaningPipeline can fuse consecutive transformers into
+one pass without copying columns between them.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.utils.dates import lookup_date_features
+
+from .enhanced_data_cleaning_pipeline import RAW_DATE_FORMAT, parse_date_column
+from .geography import FUZZY_THRESHOLD, GeoIndex, canonicalize_geography
+
+
+# 📅 Dates
+def standardize_dates(
+    df: pd.DataFrame,
+    columns: Union[List[str], Dict[str, str]],
+    date_format: str = RAW_DATE_FORMAT,
+) -> pd.DataFrame:
+    """Parse date columns with an explicit format (per column if columns is a dict)"""
+    formats = columns if isinstance(columns, dict) else {col: date_format for col in columns}
+    for col, fmt in formats.items():
+        if col not in df.columns:
+            logging.warning(f"Date column {col} not found. Skipping.")
+            continue
+        # Already parsed when read with a dataset schema
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = parse_date_column(df[col], fmt)
+        null_dates = df[col].isnull().sum()
+        if null_dates > 0:
+            logging.warning(f"Found {null_dates} null dates in {col}")
+    return df
+
+
+def derive_date_features(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Add <column>_year, <column>_month (name) and <column>_day (weekday name)"""
+    if column not in df.columns:
+        logging.warning(f"Column {column} not found. Skipping date features.")
+        return df
+
+    features = lookup_date_features(df[column], ["year", "month_name", "day_name"])
+    df[f"{column}_year"] = features["year"]
+    df[f"{column}_month"] = features["month_name"]
+    df[f"{column}_day"] = features["day_name"]
+    logging.info(f"Derived year, month and day features from {column}")
+    return df
+
+
+# 🩹 Missing values
+def handle_missing_values(
+    df: pd.DataFrame,
+    strategy: Optional[Dict[str, Any]] = None,
+    drop_empty_columns: bool = True,
+) -> pd.DataFrame:
+    """Drop all-null columns and fill the rest per column
+
+    strategy maps a column to "median", "mean", "mode", "ffill", "bfill" or a
+    literal fill value. Row counts never change.
+    """
+    if drop_empty_columns:
+        empty = [col for col in df.columns if df[col].isna().all()]
+        if empty and len(df) > 0:
+            df.drop(columns=empty, inplace=True)
+            logging.info(f"Dropped all-null columns: {empty}")
+
+    for col, how in (strategy or {}).items():
+        if col not in df.columns:
+            continue
+        missing = int(df[col].isna().sum())
+        if missing == 0:
+            continue
+
+        if how in ("median", "mean"):
+            value = getattr(df[col], how)()
+        elif how == "mode":
+            modes = df[col].mode()
+            value = modes.iloc[0] if len(modes) else None
+        elif how in ("ffill", "bfill"):
+            df[col] = getattr(df[col], how)()
+            logging.info(f"Filled {missing} missing values in {col} ({how})")
+            continue
+        else:
+            value = how
+
+        if value is not None:
+            df[col] = df[col].fillna(value)
+            logging.info(f"Filled {missing} missing values in {col} ({how})")
+    return df
+
+
+# 🔤 Text
+TEXT_CASES = ["lower", "upper", "title"]
+
+
+def normalize_text(values: pd.Series, case: Optional[str] = None) -> pd.Series:
+    """Strip and collapse inner whitespace, optionally changing case"""
+    normalized = values.astype(str).str.strip().str.replace(r"\s+", " ", regex=True)
+    if case in TEXT_CASES:
+        normalized = getattr(normalized.str, case)()
+    return normalized
+
+
+def normalize_text_columns(
+    df: pd.DataFrame,
+    columns: List[str],
+    case: Optional[str] = None,
+    gazetteer: Optional[GeoIndex] = None,
+    state_column: str = "state",
+    place_columns: Optional[List[str]] = None,
+    threshold: Optional[float] = FUZZY_THRESHOLD,
+) -> pd.DataFrame:
+    """Normalise whitespace (and optionally case: lower/upper/title) of text columns
+
+    Only distinct values are normalised: categorical codes and factorised
+    object values are remapped, so variants of one value merge into one.
+    With a gazetteer, state_column and place_columns (default: the other
+    columns, as places within the state) are then mapped to canonical names,
+    exactly or by trigram similarity (see geography.canonicalize_geography).
+    """
+    for col in columns:
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, uniques = series.cat.codes.to_numpy(), pd.Series(series.cat.categories)
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            codes, uniques = pd.factorize(series)
+            uniques = pd.Series(uniques)
+        else:
+            continue
+
+        normalized = normalize_text(uniques, case)
+        remap, categories = pd.factorize(normalized)
+        new_codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+        values = pd.Categorical.from_codes(new_codes, categories=categories)
+        df[col] = values if isinstance(series.dtype, pd.CategoricalDtype) else values.astype(object)
+
+        changed = int((normalized.to_numpy() != uniques.astype(str).to_numpy()).sum())
+        logging.info(f"Normalised {col}: {changed} of {len(uniques)} distinct values changed")
+
+    if gazetteer is not None and state_column in columns:
+        places = [col for col in columns if col != state_column] if place_columns is None else place_columns
+        df = canonicalize_geography(df, gazetteer, state_column, places, threshold=threshold)
+    return df
@@ -0,0 +1,322 @@
+"""
+AQI trend analytics across areas
+
+Cleaned AQI readings are laid out once as a dense area × period array
+(daily, or monthly means), NaN where an area has no reading. Rolling means,
+the seasonal decomposition, least-squares trends and the Pettitt
+changepoint test then run as batched NumPy over every area at once. The
+expensive rank tests (Mann-Kendall and Sen's slope are quadratic in the
+series length) are split across a process pool by area.
+
+degradation() combines them to flag areas whose AQI is on a significant
+upward trend, with an upward level shift that recent readings have not
+reverted from.
+"""
+
+import logging
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.storage import DEFAULT_CLEANED_DIR
+
+from .joins import day_numbers, load_source
+
+GRAINS = ["day", "month"]
+
+# Periods per seasonal cycle, used for the trend window and "recent" readings
+SEASON_LENGTH = {"day": 365, "month": 12}
+
+DAYS_PER_YEAR = 365.25
+
+
+def dense_matrix(codes: np.ndarray, columns: np.ndarray, values: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """Mean of values per (row code, column) cell; NaN for empty cells"""
+    flat = codes.astype(np.int64) * shape[1] + columns
+    size = shape[0] * shape[1]
+    sums = np.bincount(flat, weights=values, minlength=size)
+    counts = np.bincount(flat, minlength=size)
+    with np.errstate(invalid="ignore"):
+        return (sums / np.where(counts > 0, counts, np.nan)).reshape(shape)
+
+
+def normal_p_values(z: np.ndarray) -> np.ndarray:
+    """Two-sided p-values of standard normal scores"""
+    return np.array([math.erfc(abs(value) / math.sqrt(2)) if np.isfinite(value) else np.nan for value in z])
+
+
+# 📈 Batched statistics over rows
+def rolling_mean(values: np.ndarray, window: int, min_periods: Optional[int] = None, center: bool = False) -> np.ndarray:
+    """NaN-aware rolling mean along each row, from cumulative sums"""
+    rows, n = values.shape
+    min_periods = min_periods or max(1, window // 2)
+    present = ~np.isnan(values)
+    sums = np.concatenate([np.zeros((rows, 1)), np.cumsum(np.where(present, values, 0.0), axis=1)], axis=1)
+    counts = np.concatenate([np.zeros((rows, 1)), np.cumsum(present, axis=1)], axis=1)
+
+    high = np.arange(1, n + 1) + (window // 2 if center else 0)
+    low = np.maximum(high - window, 0)
+    high = np.minimum(high, n)
+    window_sums = sums[:, high] - sums[:, low]
+    window_counts = counts[:, high] - counts[:, low]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(window_counts >= min_periods, window_sums / window_counts, np.nan)
+
+
+def linear_trends(values: np.ndarray, x: np.ndarray) -> Dict[str, np.ndarray]:
+    """Least-squares slope, intercept and r² of each row against x, skipping NaN"""
+    present = ~np.isnan(values)
+    y = np.where(present, values, 0.0)
+    x = x - x[0]
+    n = present.sum(axis=1)
+    sx, sxx = present @ x, present @ (x * x)
+    sy, sxy, syy = y.sum(axis=1), y @ x, (y * y).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_x = n * sxx - sx ** 2
+        cov = n * sxy - sx * sy
+        slope = cov / var_x
+        intercept = (sy - slope * sx) / n
+        r2 = cov ** 2 / (var_x * (n * syy - sy ** 2))
+    return {"slope": slope, "intercept": intercept, "r2": r2}
+
+
+def pettitt(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Pettitt changepoint test per row: position of the most likely level shift, and its p-value
+
+    U_t = 2 * (sum of the first t ranks) - t * (n + 1), so the statistic for
+    every split of every row comes from one cumulative sum of within-row ranks.
+    """
+    ranks = pd.DataFrame(values).rank(axis=1).to_numpy()
+    present = ~np.isnan(values)
+    n = present.sum(axis=1)
+    t = np.cumsum(present, axis=1)
+    u = 2 * np.cumsum(np.nan_to_num(ranks), axis=1) - t * (n[:, None] + 1)
+    # A split must leave readings on both sides
+    u = np.where(present & (t < n[:, None]), np.abs(u), -1.0)
+    position = u.argmax(axis=1)
+    k = u[np.arange(len(values)), position]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = np.minimum(1.0, 2 * np.exp(-6 * k ** 2 / (n.astype("float64") ** 3 + n ** 2)))
+
+    sums = np.cumsum(np.where(present, values, 0.0), axis=1)
+    rows = np.arange(len(values))
+    before_sum, before_count = sums[rows, position], t[rows, position]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        before = before_sum / before_count
+        after = (sums[:, -1] - before_sum) / (n - before_count)
+    valid = k >= 0
+    return {"position": np.where(valid, position, -1), "p": np.where(valid, p, np.nan),
+            "mean_before": np.where(valid, before, np.nan), "mean_after": np.where(valid, after, np.nan)}
+
+
+def mann_kendall(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Mann-Kendall S, z, p and Kendall's tau per row (tie-corrected variance, NaN skipped)
+
+    S sums sign(x_j - x_i) over every pair, one lag at a time across all rows.
+    """
+    rows, n_periods = values.shape
+    s = np.zeros(rows)
+    for lag in range(1, n_periods):
+        # Comparisons with NaN are False, so missing readings drop out of both counts
+        diff = values[:, lag:] - values[:, :-lag]
+        s += np.count_nonzero(diff > 0, axis=1) - np.count_nonzero(diff < 0, axis=1)
+
+    n = (~np.isnan(values)).sum(axis=1).astype("float64")
+    ties = np.zeros(rows)
+    for row in range(rows):
+        _, counts = np.unique(values[row][~np.isnan(values[row])], return_counts=True)
+        counts = counts[counts > 1].astype("float64")
+        ties[row] = (counts * (counts - 1) * (2 * counts + 5)).sum()
+    variance = (n * (n - 1) * (2 * n + 5) - ties) / 18
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(variance > 0, (s - np.sign(s)) / np.sqrt(variance), np.nan)
+        tau = s / (n * (n - 1) / 2)
+    return {"s": s, "z": z, "p": normal_p_values(z), "tau": tau}
+
+
+def sen_slopes(values: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Theil-Sen slope per row: median slope over every pair of readings"""
+    slopes = np.full(len(values), np.nan)
+    for row in range(len(values)):
+        present = ~np.isnan(values[row])
+        if present.sum() < 2:
+            continue
+        y, xs = values[row][present], x[present]
+        first, second = np.triu_indices(len(y), 1)
+        slopes[row] = np.median((y[second] - y[first]) / (xs[second] - xs[first]))
+    return slopes
+
+
+def rank_tests(values: np.ndarray, x: np.ndarray) -> Dict[str, np.ndarray]:
+    """Mann-Kendall and Sen's slope for a block of rows (process-pool task)"""
+    result = mann_kendall(values)
+    result["sen_slope"] = sen_slopes(values, x)
+    return result
+
+
+# 🌫️ Area × period series
+class AQITrends:
+    """Dense area × period AQI means with batched trend, seasonality and changepoint analytics"""
+
+    def __init__(self, values: np.ndarray, areas: pd.MultiIndex, periods: pd.DatetimeIndex, grain: str = "day"):
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown grain {grain!r}; expected one of {GRAINS}")
+        self.values = values
+        self.areas = areas
+        self.periods = periods
+        self.grain = grain
+
+    def __repr__(self) -> str:
+        span = f"{self.periods[0]:%Y-%m-%d}..{self.periods[-1]:%Y-%m-%d}" if len(self.periods) else "empty"
+        return f"AQITrends({len(self.areas)} areas × {len(self.periods)} {self.grain}s, {span})"
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, grain: str = "day") -> "AQITrends":
+        """Daily (or monthly) mean AQI per (state, area) from cleaned AQI rows"""
+        days = day_numbers(pd.to_datetime(df["date"], errors="coerce"))
+        values = pd.to_numeric(df["aqi_value"], errors="coerce").to_numpy(dtype="float64")
+        groups = df.groupby(["state", "area"], sort=True, observed=True)
+        codes = groups.ngroup().to_numpy()
+        valid = (days >= 0) & ~np.isnan(values) & (codes >= 0)
+        if not valid.any():
+            raise ValueError("No dated AQI readings to build trends from")
+
+        days, values, codes = days[valid], values[valid], codes[valid]
+        first = days.min()
+        periods = pd.date_range(np.datetime64(int(first), "D"), np.datetime64(int(days.max()), "D"), freq="D")
+        matrix = dense_matrix(codes, days - first, values, (groups.ngroups, len(periods)))
+        trends = cls(matrix, groups.size().index, periods, "day")
+        logging.info(f"🌫️ AQI series: {len(trends.areas)} areas × {len(periods)} days")
+        return trends.monthly() if grain == "month" else trends
+
+    @classmethod
+    def load(cls, output_dir: Optional[str] = None, grain: str = "day") -> "AQITrends":
+        """Series over the cleaned AQI dataset in output_dir (shared Arrow store or Parquet)"""
+        output_dir = output_dir or DEFAULT_CLEANED_DIR
+        df = load_source("aqi", output_dir)
+        if df is None:
+            raise FileNotFoundError(f"No cleaned AQI dataset in {output_dir}")
+        return cls.from_frame(df, grain=grain)
+
+    def monthly(self) -> "AQITrends":
+        """Monthly means of the daily series (each day weighted equally)"""
+        if self.grain == "month":
+            return self
+        months = self.periods.to_numpy().astype("datetime64[M]").view("int64")
+        columns = months - months[0]
+        present = ~np.isnan(self.values)
+        rows = np.repeat(np.arange(len(self.areas)), present.sum(axis=1))
+        matrix = dense_matrix(rows, np.broadcast_to(columns, self.values.shape)[present], self.values[present],
+                              (len(self.areas), int(columns[-1]) + 1))
+        periods = pd.date_range(self.periods[0].to_period("M").to_timestamp(), periods=matrix.shape[1], freq="MS")
+        return AQITrends(matrix, self.areas, periods, "month")
+
+    def frame(self, values: np.ndarray) -> pd.DataFrame:
+        """Area × period DataFrame of an array shaped like the series"""
+        return pd.DataFrame(values, index=self.areas, columns=self.periods)
+
+    def x(self) -> np.ndarray:
+        """Period starts as day numbers (the regressor for slopes)"""
+        return self.periods.to_numpy().astype("datetime64[D]").view("int64").astype("float64")
+
+    # 📉 Smoothing and seasonality
+    def rolling(self, window: int, min_periods: Optional[int] = None, center: bool = False) -> pd.DataFrame:
+        """Rolling mean AQI of every area over window periods"""
+        return self.frame(rolling_mean(self.values, window, min_periods, center))
+
+    def decompose(self) -> Dict[str, pd.DataFrame]:
+        """Additive decomposition into trend, seasonal and residual components
+
+        The trend is a centred one-season rolling mean; the seasonal
+        component is each area's mean detrended AQI per calendar month,
+        centred on zero.
+        """
+        trend = rolling_mean(self.values, SEASON_LENGTH[self.grain], center=True)
+        seasonal = self.seasonal_profile(self.values - trend)
+        residual = self.values - trend - seasonal
+        return {"trend": self.frame(trend), "seasonal": self.frame(seasonal), "residual": self.frame(residual)}
+
+    def seasonal_profile(self, detrended: np.ndarray) -> np.ndarray:
+        """Per-area calendar-month means of detrended values, spread back over the periods"""
+        month_of_year = self.periods.month.to_numpy() - 1
+        onehot = np.eye(12)[month_of_year]
+        present = ~np.isnan(detrended)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = (np.where(present, detrended, 0.0) @ onehot) / (present @ onehot)
+            observed = ~np.isnan(means)
+            centre = np.where(observed, means, 0.0).sum(axis=1, keepdims=True) / observed.sum(axis=1, keepdims=True)
+        means = means - centre
+        return np.nan_to_num(means)[:, month_of_year]
+
+    def anomalies(self) -> np.ndarray:
+        """Values with each area's seasonal component removed"""
+        trend = rolling_mean(self.values, SEASON_LENGTH[self.grain], center=True)
+        return self.values - self.seasonal_profile(self.values - trend)
+
+    # 🧪 Trend tests
+    def trend_tests(self, deseasonalise: bool = True, workers: int = 1) -> pd.DataFrame:
+        """Least-squares and Theil-Sen slopes (AQI per year), Mann-Kendall and Pettitt tests per area
+
+        Mann-Kendall and Sen's slope run in a pool of workers processes,
+        splitting the areas into blocks. Daily AQI is autocorrelated, which
+        makes daily-grain p-values optimistic; use monthly() for
+        significance.
+        """
+        values = self.anomalies() if deseasonalise else self.values
+        x = self.x()
+        ols = linear_trends(values, x)
+        shift = pettitt(values)
+        ranked = self.rank_tests(values, x, workers)
+
+        positions = shift["position"]
+        changepoints = np.where(positions >= 0, self.periods.to_numpy()[np.maximum(positions, 0)], np.datetime64("NaT"))
+        return pd.DataFrame({
+            "periods": (~np.isnan(self.values)).sum(axis=1),
+            "slope_per_year": ols["slope"] * DAYS_PER_YEAR,
+            "r2": ols["r2"],
+            "sen_slope_per_year": ranked["sen_slope"] * DAYS_PER_YEAR,
+            "mk_s": ranked["s"],
+            "mk_z": ranked["z"],
+            "mk_p": ranked["p"],
+            "kendall_tau": ranked["tau"],
+            "changepoint": changepoints,
+            "changepoint_p": shift["p"],
+            "mean_before": shift["mean_before"],
+            "mean_after": shift["mean_after"],
+        }, index=self.areas)
+
+    def rank_tests(self, values: np.ndarray, x: np.ndarray, workers: int = 1) -> Dict[str, np.ndarray]:
+        """Mann-Kendall and Sen's slope per row of values, in blocks over workers processes"""
+        if workers <= 1 or len(values) < 2 * workers:
+            return rank_tests(values, x)
+        blocks = np.array_split(np.arange(len(values)), workers * 4)
+        logging.info(f"⚙️ Rank tests for {len(values)} areas in {len(blocks)} blocks over {workers} processes")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context()) as pool:
+            results = list(pool.map(rank_tests, [values[block] for block in blocks], [x] * len(blocks)))
+        return {name: np.concatenate([result[name] for result in results]) for name in results[0]}
+
+    def degradation(self, alpha: float = 0.05, deseasonalise: bool = True, workers: int = 1) -> pd.DataFrame:
+        """Trend tests plus a "degrading" flag, worst areas first
+
+        An area is degrading when its AQI has a significant upward
+        Mann-Kendall trend with a positive Sen's slope, a significant upward
+        Pettitt shift, and its mean over the latest season is still above
+        the pre-shift level.
+        """
+        tests = self.trend_tests(deseasonalise=deseasonalise, workers=workers)
+        values = self.anomalies() if deseasonalise else self.values
+        recent = values[:, -SEASON_LENGTH[self.grain]:]
+        present = ~np.isnan(recent)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tests["recent_mean"] = np.where(present, recent, 0.0).sum(axis=1) / present.sum(axis=1)
+        tests["degrading"] = (
+            (tests["mk_p"] < alpha) & (tests["sen_slope_per_year"] > 0)
+            & (tests["changepoint_p"] < alpha) & (tests["mean_after"] > tests["mean_before"])
+            & (tests["recent_mean"] > tests["mean_before"])
+        )
+        logging.info(f"📈 {int(tests['degrading'].sum())} of {len(tests)} areas show persistent AQI degradation")
+        return tests.sort_values(["degrading", "sen_slope_per_year"], ascending=False)
@@ -0,0 +1,117 @@
+"""
+Validation utilities for the cleaned datasets
+
+Validators report on a frame and, apart from the swap fix applied by
+check_logical_consistency, leave its values untouched.
+"""
+
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.utils.profiling import profile_stats
+
+from .enhanced_data_cleaning_pipeline import (
+    CONFIG,
+    check_and_fix_logical_inconsistency,
+    export_rows,
+    validate_dataframe_structure,
+)
+
+
+def check_logical_consistency(
+    df: pd.DataFrame,
+    col_a: str,
+    col_b: str,
+    condition: Callable[[pd.DataFrame], pd.Series],
+    name: str,
+    swap: bool = False,
+    threshold: Optional[float] = None,
+) -> pd.DataFrame:
+    """Flag rows where condition holds; swap col_a/col_b below the threshold if asked"""
+    return check_and_fix_logical_inconsistency(
+        df=df, col_a=col_a, col_b=col_b, condition=condition, name=name, swap=swap, threshold=threshold
+    )
+
+
+def check_value_range(
+    df: pd.DataFrame,
+    column: str,
+    name: str,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+) -> pd.DataFrame:
+    """Export rows whose column falls outside [min_value, max_value]; values are kept"""
+    if column not in df.columns:
+        logging.warning(f"{name}: column {column} not found. Skipping range check.")
+        return df
+
+    values = df[column]
+    mask = pd.Series(False, index=df.index)
+    if min_value is not None:
+        mask |= values < min_value
+    if max_value is not None:
+        mask |= values > max_value
+
+    count = int(mask.sum())
+    logging.info(f"🔎 Range check {name}: {count} of {len(df)} rows outside [{min_value}, {max_value}]")
+    if count:
+        output_file = os.path.join(CONFIG["inconsistency_dir"], f"{name.replace(' ', '_').lower()}_out_of_range.csv")
+        output_file = export_rows(df[mask], output_file)
+        logging.info(f"Exported out-of-range rows to: {output_file}")
+    return df
+
+
+def validate_date_columns(
+    df: pd.DataFrame,
+    columns: List[str],
+    min_date: Optional[str] = None,
+    max_date: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Null, out-of-range and span summary for parsed date columns"""
+    max_date = pd.Timestamp(max_date) if max_date else pd.Timestamp.now().normalize()
+    min_date = pd.Timestamp(min_date) if min_date else None
+    report = {}
+
+    for col in columns:
+        if col not in df.columns:
+            logging.warning(f"Date column {col} not found")
+            continue
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            logging.warning(f"{col} is not datetime type")
+            report[col] = {"is_datetime": False}
+            continue
+
+        dates = df[col]
+        out_of_range = dates > max_date
+        if min_date is not None:
+            out_of_range |= dates < min_date
+
+        report[col] = {
+            "is_datetime": True,
+            "null_count": int(dates.isna().sum()),
+            "out_of_range_count": int(out_of_range.sum()),
+            "min": dates.min(),
+            "max": dates.max(),
+        }
+        if report[col]["out_of_range_count"]:
+            logging.warning(f"{col}: {report[col]['out_of_range_count']} dates outside the expected range")
+    return report
+
+
+def detect_outliers(df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """IQR outlier count and fences per numeric column (via the shared profiler)"""
+    frame = df if columns is None else df[columns]
+    stats = profile_stats(frame)
+
+    outliers = {
+        col: {"count": stats["outlier_counts"][col], "fences": stats["outlier_fences"][col]}
+        for col in stats["numeric_columns"]
+    }
+    for col, info in outliers.items():
+        if info["count"]:
+            logging.info(f"{col}: {info['count']} IQR outliers outside {info['fences']}")
+    return outliers
+
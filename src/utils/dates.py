@@ -0,0 +1,89 @@
+"""
+Shared date-dimension table for calendar features
+
+Calendar attributes (ISO year/week, month, weekday names, weekend and
+post-COVID flags) depend only on the day, and the datasets cover a few
+thousand distinct days across millions of rows. The table is built once per
+process over the observed date range (grown when a later frame falls
+outside it), and features are looked up by each row's day offset into it
+instead of being recomputed per row.
+"""
+
+import logging
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Analyses treat 2022 onwards as post-COVID (see notebooks/03_analysis_primary)
+POST_COVID_START = pd.Timestamp("2022-01-01")
+
+DATE_DIMENSION_COLUMNS = [
+    "year", "month", "month_name", "day", "weekday", "day_name",
+    "iso_year", "iso_week", "is_weekend", "is_post_covid",
+]
+
+_DIMENSION: Optional[pd.DataFrame] = None
+
+
+# 📅 Building the table
+def build_date_dimension(start, end) -> pd.DataFrame:
+    """One row per day from start to end (inclusive), indexed by date"""
+    days = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq="D", name="date")
+    iso = days.isocalendar()
+    return pd.DataFrame({
+        "year": days.year,
+        "month": days.month,
+        "month_name": np.asarray(days.month_name(), dtype=object),
+        "day": days.day,
+        "weekday": days.weekday,
+        "day_name": np.asarray(days.day_name(), dtype=object),
+        "iso_year": iso["year"].to_numpy(),
+        "iso_week": iso["week"].array,
+        "is_weekend": days.weekday >= 5,
+        "is_post_covid": days >= POST_COVID_START,
+    }, index=days)
+
+
+def date_dimension(start, end) -> pd.DataFrame:
+    """The memoized table, covering at least start..end (rebuilt over the union when it does not)"""
+    global _DIMENSION
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    if _DIMENSION is None or start < _DIMENSION.index[0] or end > _DIMENSION.index[-1]:
+        if _DIMENSION is not None:
+            start, end = min(start, _DIMENSION.index[0]), max(end, _DIMENSION.index[-1])
+        _DIMENSION = build_date_dimension(start, end)
+        logging.info(f"📅 Built date dimension: {start.date()} to {end.date()} ({len(_DIMENSION)} days)")
+    return _DIMENSION
+
+
+def clear_date_dimension():
+    global _DIMENSION
+    _DIMENSION = None
+
+
+# 🔗 Lookups
+def lookup_date_features(dates: pd.Series, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Date-dimension columns for each value of a datetime Series, aligned to its index
+
+    Rows are matched to the table by day offset, so times of day are ignored.
+    NaT rows get missing values (NaN, or <NA> for the nullable ISO week).
+    """
+    columns = columns or DATE_DIMENSION_COLUMNS
+    days = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    missing = np.isnat(days)
+    if missing.all():
+        table = build_date_dimension(POST_COVID_START, POST_COVID_START)
+        positions = np.full(len(days), -1, dtype=np.int64)
+    else:
+        table = date_dimension(days[~missing].min(), days[~missing].max())
+        origin = table.index[0].to_datetime64().astype("datetime64[D]")
+        positions = (days - origin).astype(np.int64)
+        positions[missing] = -1
+
+    has_missing = bool(missing.any())
+    return pd.DataFrame({
+        col: pd.api.extensions.take(table[col].array if col == "iso_week" else table[col].to_numpy(),
+                                    positions, allow_fill=has_missing)
+        for col in columns
+    }, index=dates.index)
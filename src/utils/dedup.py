@@ -0,0 +1,169 @@
+"""
+Hashed, out-of-core duplicate detection
+
+Rows are reduced to two 64-bit fingerprints: one of the full row and one of
+the duplicate-subset key. Values are hashed under a fixed encoding per
+column kind rather than per inferred dtype, so a chunk where a NaN turned an
+integer column into floats fingerprints its rows like every other chunk.
+Exact duplicates are repeats of the row fingerprint (the first occurrence
+is kept). Partial duplicates are the kept rows whose key fingerprint occurs
+more than once, with every member of the group reported, as
+`duplicated(subset, keep=False)` would.
+
+DuplicateFinder collects fingerprints chunk by chunk with global row
+numbers. It partitions them on the high bits of the key fingerprint and
+spills the partitions to disk once the buffered records exceed the memory
+budget. Exact duplicates share a key, so each partition is resolved on its
+own. Only the flagged row numbers are returned, so a second pass can drop
+and export rows in their original order.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+RECORD_DTYPE = np.dtype([("row", np.int64), ("row_hash", np.uint64), ("key_hash", np.uint64)])
+
+# Bump when the fingerprint encoding changes, so persisted seen-sets are rebuilt rather than compared
+FINGERPRINT_VERSION = 2
+
+
+# 🔑 Fingerprints
+def column_hashes(series: pd.Series) -> np.ndarray:
+    """64-bit hash per value under a dtype-independent encoding
+
+    Numbers of any integer, float or boolean dtype hash as float64, dates as
+    int64 nanoseconds and everything else as its string, with categoricals
+    hashed once per category. Missing values hash to 0 under every encoding,
+    so a column read as int64 in one chunk and as float64 (or all-NaN) in the
+    next still gives equal rows equal fingerprints.
+    """
+    missing = series.isna().to_numpy()
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = column_hashes(pd.Series(dtype.categories))
+        codes = series.cat.codes.to_numpy()
+        hashes = categories[codes] if len(categories) else np.zeros(len(series), dtype=np.uint64)
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        hashes = pd.util.hash_array(series.to_numpy(dtype="datetime64[ns]").view("int64"))
+    elif pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_numeric_dtype(dtype):
+        hashes = pd.util.hash_array(series.to_numpy(dtype="float64", na_value=np.nan))
+    else:
+        hashes = pd.util.hash_array(series.astype(str).to_numpy(dtype=object))
+    hashes = np.array(hashes, dtype=np.uint64)
+    hashes[missing] = 0
+    return hashes
+
+
+def row_fingerprints(df: pd.DataFrame, columns: Optional[List[str]] = None) -> np.ndarray:
+    """64-bit fingerprint per row (optionally restricted to columns), stable across chunks and runs"""
+    frame = df if columns is None else df[columns]
+    if frame.shape[1] == 0:
+        return np.zeros(len(frame), dtype=np.uint64)
+    hashes = pd.DataFrame({i: column_hashes(frame.iloc[:, i]) for i in range(frame.shape[1])})
+    return pd.util.hash_pandas_object(hashes, index=False).to_numpy()
+
+
+def duplicate_masks(row_hashes: np.ndarray, key_hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(exact, partial) masks for rows in order; partial is False for exact duplicates"""
+    exact = pd.Series(row_hashes).duplicated().to_numpy()
+    partial = np.zeros(len(key_hashes), dtype=bool)
+    partial[~exact] = pd.Series(key_hashes[~exact]).duplicated(keep=False).to_numpy()
+    return exact, partial
+
+
+class DuplicateFinder:
+    """Exact and partial duplicates across chunks, spilling hash partitions past a memory budget"""
+
+    def __init__(self, memory_mb: float = 256, spill_dir: Optional[str] = None, partition_bits: int = 6):
+        self.budget_records = max(int(memory_mb * 1024**2 // RECORD_DTYPE.itemsize), 1)
+        self.partition_bits = partition_bits
+        self.spill_root = spill_dir
+        self.rows = 0
+        self._buffers: List[np.ndarray] = []
+        self._buffered = 0
+        self._dir: Optional[str] = None
+
+    def __enter__(self) -> "DuplicateFinder":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def spilled(self) -> bool:
+        return self._dir is not None
+
+    def _path(self, partition: int) -> str:
+        return os.path.join(self._dir, f"part_{partition:03d}.bin")
+
+    def add(self, row_hashes: np.ndarray, key_hashes: np.ndarray) -> np.ndarray:
+        """Record one chunk's fingerprints; returns the global row numbers assigned to it"""
+        records = np.empty(len(row_hashes), dtype=RECORD_DTYPE)
+        records["row"] = np.arange(self.rows, self.rows + len(records))
+        records["row_hash"] = row_hashes
+        records["key_hash"] = key_hashes
+        self.rows += len(records)
+        self._buffers.append(records)
+        self._buffered += len(records)
+        if self._buffered > self.budget_records:
+            self._spill()
+        return records["row"]
+
+    def _partition_of(self, records: np.ndarray) -> np.ndarray:
+        return (records["key_hash"] >> np.uint64(64 - self.partition_bits)).astype(np.int64)
+
+    def _spill(self):
+        """Append buffered records to their partition files (row order is preserved per file)"""
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="airpure_dedup_", dir=self.spill_root)
+            logging.info(f"💽 Duplicate index exceeds its memory budget; spilling to {self._dir}")
+        records = np.concatenate(self._buffers)
+        partitions = self._partition_of(records)
+        order = np.argsort(partitions, kind="stable")
+        bounds = np.searchsorted(partitions[order], np.arange((1 << self.partition_bits) + 1))
+        for partition in range(1 << self.partition_bits):
+            part = records[order[bounds[partition]:bounds[partition + 1]]]
+            if len(part):
+                with open(self._path(partition), "ab") as f:
+                    part.tofile(f)
+        self._buffers, self._buffered = [], 0
+
+    def _partitions(self):
+        if not self.spilled:
+            if self._buffers:
+                yield np.concatenate(self._buffers)
+            return
+        if self._buffers:
+            self._spill()
+        for partition in range(1 << self.partition_bits):
+            if os.path.exists(self._path(partition)):
+                yield np.fromfile(self._path(partition), dtype=RECORD_DTYPE)
+
+    def resolve(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted global row numbers of (exact duplicates, partial duplicates), one partition at a time"""
+        exact_rows, partial_rows = [], []
+        for records in self._partitions():
+            exact, partial = duplicate_masks(records["row_hash"], records["key_hash"])
+            exact_rows.append(records["row"][exact])
+            partial_rows.append(records["row"][partial])
+        if not exact_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(exact_rows)), np.sort(np.concatenate(partial_rows))
+
+    def close(self):
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self._buffers, self._buffered = [], 0
+
+
+def rows_in(sorted_rows: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Positions, relative to start, of the sorted row numbers falling in [start, stop)"""
+    lo, hi = np.searchsorted(sorted_rows, [start, stop])
+    return sorted_rows[lo:hi] - start
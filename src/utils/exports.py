@@ -0,0 +1,98 @@
+"""
+Background CSV exports
+
+Cleaning produces side artefacts (inconsistent rows, partial duplicates,
+week mismatches) and the cleaned CSV itself. ExportQueue serialises and
+writes them on worker threads, so the cleaning thread only hands frames
+over. Writes to one file keep their submission order. Pending frames count
+against a memory budget, and submit() blocks while the budget is exceeded,
+so a fast producer cannot queue unbounded copies of its data.
+
+Compression follows the file suffix, as pandas infers it; COMPRESSION_SUFFIXES
+lists the formats whose appended parts still read back as one file.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+
+
+def compressed_path(path: str, compression: Optional[str]) -> str:
+    """path with the suffix of compression (unchanged if None or already suffixed)"""
+    if compression is None:
+        return path
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported export compression {compression!r}; expected one of {list(COMPRESSION_SUFFIXES)}")
+    suffix = COMPRESSION_SUFFIXES[compression]
+    return path if path.endswith(suffix) else path + suffix
+
+
+def write_csv(rows: pd.DataFrame, path: str, append: bool = False):
+    """Write or append rows (without repeating the header) to a CSV, compressed per its suffix"""
+    rows.to_csv(path, mode="a" if append else "w", header=not append, index=False)
+
+
+class ExportQueue:
+    """Thread-pool CSV writer with per-file ordering and memory backpressure"""
+
+    def __init__(self, memory_mb: float = 128, max_workers: int = 1):
+        self.budget = int(memory_mb * 1024**2)
+        self.pid = os.getpid()
+        self.pending_bytes = 0
+        self.errors: List[str] = []
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._tails: Dict[str, Future] = {}
+        self._futures: List[Future] = []
+        self._cond = threading.Condition()
+
+    def submit(self, rows: pd.DataFrame, path: str, append: bool = False) -> Future:
+        """Queue a write of rows to path; rows must not be modified afterwards"""
+        size = int(rows.memory_usage(index=False, deep=True).sum())
+        with self._cond:
+            # Backpressure: wait for queued writes to drain (a frame alone over budget still goes)
+            while self.pending_bytes and self.pending_bytes + size > self.budget:
+                self._cond.wait()
+            self.pending_bytes += size
+            previous = self._tails.get(path)
+            future = self._pool.submit(self._write, rows, path, append, previous, size)
+            self._tails[path] = future
+            self._futures.append(future)
+        return future
+
+    def _write(self, rows: pd.DataFrame, path: str, append: bool, previous: Optional[Future], size: int):
+        try:
+            # Earlier writes to the same file were submitted first, so they are already running
+            if previous is not None:
+                previous.exception()
+            write_csv(rows, path, append)
+        except Exception as e:
+            error_msg = f"Failed to export {path}: {str(e)}"
+            logging.error(error_msg)
+            with self._cond:
+                self.errors.append(error_msg)
+        finally:
+            with self._cond:
+                self.pending_bytes -= size
+                self._cond.notify_all()
+
+    def flush(self) -> List[str]:
+        """Wait for every queued write; returns (and clears) the errors since the last flush"""
+        with self._cond:
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.exception()
+        with self._cond:
+            self._tails = {path: tail for path, tail in self._tails.items() if not tail.done()}
+            errors, self.errors = self.errors, []
+        return errors
+
+    def close(self) -> List[str]:
+        errors = self.flush()
+        self._pool.shutdown()
+        return errors
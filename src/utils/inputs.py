@@ -0,0 +1,96 @@
+"""
+Raw input locations, fingerprints and the manifest
+
+Everything here uses only the standard library, so the command-line
+interface can resolve dataset paths and tell which raw inputs changed since
+the last run without importing pandas. storage re-exports these names.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+MANIFEST_NAME = "manifest.json"
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default location of the raw CSVs (data/raw) and of the pipeline's cleaned outputs (src/data/cleaned)
+DEFAULT_RAW_DIR = os.path.join(REPO_ROOT, "data", "raw")
+DEFAULT_CLEANED_DIR = os.path.join(REPO_ROOT, "src", "data", "cleaned")
+
+# Dataset name -> raw file name, in processing order
+RAW_FILES = {
+    "aqi": "aqi.csv",
+    "idsp": "idsp.csv",
+    "pp": "population_projection.csv",
+    "vahan": "vahan.csv",
+}
+
+
+def raw_file_paths(data_dir: Optional[str] = None) -> Dict[str, str]:
+    """Path of every dataset's raw CSV in data_dir (default data/raw)"""
+    data_dir = data_dir or DEFAULT_RAW_DIR
+    return {name: os.path.join(data_dir, file_name) for name, file_name in RAW_FILES.items()}
+
+
+# 🧾 Raw input fingerprints
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """BLAKE2b digest of a file, read in blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
+    """Size, mtime and content hash of a raw input"""
+    stat = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": content_hash or file_hash(path),
+    }
+
+
+def input_unchanged(path: str, recorded: Optional[Dict[str, Any]]) -> bool:
+    """True if path still matches its recorded fingerprint
+
+    Size and mtime are compared first; the content is only re-hashed when they
+    differ, so a touched-but-identical file still counts as unchanged.
+    """
+    if not recorded or not os.path.exists(path):
+        return False
+
+    stat = os.stat(path)
+    if stat.st_size != recorded.get("size"):
+        return False
+    if stat.st_mtime_ns == recorded.get("mtime"):
+        return True
+    return file_hash(path) == recorded.get("hash")
+
+
+# 📒 Manifest
+def load_manifest(output_dir: str) -> Dict[str, Any]:
+    """Read the manifest in output_dir (empty if missing or unreadable)"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"datasets": {}}
+
+
+def save_manifest(manifest: Dict[str, Any], output_dir: str):
+    """Atomically write the manifest to output_dir"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def outputs_exist(entry: Dict[str, Any]) -> bool:
+    return all(os.path.exists(path) for path in entry.get("outputs", []))
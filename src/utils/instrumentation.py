@@ -0,0 +1,244 @@
+"""
+Per-stage timing and memory instrumentation for the cleaning pipeline
+
+Stages are wrapped with `instrument(dataset, stage, func, df, ...)` (or the
+`stage(...)` context manager). While a StageRecorder is active (see
+`recording()`), each call records wall time, CPU time, RSS before/after, growth
+of the process peak RSS, optional tracemalloc peak, and rows in/out. Repeated
+calls (one per streamed chunk) are aggregated per (dataset, stage). With no
+recorder active the wrappers only call through.
+
+Records are written as JSON and, optionally, Prometheus text exposition.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRIC_PREFIX = "airpure_stage"
+
+# Record key -> Prometheus help text (exported as airpure_stage_<key>)
+PROMETHEUS_METRICS = {
+    "calls": "Number of times the stage ran",
+    "wall_seconds": "Wall-clock time spent in the stage",
+    "cpu_seconds": "Process CPU time spent in the stage",
+    "rows_in": "Rows passed into the stage",
+    "rows_out": "Rows returned by the stage",
+    "rss_delta_mb": "Change in resident set size across the stage",
+    "peak_rss_growth_mb": "Growth of the process peak RSS during the stage",
+    "traced_peak_mb": "Peak Python/NumPy allocations above the stage's starting point",
+}
+
+
+# 📏 Memory probes
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process (Linux /proc; None elsewhere)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024**2)
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Process high-water RSS (ru_maxrss is KB on Linux, bytes on macOS)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024**2) if sys.platform == "darwin" else peak / 1024
+
+
+def row_count(value: Any) -> Optional[int]:
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+# 🧾 Recorder
+class StageRecorder:
+    """Aggregate per-stage metrics for one run (or one worker's share of it)"""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.records: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._open: List[Dict[str, Any]] = []
+        self._started_tracing = False
+
+    # Lifecycle
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    # Measurement
+    def _fold_traced_peak(self) -> Tuple[int, int]:
+        """Current traced bytes; the peak since the last reset is folded into every open stage"""
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._open:
+            frame["traced_peak"] = max(frame["traced_peak"], peak)
+        return current, peak
+
+    @contextmanager
+    def stage(self, dataset: str, name: str, rows_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Measure the enclosed block; set result["rows_out"] inside it to record rows out"""
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        parent = self._open[-1]["name"] if self._open else None
+        frame = {"name": name, "traced_start": 0, "traced_peak": 0}
+        if tracing:
+            current, _ = self._fold_traced_peak()
+            tracemalloc.reset_peak()
+            frame.update(traced_start=current, traced_peak=current)
+        self._open.append(frame)
+
+        result: Dict[str, Any] = {"rows_out": None}
+        rss_before, peak_before = current_rss_mb(), peak_rss_mb()
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        try:
+            yield result
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            rss_after, peak_after = current_rss_mb(), peak_rss_mb()
+            if tracing:
+                self._fold_traced_peak()
+            self._open.pop()
+
+            self.merge([{
+                "dataset": dataset,
+                "stage": name,
+                "parent": parent,
+                "calls": 1,
+                "wall_seconds": wall,
+                "cpu_seconds": cpu,
+                "rows_in": rows_in,
+                "rows_out": result["rows_out"],
+                "rss_before_mb": rss_before,
+                "rss_after_mb": rss_after,
+                "rss_delta_mb": None if rss_before is None or rss_after is None else rss_after - rss_before,
+                "peak_rss_growth_mb": None if peak_before is None else peak_after - peak_before,
+                "traced_peak_mb": (frame["traced_peak"] - frame["traced_start"]) / (1024**2) if tracing else None,
+            }])
+
+    def merge(self, records: List[Dict[str, Any]]):
+        """Fold records into the aggregates (also used for records from worker processes)
+
+        Calls, times, row counts and RSS growth add up across calls (e.g. one
+        per streamed chunk); the traced peak is the largest seen.
+        """
+        for record in records:
+            existing = self.records.get((record["dataset"], record["stage"]))
+            if existing is None:
+                self.records[(record["dataset"], record["stage"])] = dict(record)
+                continue
+            existing["calls"] += record["calls"]
+            existing["rss_after_mb"] = record.get("rss_after_mb")
+            for key in ["wall_seconds", "cpu_seconds", "rows_in", "rows_out", "rss_delta_mb", "peak_rss_growth_mb"]:
+                if record.get(key) is not None:
+                    existing[key] = (existing[key] or 0) + record[key]
+            if record.get("traced_peak_mb") is not None:
+                existing["traced_peak_mb"] = max(existing["traced_peak_mb"] or 0.0, record["traced_peak_mb"])
+
+    # Output
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self.records.values())
+
+    def slowest(self, n: int = 3, leaves_only: bool = True) -> List[Dict[str, Any]]:
+        """Stages with the most wall time; leaves_only skips stages that wrap other stages"""
+        parents = {(record["dataset"], record.get("parent")) for record in self.records.values()}
+        candidates = [record for key, record in self.records.items() if not leaves_only or key not in parents]
+        return sorted(candidates, key=lambda record: record["wall_seconds"], reverse=True)[:n]
+
+    def write_json(self, path: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        with open(path, "w") as f:
+            json.dump({**(metadata or {}), "stages": self.to_list()}, f, indent=2, default=str)
+        return path
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition, one gauge per metric labelled by dataset and stage"""
+        lines = []
+        for key, help_text in PROMETHEUS_METRICS.items():
+            metric = f"{METRIC_PREFIX}_{key}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            for record in self.records.values():
+                if record.get(key) is None:
+                    continue
+                labels = f'dataset="{escape_label(record["dataset"])}",stage="{escape_label(record["stage"])}"'
+                lines.append(f"{metric}{{{labels}}} {record[key]}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> str:
+        with open(path, "w") as f:
+            f.write(self.to_prometheus())
+        return path
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# 🔌 Active recorder
+_ACTIVE: List[StageRecorder] = []
+
+
+def active_recorder() -> Optional[StageRecorder]:
+    return _ACTIVE[-1] if _ACTIVE else None
+
+
+@contextmanager
+def recording(trace_memory: bool = False) -> Iterator[StageRecorder]:
+    """Activate a new recorder for the enclosed block (innermost recorder wins)"""
+    recorder = StageRecorder(trace_memory=trace_memory)
+    recorder.start()
+    _ACTIVE.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _ACTIVE.pop()
+        recorder.stop()
+
+
+@contextmanager
+def stage(dataset: str, name: str, rows_in: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Measure a block against the active recorder (no-op when none is active)"""
+    recorder = active_recorder()
+    if recorder is None:
+        yield {"rows_out": None}
+        return
+    with recorder.stage(dataset, name, rows_in) as result:
+        yield result
+
+
+def instrument(dataset: str, stage_name: str, func: Callable[..., Any], /, *args, **kwargs) -> Any:
+    """Call func(*args, **kwargs) as a recorded stage; rows come from the first frame argument"""
+    frame = args[0] if args else kwargs.get("df")
+    with stage(dataset, stage_name, rows_in=row_count(frame)) as result:
+        value = func(*args, **kwargs)
+        result["rows_out"] = row_count(value)
+    return value
+
+
+def instrument_iter(dataset: str, name: str, iterable) -> Iterator[Any]:
+    """Yield from iterable, recording the time spent producing each item as a stage call"""
+    iterator = iter(iterable)
+    while True:
+        with stage(dataset, name) as result:
+            item = next(iterator, None)
+            result["rows_out"] = row_count(item)
+        if item is None:
+            return
+        yield item
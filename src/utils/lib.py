@@ -1,14 +1,20 @@
 import pandas as pd
 import numpy as np
 
-def detailed_data_quality_report(df, table_name='Dataset', target_col=None, expected_categories=None):
+from .profiling import profile_stats
+
+def detailed_data_quality_report(df, table_name='Dataset', target_col=None, expected_categories=None,
+                                 quantile_sample=None):
     rows = []
     total_rows = len(df)
     total_cells = df.size
 
+    # Missing, duplicate and outlier counts come from one batched pass
+    stats = profile_stats(df, quantile_sample=quantile_sample)
+
     # 1. Missing Values
     for col in df.columns:
-        missing_count = df[col].isnull().sum()
+        missing_count = stats['missing_values'][col]
         if missing_count > 0:
             rows.append({
                 'Table': table_name,
@@ -21,7 +27,7 @@ def detailed_data_quality_report(df, table_name='Dataset', target_col=None, expe
             })
 
     # 2. Duplicate Rows
-    dup_count = df.duplicated().sum()
+    dup_count = stats['duplicate_rows']
     if dup_count > 0:
         rows.append({
             'Table': table_name,
@@ -34,13 +40,7 @@ def detailed_data_quality_report(df, table_name='Dataset', target_col=None, expe
         })
 
     # 3. Outliers (Numerical Columns using IQR)
-    numeric_cols = df.select_dtypes(include=[np.number])
-    for col in numeric_cols.columns:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        outliers = df[(df[col] < Q1 - 1.5 * IQR) | (df[col] > Q3 + 1.5 * IQR)]
-        outlier_count = len(outliers)
+    for col, outlier_count in stats['outlier_counts'].items():
         if outlier_count > 0:
             rows.append({
                 'Table': table_name,
@@ -0,0 +1,102 @@
+"""
+Single-pass profiling engine shared by the cleaning pipeline and the notebooks
+
+All numeric columns are converted to one float64 block, and missing counts,
+describe()-style statistics, quartiles and IQR outlier counts are computed
+for every column at once with batched NumPy reductions. Duplicate rows are
+counted from 64-bit row hashes instead of pandas' tuple-based duplicated().
+"""
+
+import warnings
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DESCRIBE_PERCENTILES = [25, 50, 75]
+IQR_MULTIPLIER = 1.5
+
+
+def numeric_columns(df: pd.DataFrame) -> List[str]:
+    return df.select_dtypes(include=[np.number]).columns.tolist()
+
+
+def duplicate_row_count(df: pd.DataFrame) -> int:
+    """Rows identical to an earlier row, counted via 64-bit row hashes"""
+    if len(df) == 0 or len(df.columns) == 0:
+        return 0
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return int(len(hashes) - len(pd.unique(hashes)))
+
+
+def profile_stats(
+    df: pd.DataFrame,
+    quantile_sample: Optional[int] = None,
+    random_state: int = 0,
+) -> Dict[str, Any]:
+    """Missing counts, duplicate count, describe() stats and IQR outliers in one pass
+
+    quantile_sample: if set and the frame is larger, quartiles are estimated from
+    that many sampled rows; missing, duplicate and outlier counts stay exact
+    (outliers are counted over all rows against the estimated fences).
+    """
+    numeric = numeric_columns(df)
+    other = [col for col in df.columns if col not in set(numeric)]
+
+    missing = pd.Series(0, index=df.columns, dtype=np.int64)
+    if other:
+        missing[other] = df[other].isna().sum().to_numpy()
+
+    stats: Dict[str, Dict[str, float]] = {}
+    outliers: Dict[str, int] = {}
+    fences: Dict[str, tuple] = {}
+
+    if numeric:
+        values = df[numeric].to_numpy(dtype="float64", na_value=np.nan)
+        nan_mask = np.isnan(values)
+        counts = (~nan_mask).sum(axis=0)
+        missing[numeric] = len(values) - counts
+
+        quantile_values = values
+        if quantile_sample and len(values) > quantile_sample:
+            rows = np.random.default_rng(random_state).choice(len(values), quantile_sample, replace=False)
+            quantile_values = values[rows]
+
+        with warnings.catch_warnings(), np.errstate(all="ignore"):
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            if len(values):
+                q1, q2, q3 = np.nanpercentile(quantile_values, DESCRIBE_PERCENTILES, axis=0)
+                minimum, maximum = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+                mean = np.nanmean(values, axis=0)
+                std = np.nanstd(values, axis=0, ddof=1)
+            else:
+                q1 = q2 = q3 = minimum = maximum = mean = std = np.full(len(numeric), np.nan)
+
+            iqr = q3 - q1
+            lower, upper = q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr
+            outlier_counts = ((values < lower) | (values > upper)).sum(axis=0)
+
+        for i, col in enumerate(numeric):
+            stats[col] = {
+                "count": float(counts[i]),
+                "mean": float(mean[i]),
+                "std": float(std[i]),
+                "min": float(minimum[i]),
+                "25%": float(q1[i]),
+                "50%": float(q2[i]),
+                "75%": float(q3[i]),
+                "max": float(maximum[i]),
+            }
+            outliers[col] = int(outlier_counts[i])
+            fences[col] = (float(lower[i]), float(upper[i]))
+
+    return {
+        "rows": len(df),
+        "missing_values": {col: int(count) for col, count in missing.items()},
+        "duplicate_rows": duplicate_row_count(df),
+        "numeric_columns": numeric,
+        "numeric_stats": stats,
+        "outlier_counts": outliers,
+        "outlier_fences": fences,
+        "quantiles_sampled": bool(quantile_sample and len(df) > quantile_sample),
+    }
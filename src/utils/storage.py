@@ -0,0 +1,224 @@
+"""
+Typed storage for cleaned datasets and the raw-input manifest
+
+Cleaned frames are written as Parquet datasets partitioned by year and state
+(the year taken from the dates where a dataset has no year column), so
+downstream loads get datetimes and categoricals back without re-parsing.
+They are also published as uncompressed Arrow IPC files that readers
+memory-map: notebooks and workers opening the same dataset share its pages
+instead of each parsing a private copy.
+The manifest records a fingerprint (content hash, size, mtime) of every raw
+input so unchanged inputs can skip reading and cleaning on the next run.
+"""
+
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Fingerprints and the manifest need only the standard library; they live in
+# inputs so the CLI can check the cache without importing pandas
+from .inputs import (
+    DEFAULT_CLEANED_DIR,
+    MANIFEST_NAME,
+    file_fingerprint,
+    file_hash,
+    input_unchanged,
+    load_manifest,
+    outputs_exist,
+    save_manifest,
+)
+
+PARQUET_DIR = "parquet"
+ARROW_DIR = "arrow"
+PARTITION_CANDIDATES = ["year", "state"]
+# Date columns a year partition key is derived from when a dataset has no year column
+PARTITION_DATE_COLUMNS = ["date"]
+# Schema metadata listing partition keys that are not columns of the dataset
+DERIVED_PARTITIONS_KEY = b"derived_partitions"
+
+
+# 🗄️ Parquet datasets
+def partition_columns(df: pd.DataFrame) -> List[str]:
+    """Partition columns (year, state) present in df, or derivable from its date column"""
+    derived = ["year"] if derived_year_source(df) is not None else []
+    return [col for col in PARTITION_CANDIDATES if col in df.columns or col in derived]
+
+
+def derived_year_source(df: pd.DataFrame) -> Optional[str]:
+    """The date column a year partition key is derived from (None if df has a year column)"""
+    if "year" in df.columns:
+        return None
+    for col in PARTITION_DATE_COLUMNS:
+        if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col]):
+            return col
+    return None
+
+
+def parquet_path(output_dir: str, name: str) -> str:
+    return os.path.join(output_dir, PARQUET_DIR, name)
+
+
+def storage_schema(schema):
+    """Widen integer and dictionary-index types so separately written parts share one schema
+
+    In-memory frames are downcast per chunk (int8 in one, int16 in the next);
+    Parquet's encodings keep the wider on-disk types just as compact.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for field in schema:
+        field_type = field.type
+        if pa.types.is_integer(field_type):
+            field_type = pa.int64()
+        elif pa.types.is_dictionary(field_type):
+            value_type = pa.string() if pa.types.is_large_string(field_type.value_type) else field_type.value_type
+            field_type = pa.dictionary(pa.int32(), value_type)
+        elif pa.types.is_large_string(field_type):
+            field_type = pa.string()
+        fields.append(field.with_type(field_type))
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def write_parquet_dataset(
+    df: pd.DataFrame,
+    path: str,
+    partition_cols: Optional[List[str]] = None,
+    part: int = 0,
+    schema=None,
+):
+    """Write df as a Parquet dataset partitioned by partition_cols
+
+    part numbers the files so streamed chunks can be added to the same dataset;
+    part 0 replaces any existing dataset at path. Pass the schema returned for
+    the first chunk to keep later chunks' column types consistent with it.
+    A dataset with a date column but no year column (AQI) gets a year key
+    derived from the dates; load_cleaned_dataset drops it again.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    if part == 0 and os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path, exist_ok=True)
+
+    partition_cols = partition_columns(df) if partition_cols is None else partition_cols
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    date_col = derived_year_source(df)
+    if date_col is not None and "year" in partition_cols:
+        # Added to the Arrow table only, so the pandas metadata never lists it
+        table = table.append_column("year", pc.year(table[date_col]).cast(pa.int64()))
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), DERIVED_PARTITIONS_KEY: b'["year"]'})
+    try:
+        table = table.cast(schema if schema is not None else storage_schema(table.schema))
+    except (ValueError, pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        table = table.cast(storage_schema(table.schema))
+
+    pq.write_to_dataset(
+        table,
+        root_path=path,
+        partition_cols=partition_cols or None,
+        basename_template=f"part-{part:05d}-{{i}}.parquet",
+    )
+    return table.schema
+
+
+def load_cleaned_dataset(
+    name: str,
+    output_dir: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List] = None,
+) -> pd.DataFrame:
+    """Load a cleaned dataset written by the pipeline with its dtypes intact
+
+    filters are pyarrow predicates, e.g. [("state", "==", "Delhi")], and prune
+    whole year/state partitions before any data is read. A year key derived
+    from the dates can be filtered on but is only returned when asked for.
+    """
+    import pyarrow.parquet as pq
+
+    path = parquet_path(output_dir or DEFAULT_CLEANED_DIR, name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No cleaned Parquet dataset for {name} at {path}")
+
+    table = pq.read_table(path, columns=columns, filters=filters)
+    derived = json.loads((table.schema.metadata or {}).get(DERIVED_PARTITIONS_KEY, b"[]"))
+    derived = [col for col in derived if col in table.column_names and (columns is None or col not in columns)]
+    return table.drop_columns(derived).to_pandas()
+
+
+# 🗺️ Memory-mapped Arrow store
+def arrow_path(output_dir: str, name: str) -> str:
+    return os.path.join(output_dir, ARROW_DIR, name)
+
+
+def write_arrow_part(df: pd.DataFrame, path: str, part: int = 0, schema=None):
+    """Publish df as one uncompressed Arrow IPC file of the dataset at path
+
+    Parts are numbered like write_parquet_dataset's; part 0 replaces the
+    dataset. Each file is written beside its final name and renamed into
+    place, so readers never map a half-written file (and processes still
+    mapping a replaced dataset keep their pages until they let go).
+    """
+    import pyarrow as pa
+
+    if part == 0 and os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path, exist_ok=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    try:
+        table = table.cast(schema if schema is not None else storage_schema(table.schema))
+    except (ValueError, pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        table = table.cast(storage_schema(table.schema))
+
+    file_path = os.path.join(path, f"part-{part:05d}.arrow")
+    tmp_path = file_path + ".tmp"
+    # Uncompressed and in one record batch, so columns map straight from the file
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max(len(table), 1))
+    os.replace(tmp_path, file_path)
+    return table.schema
+
+
+def publish_shared_dataset(df: pd.DataFrame, name: str, output_dir: Optional[str] = None) -> str:
+    """Replace the memory-mapped copy of a dataset with df; returns its path"""
+    path = arrow_path(output_dir or DEFAULT_CLEANED_DIR, name)
+    write_arrow_part(df, path)
+    return path
+
+
+def open_shared_table(name: str, output_dir: Optional[str] = None, columns: Optional[List[str]] = None):
+    """Memory-map a published dataset as a pyarrow Table (nothing is read until used)"""
+    import pyarrow as pa
+
+    path = arrow_path(output_dir or DEFAULT_CLEANED_DIR, name)
+    parts = sorted(f for f in os.listdir(path) if f.endswith(".arrow")) if os.path.isdir(path) else []
+    if not parts:
+        raise FileNotFoundError(f"No shared Arrow dataset for {name} at {path}")
+
+    tables = []
+    for part in parts:
+        table = pa.ipc.open_file(pa.memory_map(os.path.join(path, part))).read_all()
+        tables.append(table.select(columns) if columns is not None else table)
+    return tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+
+
+def load_shared_dataset(
+    name: str,
+    output_dir: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Load a published dataset from its memory map with dtypes intact
+
+    Columns are converted block by block, so numeric and datetime columns stay
+    read-only views of the shared pages rather than copies (assigning a new
+    column is fine; copy() before modifying one in place). Datasets written in
+    several parts (streamed or appended) are concatenated, which copies.
+    """
+    table = open_shared_table(name, output_dir, columns)
+    return table.to_pandas(split_blocks=True)